@@ -14,5 +14,6 @@ setuptools.setup(
     url='https://github.com/Galfurian/someip_timing_analysis/',
     license='MIT',
     packages=['someip_timing_analysis'],
+    install_requires=['numpy'],
     include_package_data=True
 )
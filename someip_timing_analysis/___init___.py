@@ -3,7 +3,20 @@
 __all__ = [
     "analysis_ssg15",
     "analysis",
+    "comparison",
+    "delays",
     "entities",
     "graph",
-    "logger"
+    "intervals",
+    "logger",
+    "montecarlo",
+    "network",
+    "parallel",
+    "piecewise",
+    "resilience",
+    "session",
+    "simulator",
+    "storage",
+    "sweep",
+    "tables"
 ]
@@ -5,17 +5,59 @@ Timing analysis functions.
 from typing import Tuple
 from .entities import *
 from .logger import *
+from .tables import *
 
+import heapq
 import math
 import sys
+import numpy as np
 
 __logger = create_logger("timing")
+__tracer = Tracer(__logger)
+
+
+# Identifiers of the cases, as returned by the batch analysis.
+CASE_INVALID = 0
+CASE_A = 1
+CASE_B = 2
+CASE_C = 3
 
 
 def set_logger_level(level: int):
     __logger.setLevel(level)
 
 
+def set_tracing_mode(mode: int, buffer_size: int = None):
+    """
+    Sets how the analysis functions trace their intermediate values. With
+    TRACE_OFF they neither format nor log anything, with TRACE_LOG they send
+    formatted records to the logger (the default), and with TRACE_BUFFER they
+    store (function, inputs, output) records in a bounded buffer.
+
+    Args:
+        mode        (int) : The tracing mode.
+        buffer_size (int) : The maximum number of records kept in the buffer.
+    """
+    __tracer.set_mode(mode, buffer_size)
+
+
+def get_trace() -> List[Tuple[str, tuple, object]]:
+    """
+    Returns the (function, inputs, output) records collected with TRACE_BUFFER.
+
+    Returns:
+        List[Tuple[str, tuple, object]]: the records, from the oldest one.
+    """
+    return list(__tracer.buffer)
+
+
+def clear_trace():
+    """
+    Removes all the records collected with TRACE_BUFFER.
+    """
+    __tracer.buffer.clear()
+
+
 class Result:
     """Holds the details about a discovery time.
     """
@@ -49,7 +91,9 @@ def compute_t_rep(e: Entity, x: int) -> float:
     # Compute the result.
     result = (math.pow(2, x) - 1) * e.rep_del
     # Debug output and return.
-    __logger.debug("compute_t_rep(e.rep_del: %.2f, x: %d) -> %.2f" % (e.rep_del, x, result))
+    if __tracer.mode:
+        __tracer.trace("compute_t_rep", (e.rep_del, x), result,
+                       "compute_t_rep(e.rep_del: %.2f, x: %d) -> %.2f")
     return result
 
 
@@ -72,7 +116,9 @@ def compute_t_cyc(s: Service, y: int) -> float:
     # Compute the result.
     result = y * s.cyc_del
     # Debug output and return.
-    __logger.debug("compute_t_cyc(s.cyc_del: %.2f, y: %d) -> %.2f" % (s.cyc_del, y, result))
+    if __tracer.mode:
+        __tracer.trace("compute_t_cyc", (s.cyc_del, y), result,
+                       "compute_t_cyc(s.cyc_del: %.2f, y: %d) -> %.2f")
     return result
 
 
@@ -89,7 +135,9 @@ def compute_z_s(s: Service, c: Client) -> float:
     # Compute the result, and avoid producing a negative value.
     result = (s.t_init - c.t_init) if (s.t_init > c.t_init) else 0
     # Debug output and return.
-    __logger.debug("compute_z_s(s.t_init: %.2f, c.t_init: %.2f) -> %.2f" % (s.t_init, c.t_init, result))
+    if __tracer.mode:
+        __tracer.trace("compute_z_s", (s.t_init, c.t_init), result,
+                       "compute_z_s(s.t_init: %.2f, c.t_init: %.2f) -> %.2f")
     return result
 
 
@@ -106,7 +154,9 @@ def compute_z_c(s: Service, c: Client) -> float:
     # Compute the result, and avoid producing a negative value.
     result = (c.boot_del - s.t_init) if (s.t_init < c.boot_del) else 0
     # Debug output and return.
-    __logger.debug("compute_z_c(c.boot_del: %.2f, s.t_init: %.2f) -> %.2f" % (c.boot_del, s.t_init, result))
+    if __tracer.mode:
+        __tracer.trace("compute_z_c", (c.boot_del, s.t_init), result,
+                       "compute_z_c(c.boot_del: %.2f, s.t_init: %.2f) -> %.2f")
     return result
 
 
@@ -126,7 +176,9 @@ def compute_x_s(s: Service, c: Client, t_c: float) -> int:
     # Compute the result, and avoid producing a negative value.
     result = math.ceil(math.log2(((z_s - t_c) / c.rep_del) + 1)) if (z_s > t_c) else 0
     # Debug output and return.
-    __logger.debug("compute_x_s(z_s: %.2f, t_c: %.2f, c.rep_del: %.2f) -> %d" % (z_s, t_c, c.rep_del, result))
+    if __tracer.mode:
+        __tracer.trace("compute_x_s", (z_s, t_c, c.rep_del), result,
+                       "compute_x_s(z_s: %.2f, t_c: %.2f, c.rep_del: %.2f) -> %d")
     return result
 
 
@@ -146,7 +198,9 @@ def compute_x_c(s: Service, c: Client, t_c: float) -> int:
     # Compute the result, and avoid producing a negative value.
     result = math.ceil(math.log2(((z_c - t_c) / s.rep_del) + 1)) if (z_c > t_c) else 0
     # Debug output and return.
-    __logger.debug("compute_x_c(z_c: %.2f, t_c: %.2f, s.rep_del: %.2f) -> %d" % (z_c, t_c, s.rep_del, result))
+    if __tracer.mode:
+        __tracer.trace("compute_x_c", (z_c, t_c, s.rep_del), result,
+                       "compute_x_c(z_c: %.2f, t_c: %.2f, s.rep_del: %.2f) -> %d")
     return result
 
 
@@ -167,7 +221,9 @@ def compute_x_s_hat(s: Service, c: Client, t_c: float) -> int:
     # Compute the result.
     result = min(c.rep_max, x_s)
     # Debug output and return.
-    __logger.debug("compute_x_s_hat(c.rep_max: %d, x_s: %d) -> %d" % (c.rep_max, x_s, result))
+    if __tracer.mode:
+        __tracer.trace("compute_x_s_hat", (c.rep_max, x_s), result,
+                       "compute_x_s_hat(c.rep_max: %d, x_s: %d) -> %d")
     return result
 
 
@@ -188,7 +244,9 @@ def compute_x_c_hat(s: Service, c: Client, t_c: float) -> int:
     # Compute the result.
     result = min(s.rep_max, x_c)
     # Debug output and return.
-    __logger.debug("compute_x_c_hat(s.rep_max: %d, x_c: %d) -> %d" % (s.rep_max, x_c, result))
+    if __tracer.mode:
+        __tracer.trace("compute_x_c_hat", (s.rep_max, x_c), result,
+                       "compute_x_c_hat(s.rep_max: %d, x_c: %d) -> %d")
     return result
 
 
@@ -211,8 +269,9 @@ def compute_y(s: Service, c: Client, t_c: float) -> int:
     # Finally, compute the result.
     result = math.ceil((z_c - t_c - t_rep) / s.cyc_del)
     # Debug output and return.
-    __logger.debug("compute_y(z_c: %.2f, t_c: %.2f, t_rep: %.2f, s.cyc_del: %.2f) -> %d" %
-                   (z_c, t_c, t_rep, s.cyc_del, result))
+    if __tracer.mode:
+        __tracer.trace("compute_y", (z_c, t_c, t_rep, s.cyc_del), result,
+                       "compute_y(z_c: %.2f, t_c: %.2f, t_rep: %.2f, s.cyc_del: %.2f) -> %d")
     return result
 
 
@@ -235,7 +294,9 @@ def compute_y_hat(s: Service, c: Client, t_c: float) -> int:
     # Finally, compute the result.
     result = y if ((y >= 0) and (x_c_hat >= s.rep_max)) else 0
     # Debug output and return.
-    __logger.debug("compute_y_hat(y: %d, x_c_hat: %d) -> %d" % (y, x_c_hat, result))
+    if __tracer.mode:
+        __tracer.trace("compute_y_hat", (y, x_c_hat), result,
+                       "compute_y_hat(y: %d, x_c_hat: %d) -> %d")
     return result
 
 
@@ -265,8 +326,9 @@ def timing_analysis_a(s: Service, c: Client, t_c: float) -> float:
     # Compute the result.
     result = s.t_init + t_rep + t_cyc + t_c
     # Debug output and return.
-    __logger.debug("timing_analysis_a(s.t_init: %.2f, t_rep: %.2f, t_cyc: %.2f, t_c: %.2f) -> %.2f" %
-                   (s.t_init, t_rep, t_cyc, t_c, result))
+    if __tracer.mode:
+        __tracer.trace("timing_analysis_a", (s.t_init, t_rep, t_cyc, t_c), result,
+                       "timing_analysis_a(s.t_init: %.2f, t_rep: %.2f, t_cyc: %.2f, t_c: %.2f) -> %.2f")
     return result
 
 
@@ -290,8 +352,9 @@ def timing_analysis_b(s: Service, c: Client, t_c: float) -> float:
     # Compute the result.
     result = c.t_init + t_rep + t_c + s.ans_del + t_c
     # Debug output and return.
-    __logger.debug("timing_analysis_b(c.t_init: %.2f, t_rep: %.2f, t_c: %.2f, s.ans_del: %.2f, t_c: %.2f) -> %.2f" %
-                   (c.t_init, t_rep, t_c, s.ans_del, t_c, result))
+    if __tracer.mode:
+        __tracer.trace("timing_analysis_b", (c.t_init, t_rep, t_c, s.ans_del, t_c), result,
+                       "timing_analysis_b(c.t_init: %.2f, t_rep: %.2f, t_c: %.2f, s.ans_del: %.2f, t_c: %.2f) -> %.2f")
     return result
 
 
@@ -315,8 +378,9 @@ def timing_analysis_c(s: Service, c: Client, t_c: float) -> float:
     # Compute the result.
     result = min(timing_a, timing_b)
     # Debug output and return.
-    __logger.debug("timing_analysis_c(timing_a: %.2f, timing_b: %.2f) -> %.2f" %
-                   (timing_a, timing_b, result))
+    if __tracer.mode:
+        __tracer.trace("timing_analysis_c", (timing_a, timing_b), result,
+                       "timing_analysis_c(timing_a: %.2f, timing_b: %.2f) -> %.2f")
     return result
 
 
@@ -334,30 +398,42 @@ def timing_analysis(s: Service, c: Client, t_c: float) -> float:
     """
     # Service in Offer Mode and Client in Listen Mode
     if s.offer_mode and not c.find_mode:
-        __logger.info(f"(a) Service in Offer Mode and Client in Listen Mode")
+        if __tracer.mode:
+            __tracer.trace("timing_analysis", (), "a", "(%s) Service in Offer Mode and Client in Listen Mode", logging.INFO)
         return timing_analysis_a(s, c, t_c)
     # Service in Silent Mode and Client in Request Mode
     if not s.offer_mode and c.find_mode:
-        __logger.info(f"(b) Service in Silent Mode and Client in Request Mode")
+        if __tracer.mode:
+            __tracer.trace("timing_analysis", (), "b", "(%s) Service in Silent Mode and Client in Request Mode", logging.INFO)
         return timing_analysis_b(s, c, t_c)
     # Service in Offer Mode and Client in Request Mode
     if s.offer_mode and c.find_mode:
-        __logger.info(f"(c) Service in Offer Mode and Client in Request Mode")
+        if __tracer.mode:
+            __tracer.trace("timing_analysis", (), "c", "(%s) Service in Offer Mode and Client in Request Mode", logging.INFO)
         return timing_analysis_c(s, c, t_c)
     # Check that at least one of them is active.
     sys.exit("Either service or client must be active (sending find/offer messages)")
 
 
-def compute_discovery_times(system: System) -> List[float]:
+def compute_discovery_times(system: System) -> List[Tuple[float, Relation]]:
     """Computes the discovery time for all the relations in the system.
 
     Args:
-        system (System): The list of client/service pairs composing the system.
+        system (System): The list of client/service pairs composing the system,
+                         either as a System or as a RelationTable.
 
     Returns:
-        List[Tuple[float, Relation]]: the list of all the (discovery time, relation) pairs for the entire system
+        List[Tuple[float, Relation]]: the list of all the (discovery time, relation) pairs for the entire system,
+                                      or the array of discovery times for a RelationTable.
     """
-    return [(timing_analysis(relation.service, relation.client, relation.t_c), relation) for relation in system.relations]
+    if isinstance(system, RelationTable):
+        return timing_analysis_batch(**system.columns())
+    # Analyse each distinct (service, client, t_c) key once, on its first relation.
+    dedup = deduplicate(system)
+    relations = system.relations
+    discovery_times = [timing_analysis(relations[index].service, relations[index].client, relations[index].t_c) for index in dedup.index.tolist()]
+    # Scatter the Python values, which might be integers, without going through numpy.
+    return [(discovery_times[key], relation) for key, relation in zip(dedup.inverse.tolist(), relations)]
 
 
 def get_highest_discovery_time(system: System) -> float:
@@ -365,25 +441,136 @@ def get_highest_discovery_time(system: System) -> float:
     service to which it wants to subscribe to.
 
     Args:
-        system (System): The list of client/service pairs composing the system.
+        system (System): The list of client/service pairs composing the system,
+                         either as a System or as a RelationTable.
 
     Returns:
         float: the discovery time for the entire system.
     """
+    if isinstance(system, RelationTable):
+        return float(np.max(compute_discovery_times(system)))
+    if not system.relations:
+        raise ValueError("The system has no relations")
     # Return just the highest discovery time.
-    return max([entry[0] for entry in compute_discovery_times(system)])
+    return _top_k(system, 1)[0][1].discovery_time
 
 def get_highest_impact_relation(system: System) -> Tuple[float, Relation]:
     """Returns the relation that has the highest impact on the discovery time for the whole system.
 
     Args:
-        system (System): The list of client/service pairs composing the system.
+        system (System): The list of client/service pairs composing the system,
+                         either as a System or as a RelationTable.
 
     Returns:
         : the discovery time for the entire system.
     """
+    if isinstance(system, RelationTable):
+        discovery_times = compute_discovery_times(system)
+        index = int(np.argmax(discovery_times))
+        return (float(discovery_times[index]), system.relation(index))
+    if not system.relations:
+        raise ValueError("The system has no relations")
     # Return the (discovery time, relation) with the highest impact on the system.
-    return max(compute_discovery_times(system), key = lambda entry: entry[0])
+    index, result = _top_k(system, 1)[0]
+    return (result.discovery_time, system.relations[index])
+
+
+def compute_upper_bounds(system: RelationTable) -> np.ndarray:
+    """Computes a cheap upper bound of the discovery time of each relation.
+
+    The offer reaching the client is sent at the latest at the end of the
+    Repetition Phase or one cycle after the client is up (case a), while the
+    find message is sent at the latest at the end of the Repetition Phase
+    (case b). In both cases, the message is sent at most one period (i.e., the
+    longest gap between two messages) after the other entity is up.
+
+    Args:
+        system (RelationTable): The relations of the system.
+
+    Returns:
+        np.ndarray: the upper bound of each relation.
+    """
+    e, s, c, t_c = system.entities, system.service, system.client, system.t_c
+    with np.errstate(invalid="ignore"):
+        s_t_init = e.boot_del[s] + e.init_del[s]
+        c_t_init = e.boot_del[c] + e.init_del[c]
+        z_c = np.maximum(e.boot_del[c] - s_t_init, 0.0)
+        s_gap = np.where(e.rep_max[s] > 0, np.ldexp(e.rep_del[s], e.rep_max[s] - 1), 0.0)
+        c_gap = np.where(e.rep_max[c] > 0, np.ldexp(e.rep_del[c], e.rep_max[c] - 1), 0.0)
+        bound_a = np.minimum(
+            np.maximum(
+                s_t_init + (np.ldexp(1.0, e.rep_max[s]) - 1) * e.rep_del[s] + t_c,
+                s_t_init + z_c + e.cyc_del[s],
+            ),
+            np.maximum(s_t_init + t_c, e.boot_del[c] + np.maximum(s_gap, e.cyc_del[s])),
+        )
+        bound_b = np.minimum(
+            c_t_init + (np.ldexp(1.0, e.rep_max[c]) - 1) * e.rep_del[c],
+            np.maximum(c_t_init, s_t_init - t_c) + c_gap,
+        ) + 2 * t_c + e.ans_del[s]
+    bound = np.where(e.mode[c], np.minimum(bound_a, bound_b), bound_a)
+    return np.where(e.mode[s], bound, bound_b)
+
+
+def _top_k(system: System, k: int) -> List[Tuple[int, Result]]:
+    """Finds the k relations with the highest discovery time, evaluating
+    exactly only the relations whose upper bound can enter the top k.
+
+    Args:
+        system (System): The list of client/service pairs composing the system.
+        k      (int)   : The number of relations.
+
+    Returns:
+        List[Tuple[int, Result]]: the (position, result) pairs, sorted by
+                                  decreasing discovery time, then by position.
+    """
+    table = RelationTable.from_system(system)
+    # Check that at least one of them is active.
+    if not np.all(table.entities.mode[table.service] | table.entities.mode[table.client]):
+        sys.exit("Either service or client must be active (sending find/offer messages)")
+    bounds = compute_upper_bounds(table)
+    # Min-heap of (discovery time, -position, result), i.e., the worst of the
+    # top k is on top, and on ties the relation coming later is dropped first.
+    heap: List[Tuple[float, int, Result]] = []
+    for index in np.argsort(-bounds, kind="stable").tolist():
+        # The bounds are sorted, no other relation can enter the top k.
+        if (len(heap) == k) and (bounds[index] * (1 + 1e-9) < heap[0][0]):
+            break
+        relation = system.relations[index]
+        result = timing_analysis_full_details(relation.service, relation.client, relation.t_c)
+        entry = (result.discovery_time, -index, result)
+        if len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+    return [(-position, result) for _, position, result in sorted(heap, key=lambda entry: (-entry[0], -entry[1]))]
+
+
+def top_k_relations(system: System, k: int) -> List[Result]:
+    """Returns the k relations with the highest impact on the discovery time for the whole system.
+
+    Args:
+        system (System): The list of client/service pairs composing the system,
+                         either as a System or as a RelationTable.
+        k      (int)   : The number of relations.
+
+    Returns:
+        List[Result]: the results of the k relations, sorted by decreasing
+                      discovery time; ties keep the order of the system.
+    """
+    if k <= 0:
+        return []
+    if isinstance(system, RelationTable):
+        discovery_times = compute_discovery_times(system)
+        # Sort by decreasing discovery time, then by position.
+        indices = np.lexsort((np.arange(len(system)), -discovery_times))[:k]
+        entities = system.entities.to_entities()
+        return _results_from_arrays(
+            _timing_analysis_arrays(**RelationTable(system.entities, system.client[indices], system.service[indices], system.t_c[indices]).columns()),
+            [entities[index] for index in system.client[indices].tolist()],
+            [entities[index] for index in system.service[indices].tolist()],
+        )
+    return [result for _, result in _top_k(system, k)]
 
 
 def timing_analysis_a_full_details(s: Service, c: Client, t_c: float) -> Result:
@@ -471,20 +658,261 @@ def timing_analysis_c_full_details(s: Service, c: Client, t_c: float) -> Result:
     return timing_b
 
 
+def timing_analysis_full_details(s: Service, c: Client, t_c: float) -> Result:
+    """
+    Computes the timespan that a client running on a node needs to find the
+    service to which it wants to subscribe to, together with its breakdown.
+
+    Unlike composing the `compute_*` functions, every intermediate value (z_s,
+    z_c, hat(x), hat(y), t_rep and t_cyc) is computed exactly once, and only if
+    the case requires it. The discovery time is identical to the one of
+    `timing_analysis`, while the details are those of the
+    `timing_analysis_*_full_details` functions.
+
+    Args:
+        s   (Service) : the service.
+        c   (Client)  : the client.
+        t_c (float)   : the communication delay.
+    Returns:
+        Result: the discovery timespan and its details.
+    """
+    timing_a = timing_b = None
+    # Service in Offer Mode: the client might receive an offer message.
+    if s.offer_mode:
+        # Compute z_c, and the messages sent before the client is listening.
+        z_c = (c.boot_del - s.t_init) if (s.t_init < c.boot_del) else 0
+        x_c = math.ceil(math.log2(((z_c - t_c) / s.rep_del) + 1)) if (z_c > t_c) else 0
+        x_c_hat = min(s.rep_max, x_c)
+        # Compute the lenght of the Repetition Phase, up to the x_c-th message.
+        s_t_rep = (math.pow(2, x_c_hat) - 1) * s.rep_del
+        # Compute the number of messages sent in the Main Phase, might be zero.
+        y = math.ceil((z_c - t_c - (math.pow(2, s.rep_max) - 1) * s.rep_del) / s.cyc_del)
+        y_hat = y if ((y >= 0) and (x_c_hat >= s.rep_max)) else 0
+        s_t_cyc = y_hat * s.cyc_del
+        timing_a = s.t_init + s_t_rep + s_t_cyc + t_c
+    # Client in Request Mode: the client might receive an answer message.
+    if c.find_mode:
+        # Compute z_s, and the messages sent before the service is ready.
+        z_s = (s.t_init - c.t_init) if (s.t_init > c.t_init) else 0
+        x_s = math.ceil(math.log2(((z_s - t_c) / c.rep_del) + 1)) if (z_s > t_c) else 0
+        x_s_hat = min(c.rep_max, x_s)
+        # Compute the lenght of the Repetition Phase, up to the x_s-th message.
+        c_t_rep = (math.pow(2, x_s_hat) - 1) * c.rep_del
+        timing_b = c.t_init + c_t_rep + t_c + s.ans_del + t_c
+    # Check that at least one of them is active.
+    if (timing_a is None) and (timing_b is None):
+        sys.exit("Either service or client must be active (sending find/offer messages)")
+    # Select the earliest discovery, like `timing_analysis_c_full_details`.
+    if (timing_b is None) or ((timing_a is not None) and (timing_a < timing_b)):
+        result = Result(c, s, t_c, timing_a, details={
+                "s.t_init" : s.t_init,
+                "s.t_rep" : s_t_rep,
+                "s.t_cyc" : s_t_cyc,
+                "t_c" : t_c
+            }
+        )
+    else:
+        result = Result(c, s, t_c, timing_b, details={
+                "c.t_init" : c.t_init,
+                "c.t_rep" : c_t_rep,
+                "s.ans_del" : s.ans_del,
+                "t_c" : t_c + t_c
+            }
+        )
+    # Debug output and return.
+    if __tracer.mode:
+        __tracer.trace("timing_analysis_full_details", (s.name, c.name, t_c), result.discovery_time,
+                       "timing_analysis_full_details(s: %s, c: %s, t_c: %.2f) -> %.2f")
+    return result
+
+
 def compute_discovery_times_full_details(system: System) -> List[Result]:
-    # Prepare the list of results.
-    results : List[Result] = []
-    # Iterate each relation.
-    for relation in system.relations:
-        # Service in Offer Mode and Client in Listen Mode
-        if relation.service.offer_mode and not relation.client.find_mode:
-            results.append(timing_analysis_a_full_details(relation.service, relation.client, relation.t_c))
-        # Service in Silent Mode and Client in Request Mode
-        elif not relation.service.offer_mode and relation.client.find_mode:
-            results.append(timing_analysis_b_full_details(relation.service, relation.client, relation.t_c))
-        # Service in Offer Mode and Client in Request Mode
-        elif relation.service.offer_mode and relation.client.find_mode:
-            results.append(timing_analysis_c_full_details(relation.service, relation.client, relation.t_c))
-        else:
+    """Computes the discovery time, and its details, for all the relations in the system.
+
+    Args:
+        system (System): The list of client/service pairs composing the system,
+                         either as a System or as a RelationTable.
+
+    Returns:
+        List[Result]: the list of results, one for each relation.
+    """
+    if isinstance(system, RelationTable):
+        terms = _timing_analysis_arrays(**system.columns())
+        # Check that at least one of them is active.
+        if np.any(terms["case"] == CASE_INVALID):
             sys.exit("Either service or client must be active (sending find/offer messages)")
+        entities = system.entities.to_entities()
+        return _results_from_arrays(
+            terms,
+            [entities[index] for index in system.client.tolist()],
+            [entities[index] for index in system.service.tolist()],
+        )
+    return [timing_analysis_full_details(relation.service, relation.client, relation.t_c) for relation in system.relations]
+
+
+def _results_from_arrays(terms: dict, clients: List[Client], services: List[Service]) -> List[Result]:
+    """
+    Builds the results out of the terms computed by the batch analysis, with
+    the same details of `timing_analysis_full_details`.
+
+    Args:
+        terms    (dict)          : the terms computed by `_timing_analysis_arrays`.
+        clients  (List[Client])  : the client of each pair.
+        services (List[Service]) : the service of each pair.
+    Returns:
+        List[Result]: the list of results, one for each pair.
+    """
+    case = terms["case"]
+    # Case (c) keeps the details of case (a) only if it is strictly faster.
+    use_a = (case == CASE_A) | ((case == CASE_C) & (terms["timing_a"] < terms["timing_b"]))
+    results: List[Result] = []
+    for c, s, a, timing_a, timing_b, s_t_init, s_t_rep, s_t_cyc, c_t_init, c_t_rep, s_ans_del, t_c in zip(
+        clients, services, use_a.tolist(), terms["timing_a"].tolist(), terms["timing_b"].tolist(),
+        terms["s.t_init"].tolist(), terms["s.t_rep"].tolist(), terms["s.t_cyc"].tolist(),
+        terms["c.t_init"].tolist(), terms["c.t_rep"].tolist(), terms["s.ans_del"].tolist(), terms["t_c"].tolist(),
+    ):
+        if a:
+            results.append(Result(c, s, t_c, timing_a, details={
+                    "s.t_init" : s_t_init,
+                    "s.t_rep" : s_t_rep,
+                    "s.t_cyc" : s_t_cyc,
+                    "t_c" : t_c
+                }
+            ))
+        else:
+            results.append(Result(c, s, t_c, timing_b, details={
+                    "c.t_init" : c_t_init,
+                    "c.t_rep" : c_t_rep,
+                    "s.ans_del" : s_ans_del,
+                    "t_c" : t_c + t_c
+                }
+            ))
     return results
+
+
+def _ceil_log2(values: np.ndarray) -> np.ndarray:
+    """
+    Computes `math.ceil(math.log2(v))` element-wise. NumPy and the C library
+    might round log2 differently by one ulp, which changes the ceiling only
+    when the logarithm lies next to an integer; those few elements are
+    recomputed with `math.log2`, so that the result matches the scalar
+    functions exactly.
+
+    Args:
+        values (np.ndarray) : the values, all greater than one.
+    Returns:
+        np.ndarray: the ceiling of the base-2 logarithm of the values.
+    """
+    result = np.log2(values)
+    # Find the values whose logarithm is (almost) an integer.
+    near = np.abs(result - np.rint(result)) < 1e-9
+    result = np.ceil(result)
+    if near.any():
+        result[near] = [math.ceil(math.log2(v)) for v in values[near].tolist()]
+    return result
+
+
+def _timing_analysis_arrays(
+    s_boot_del, s_init_del, s_rep_del, s_rep_max, s_cyc_del, s_ans_del, s_offer_mode,
+    c_boot_del, c_init_del, c_rep_del, c_rep_max, c_find_mode, t_c,
+) -> dict:
+    """
+    Vectorized counterpart of `timing_analysis`, which keeps all the
+    intermediate terms. Every operation is carried out in the same order as in
+    the scalar functions, so that the results are bit-for-bit identical.
+
+    Returns:
+        dict: the arrays of the case, the discovery time, and of the terms of
+              case (a) and case (b).
+    """
+    # Broadcast all the columns to the same shape.
+    (s_boot_del, s_init_del, s_rep_del, s_rep_max, s_cyc_del, s_ans_del,
+     c_boot_del, c_init_del, c_rep_del, c_rep_max, t_c, s_offer_mode, c_find_mode) = np.broadcast_arrays(*[
+        np.asarray(column, dtype=np.float64) for column in (
+            s_boot_del, s_init_del, s_rep_del, s_rep_max, s_cyc_del, s_ans_del,
+            c_boot_del, c_init_del, c_rep_del, c_rep_max, t_c)
+    ], np.asarray(s_offer_mode, dtype=bool), np.asarray(c_find_mode, dtype=bool))
+    # Select the case of each pair.
+    case = np.full(t_c.shape, CASE_INVALID, dtype=np.int8)
+    case[s_offer_mode & ~c_find_mode] = CASE_A
+    case[~s_offer_mode & c_find_mode] = CASE_B
+    case[s_offer_mode & c_find_mode] = CASE_C
+    # The parameters of pairs that do not need a term might produce divisions
+    # by zero, which are discarded when selecting the results.
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        s_t_init = s_boot_del + s_init_del
+        c_t_init = c_boot_del + c_init_del
+        # Case (a): compute z_c, hat(x_c), and hat(y).
+        z_c = np.where(s_t_init < c_boot_del, c_boot_del - s_t_init, 0.0)
+        x_c = np.zeros(t_c.shape)
+        active = (z_c > t_c)
+        x_c[active] = _ceil_log2(((z_c[active] - t_c[active]) / s_rep_del[active]) + 1)
+        x_c_hat = np.minimum(s_rep_max, x_c)
+        s_t_rep = (np.ldexp(1.0, x_c_hat.astype(np.int64)) - 1) * s_rep_del
+        y = np.ceil((z_c - t_c - (np.ldexp(1.0, s_rep_max.astype(np.int64)) - 1) * s_rep_del) / s_cyc_del)
+        y_hat = np.where((y >= 0) & (x_c_hat >= s_rep_max), y, 0.0)
+        s_t_cyc = y_hat * s_cyc_del
+        timing_a = s_t_init + s_t_rep + s_t_cyc + t_c
+        # Case (b): compute z_s, and hat(x_s).
+        z_s = np.where(s_t_init > c_t_init, s_t_init - c_t_init, 0.0)
+        x_s = np.zeros(t_c.shape)
+        active = (z_s > t_c)
+        x_s[active] = _ceil_log2(((z_s[active] - t_c[active]) / c_rep_del[active]) + 1)
+        x_s_hat = np.minimum(c_rep_max, x_s)
+        c_t_rep = (np.ldexp(1.0, x_s_hat.astype(np.int64)) - 1) * c_rep_del
+        timing_b = c_t_init + c_t_rep + t_c + s_ans_del + t_c
+    # Case (c) takes the minimum, preferring case (a) on ties like `min`.
+    discovery_time = np.where(timing_b < timing_a, timing_b, timing_a)
+    discovery_time = np.where(case == CASE_A, timing_a, discovery_time)
+    discovery_time = np.where(case == CASE_B, timing_b, discovery_time)
+    discovery_time = np.where(case == CASE_INVALID, np.nan, discovery_time)
+    return {
+        "case": case,
+        "discovery_time": discovery_time,
+        "timing_a": timing_a,
+        "timing_b": timing_b,
+        "s.t_init": s_t_init,
+        "s.t_rep": s_t_rep,
+        "s.t_cyc": s_t_cyc,
+        "c.t_init": c_t_init,
+        "c.t_rep": c_t_rep,
+        "s.ans_del": s_ans_del,
+        "t_c": t_c,
+    }
+
+
+def timing_analysis_batch(
+    s_boot_del, s_init_del, s_rep_del, s_rep_max, s_cyc_del, s_ans_del, s_offer_mode,
+    c_boot_del, c_init_del, c_rep_del, c_rep_max, c_find_mode, t_c,
+) -> np.ndarray:
+    """
+    Computes the timespan that a client running on a node needs to find the
+    service to which it wants to subscribe to, for many client/service pairs at
+    once. Each argument is either a column with one entry per pair, or a scalar
+    shared by all the pairs; the results match `timing_analysis` exactly.
+
+    Args:
+        s_boot_del   (array) : the boot delay of the services.
+        s_init_del   (array) : the initial wait phase delay of the services.
+        s_rep_del    (array) : the repetition phase delay of the services.
+        s_rep_max    (array) : the repetition phase messages of the services.
+        s_cyc_del    (array) : the main phase offer period of the services.
+        s_ans_del    (array) : the answer delay of the services.
+        s_offer_mode (array) : if the services are sending offer messages.
+        c_boot_del   (array) : the boot delay of the clients.
+        c_init_del   (array) : the initial wait phase delay of the clients.
+        c_rep_del    (array) : the repetition phase delay of the clients.
+        c_rep_max    (array) : the repetition phase messages of the clients.
+        c_find_mode  (array) : if the clients are sending find messages.
+        t_c          (array) : the communication delays.
+    Returns:
+        np.ndarray: the discovery timespans.
+    """
+    result = _timing_analysis_arrays(
+        s_boot_del, s_init_del, s_rep_del, s_rep_max, s_cyc_del, s_ans_del, s_offer_mode,
+        c_boot_del, c_init_del, c_rep_del, c_rep_max, c_find_mode, t_c,
+    )
+    # Check that at least one of them is active.
+    if np.any(result["case"] == CASE_INVALID):
+        sys.exit("Either service or client must be active (sending find/offer messages)")
+    return result["discovery_time"]
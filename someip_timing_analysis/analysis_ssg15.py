@@ -9,16 +9,60 @@ Timing analysis functions, as found in:
 from .entities import *
 from .logger import *
 
+from .analysis import _ceil_log2
+
 import math
 import sys
+import numpy as np
 
 __logger = create_logger("timing_ssg15")
+__tracer = Tracer(__logger)
+
+
+# Identifiers of the cases, as returned by the batch analysis.
+CASE_INVALID = 0
+CASE_A1 = 1
+CASE_A2 = 2
+CASE_B = 3
+CASE_C1 = 4
+CASE_C2 = 5
 
 
 def set_logger_level(level: int):
     __logger.setLevel(level)
 
 
+def set_tracing_mode(mode: int, buffer_size: int = None):
+    """
+    Sets how the analysis functions trace their intermediate values. With
+    TRACE_OFF they neither format nor log anything, with TRACE_LOG they send
+    formatted records to the logger (the default), and with TRACE_BUFFER they
+    store (function, inputs, output) records in a bounded buffer.
+
+    Args:
+        mode        (int) : The tracing mode.
+        buffer_size (int) : The maximum number of records kept in the buffer.
+    """
+    __tracer.set_mode(mode, buffer_size)
+
+
+def get_trace() -> List[Tuple[str, tuple, object]]:
+    """
+    Returns the (function, inputs, output) records collected with TRACE_BUFFER.
+
+    Returns:
+        List[Tuple[str, tuple, object]]: the records, from the oldest one.
+    """
+    return list(__tracer.buffer)
+
+
+def clear_trace():
+    """
+    Removes all the records collected with TRACE_BUFFER.
+    """
+    __tracer.buffer.clear()
+
+
 def compute_z_s(s: Service, c: Client) -> float:
     """
     Computes the Z value, when the Client enters Repetition Phase before Service.
@@ -33,7 +77,9 @@ def compute_z_s(s: Service, c: Client) -> float:
     # Compute the result.
     result = s.t_init - c.t_init
     # Debug output and return.
-    __logger.debug("compute_z_s(s.t_init: %.2f, c.t_init: %.2f) -> %.2f" % (s.t_init, c.t_init, result))
+    if __tracer.mode:
+        __tracer.trace("compute_z_s", (s.t_init, c.t_init), result,
+                       "compute_z_s(s.t_init: %.2f, c.t_init: %.2f) -> %.2f")
     return result
 
 
@@ -51,7 +97,9 @@ def compute_z_c(s: Service, c: Client) -> float:
     # Compute the result.
     result = c.boot_del - s.t_init
     # Debug output and return.
-    __logger.debug("compute_z_c(c.boot_del: %.2f, s.t_init: %.2f) -> %.2f" % (c.boot_del, s.t_init, result))
+    if __tracer.mode:
+        __tracer.trace("compute_z_c", (c.boot_del, s.t_init), result,
+                       "compute_z_c(c.boot_del: %.2f, s.t_init: %.2f) -> %.2f")
     return result
 
 
@@ -74,7 +122,9 @@ def compute_x_s(s: Service, c: Client, t_c: float) -> int:
     # error`.
     result = math.ceil(math.log2(((z_s - t_c) / c.rep_del) + 1)) - 1 if (z_s > t_c) else 0
     # Debug output and return.
-    __logger.debug("compute_x_s(z_s: %.2f, t_c: %.2f, c.rep_del: %.2f) -> %d" % (z_s, t_c, c.rep_del, result))
+    if __tracer.mode:
+        __tracer.trace("compute_x_s", (z_s, t_c, c.rep_del), result,
+                       "compute_x_s(z_s: %.2f, t_c: %.2f, c.rep_del: %.2f) -> %d")
     return result
 
 
@@ -97,7 +147,9 @@ def compute_x_c(s: Service, c: Client, t_c: float) -> int:
     # error`.
     result = math.ceil(math.log2(((z_c - t_c) / s.rep_del) + 1)) - 1 if (z_c > t_c) else 0
     # Debug output and return.
-    __logger.debug("compute_x_c(z_c: %.2f, t_c: %.2f, s.rep_del: %.2f) -> %d" % (z_c, t_c, s.rep_del, result))
+    if __tracer.mode:
+        __tracer.trace("compute_x_c", (z_c, t_c, s.rep_del), result,
+                       "compute_x_c(z_c: %.2f, t_c: %.2f, s.rep_del: %.2f) -> %d")
     return result
 
 
@@ -119,8 +171,9 @@ def compute_y(s: Service, c: Client, t_c: float) -> int:
     # Finally, compute the result.
     result = math.ceil((z_c - t_c - (math.pow(2, s.rep_max + 1) - 1) * s.rep_del) / s.cyc_del)
     # Debug output and return.
-    __logger.debug("compute_y(z_c: %.2f, t_c: %.2f, s.rep_max: %.2f, s.rep_del: %.2f, s.cyc_del: %.2f) -> %d" %
-                   (z_c, t_c, s.rep_max, s.rep_del, s.cyc_del, result))
+    if __tracer.mode:
+        __tracer.trace("compute_y", (z_c, t_c, s.rep_max, s.rep_del, s.cyc_del), result,
+                       "compute_y(z_c: %.2f, t_c: %.2f, s.rep_max: %.2f, s.rep_del: %.2f, s.cyc_del: %.2f) -> %d")
     return result
 
 
@@ -142,7 +195,9 @@ def compute_x_c_hat(s: Service, c: Client, t_c: float) -> int:
     # Compute the result (could be simplified to `min(s.rep_max, x_c)`).
     result = x_c if (x_c <= s.rep_max) else s.rep_max
     # Debug output and return.
-    __logger.debug("compute_x_c_hat(s.rep_max: %d, x_c: %d) -> %d" % (s.rep_max, x_c, result))
+    if __tracer.mode:
+        __tracer.trace("compute_x_c_hat", (s.rep_max, x_c), result,
+                       "compute_x_c_hat(s.rep_max: %d, x_c: %d) -> %d")
     return result
 
 
@@ -164,7 +219,9 @@ def compute_x_s_hat(s: Service, c: Client, t_c: float) -> int:
     # Compute the result (could be simplified to `min(c.rep_max, x_s)`).
     result = x_s if (x_s <= c.rep_max) else c.rep_max
     # Debug output and return.
-    __logger.debug("compute_x_s_hat(c.rep_max: %d, x_s: %d) -> %d" % (c.rep_max, x_s, result))
+    if __tracer.mode:
+        __tracer.trace("compute_x_s_hat", (c.rep_max, x_s), result,
+                       "compute_x_s_hat(c.rep_max: %d, x_s: %d) -> %d")
     return result
 
 
@@ -187,7 +244,9 @@ def compute_y_hat(s: Service, c: Client, t_c: float) -> int:
     # Compute the result.
     result = 0 if (x_c_hat <= s.rep_max) else y
     # Debug output and return.
-    __logger.debug("compute_y_hat(y: %d, x_c: %d) -> %d" % (y, x_c_hat, result))
+    if __tracer.mode:
+        __tracer.trace("compute_y_hat", (y, x_c_hat), result,
+                       "compute_y_hat(y: %d, x_c: %d) -> %d")
     return result
 
 
@@ -211,7 +270,9 @@ def timing_analysis_a(s: Service, c: Client, t_c: float) -> float:
         # Compute the result.
         result = z_s + c.init_del + t_c
         # Debug output and return.
-        __logger.debug("timing_analysis_a1(z_s: %.2f, c.init_del: %.2f, t_c: %.2f) -> %.2f" % (z_s, c.init_del, t_c, result))
+        if __tracer.mode:
+            __tracer.trace("timing_analysis_a1", (z_s, c.init_del, t_c), result,
+                           "timing_analysis_a1(z_s: %.2f, c.init_del: %.2f, t_c: %.2f) -> %.2f")
         return result
     # (A2) Service is faster than Client.
     # First, we compute x_hat, y_hat, and z_c.
@@ -225,8 +286,9 @@ def timing_analysis_a(s: Service, c: Client, t_c: float) -> float:
     # Compute the result.
     result = min(t_rep + t_cyc + t_c - z_c, c.init_del + 2 * t_c + s.ans_del)
     # Debug output and return.
-    __logger.debug("timing_analysis_a2(x: %d, y: %d, z_c: %.2f, s.rep_del: %.2f, s.cyc_del: %.2f, s.ans_del: %.2f, t_c: %.2f) -> %.2f" % (
-        x_hat, y_hat, z_c, s.rep_del, s.cyc_del, s.ans_del, t_c, result))
+    if __tracer.mode:
+        __tracer.trace("timing_analysis_a2", (x_hat, y_hat, z_c, s.rep_del, s.cyc_del, s.ans_del, t_c), result,
+                       "timing_analysis_a2(x: %d, y: %d, z_c: %.2f, s.rep_del: %.2f, s.cyc_del: %.2f, s.ans_del: %.2f, t_c: %.2f) -> %.2f")
     return result
 
 
@@ -253,8 +315,9 @@ def timing_analysis_b(s: Service, c: Client, t_c: float) -> float:
     # Compute the result.
     result = t_rep + t_cyc + t_c - z_c
     # Debug output and return.
-    __logger.debug("timing_analysis_b(x: %d, y: %d, z_c: %.2f, s.rep_del: %.2f, s.cyc_del: %.2f, s.ans_del: %.2f, t_c: %.2f) -> %.2f" % (
-        x_hat, y_hat, z_c, s.rep_del, s.cyc_del, s.ans_del, t_c, result))
+    if __tracer.mode:
+        __tracer.trace("timing_analysis_b", (x_hat, y_hat, z_c, s.rep_del, s.cyc_del, s.ans_del, t_c), result,
+                       "timing_analysis_b(x: %d, y: %d, z_c: %.2f, s.rep_del: %.2f, s.cyc_del: %.2f, s.ans_del: %.2f, t_c: %.2f) -> %.2f")
     return result
 
 
@@ -275,7 +338,9 @@ def timing_analysis_c(s: Service, c: Client, t_c: float) -> float:
         # Compute the result.
         result = c.init_del + 2 * t_c + s.ans_del
         # Debug output and return.
-        __logger.debug("timing_analysis_c1(c.init_del: %.2f, s.ans_del: %.2f, t_c:%.2f) -> %.2f" % (c.init_del, s.ans_del, t_c, result))
+        if __tracer.mode:
+            __tracer.trace("timing_analysis_c1", (c.init_del, s.ans_del, t_c), result,
+                           "timing_analysis_c1(c.init_del: %.2f, s.ans_del: %.2f, t_c:%.2f) -> %.2f")
         return result
     # (C2) Client is faster than Service.
     # First, we compute x_s.
@@ -285,8 +350,9 @@ def timing_analysis_c(s: Service, c: Client, t_c: float) -> float:
     # Compute the result.
     result = c.t_init - c.boot_del + t_rep + t_c + s.ans_del + t_c
     # Debug output and return.
-    __logger.debug("timing_analysis_c2(x_s: %d, t_rep: %.2f, c.t_init: %.2f, c.boot_del: %.2f, s.ans_del: %.2f, t_c: %.2f) -> %.2f" % (
-        x_s, t_rep, c.t_init, c.boot_del, s.ans_del, t_c, result))
+    if __tracer.mode:
+        __tracer.trace("timing_analysis_c2", (x_s, t_rep, c.t_init, c.boot_del, s.ans_del, t_c), result,
+                       "timing_analysis_c2(x_s: %d, t_rep: %.2f, c.t_init: %.2f, c.boot_del: %.2f, s.ans_del: %.2f, t_c: %.2f) -> %.2f")
     return result
 
 
@@ -305,18 +371,129 @@ def timing_analysis(s: Service, c: Client, t_c: float) -> float:
     """
     # Service in Offer Mode and Client in Request Mode
     if s.offer_mode and c.find_mode:
-        __logger.debug("(a) Service in Offer Mode and Client in Request Mode")
+        if __tracer.mode:
+            __tracer.trace("timing_analysis", (), "a", "(%s) Service in Offer Mode and Client in Request Mode")
         return timing_analysis_a(s, c, t_c)
 
     # Service in Offer Mode and Client in Listen Mode
     if s.offer_mode and not c.find_mode:
-        __logger.debug("(b) Service in Offer Mode and Client in Listen Mode")
+        if __tracer.mode:
+            __tracer.trace("timing_analysis", (), "b", "(%s) Service in Offer Mode and Client in Listen Mode")
         return timing_analysis_b(s, c, t_c)
 
     # Service in Silent Mode and Client in Request Mode
     if not s.offer_mode and c.find_mode:
-        __logger.debug("(c) Service in Silent Mode and Client in Request Mode")
+        if __tracer.mode:
+            __tracer.trace("timing_analysis", (), "c", "(%s) Service in Silent Mode and Client in Request Mode")
         return timing_analysis_c(s, c, t_c)
 
     # Check that at least one of them is active.
     sys.exit("Either service or client must be active (sending find/offer messages)")
+
+
+def _timing_analysis_arrays(
+    s_boot_del, s_init_del, s_rep_del, s_rep_max, s_cyc_del, s_ans_del, s_offer_mode,
+    c_boot_del, c_init_del, c_rep_del, c_rep_max, c_find_mode, t_c,
+) -> dict:
+    """
+    Vectorized counterpart of `timing_analysis`. Every operation is carried
+    out in the same order as in the scalar functions, so that the results are
+    bit-for-bit identical.
+
+    Returns:
+        dict: the arrays of the case and of the discovery time.
+    """
+    # Broadcast all the columns to the same shape.
+    (s_boot_del, s_init_del, s_rep_del, s_rep_max, s_cyc_del, s_ans_del,
+     c_boot_del, c_init_del, c_rep_del, c_rep_max, t_c, s_offer_mode, c_find_mode) = np.broadcast_arrays(*[
+        np.asarray(column, dtype=np.float64) for column in (
+            s_boot_del, s_init_del, s_rep_del, s_rep_max, s_cyc_del, s_ans_del,
+            c_boot_del, c_init_del, c_rep_del, c_rep_max, t_c)
+    ], np.asarray(s_offer_mode, dtype=bool), np.asarray(c_find_mode, dtype=bool))
+    # The parameters of pairs that do not need a term might produce divisions
+    # by zero, which are discarded when selecting the results.
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        s_t_init = s_boot_del + s_init_del
+        c_t_init = c_boot_del + c_init_del
+        # Compute z_s and z_c.
+        z_s = s_t_init - c_t_init
+        z_c = c_boot_del - s_t_init
+        # Compute x_s and x_c.
+        x_s = np.zeros(t_c.shape)
+        active = (z_s > t_c)
+        x_s[active] = _ceil_log2(((z_s[active] - t_c[active]) / c_rep_del[active]) + 1) - 1
+        x_c = np.zeros(t_c.shape)
+        active = (z_c > t_c)
+        x_c[active] = _ceil_log2(((z_c[active] - t_c[active]) / s_rep_del[active]) + 1) - 1
+        # Compute y, and the hat values.
+        y = np.ceil((z_c - t_c - (np.ldexp(1.0, s_rep_max.astype(np.int64) + 1) - 1) * s_rep_del) / s_cyc_del)
+        x_hat = np.where(x_c <= s_rep_max, x_c, s_rep_max)
+        y_hat = np.where(x_hat <= s_rep_max, 0.0, y)
+        # Cases (A2) and (B) share the lengths of the repetition and main phases.
+        s_t_rep = (np.ldexp(1.0, x_hat.astype(np.int64) + 1) - 1) * s_rep_del
+        s_t_cyc = y_hat * s_cyc_del
+        timing_a1 = z_s + c_init_del + t_c
+        timing_b = s_t_rep + s_t_cyc + t_c - z_c
+        timing_c1 = c_init_del + 2 * t_c + s_ans_del
+        # Case (A2) takes the minimum, preferring the first term on ties like `min`.
+        timing_a2 = np.where(timing_c1 < timing_b, timing_c1, timing_b)
+        c_t_rep = (np.ldexp(1.0, x_s.astype(np.int64) + 1) - 1) * c_rep_del
+        timing_c2 = c_t_init - c_boot_del + c_t_rep + t_c + s_ans_del + t_c
+    # Select the case of each pair.
+    case = np.full(t_c.shape, CASE_INVALID, dtype=np.int8)
+    case_a = s_offer_mode & c_find_mode
+    case_a1 = (s_t_init + t_c) >= c_boot_del
+    case[case_a & case_a1] = CASE_A1
+    case[case_a & ~case_a1] = CASE_A2
+    case[s_offer_mode & ~c_find_mode] = CASE_B
+    case_c = ~s_offer_mode & c_find_mode
+    case_c1 = (c_t_init + t_c) >= s_t_init
+    case[case_c & case_c1] = CASE_C1
+    case[case_c & ~case_c1] = CASE_C2
+    discovery_time = np.select(
+        [case == CASE_A1, case == CASE_A2, case == CASE_B, case == CASE_C1, case == CASE_C2],
+        [timing_a1, timing_a2, timing_b, timing_c1, timing_c2],
+        np.nan,
+    )
+    return {
+        "case": case,
+        "discovery_time": discovery_time,
+    }
+
+
+def timing_analysis_batch(
+    s_boot_del, s_init_del, s_rep_del, s_rep_max, s_cyc_del, s_ans_del, s_offer_mode,
+    c_boot_del, c_init_del, c_rep_del, c_rep_max, c_find_mode, t_c,
+) -> np.ndarray:
+    """
+    Computes the timespan that a client running on a node needs to find the
+    service to which it wants to subscribe to, for many client/service pairs at
+    once. Each argument is either a column with one entry per pair, or a scalar
+    shared by all the pairs; the results match `timing_analysis` exactly.
+
+    Args:
+        s_boot_del   (array) : the boot delay of the services.
+        s_init_del   (array) : the initial wait phase delay of the services.
+        s_rep_del    (array) : the repetition phase delay of the services.
+        s_rep_max    (array) : the repetition phase messages of the services.
+        s_cyc_del    (array) : the main phase offer period of the services.
+        s_ans_del    (array) : the answer delay of the services.
+        s_offer_mode (array) : if the services are sending offer messages.
+        c_boot_del   (array) : the boot delay of the clients.
+        c_init_del   (array) : the initial wait phase delay of the clients.
+        c_rep_del    (array) : the repetition phase delay of the clients.
+        c_rep_max    (array) : the repetition phase messages of the clients.
+        c_find_mode  (array) : if the clients are sending find messages.
+        t_c          (array) : the communication delays.
+
+    Returns:
+        np.ndarray: the discovery timespans.
+    """
+    result = _timing_analysis_arrays(
+        s_boot_del, s_init_del, s_rep_del, s_rep_max, s_cyc_del, s_ans_del, s_offer_mode,
+        c_boot_del, c_init_del, c_rep_del, c_rep_max, c_find_mode, t_c,
+    )
+    # Check that at least one of them is active.
+    if np.any(result["case"] == CASE_INVALID):
+        sys.exit("Either service or client must be active (sending find/offer messages)")
+    return result["discovery_time"]
@@ -0,0 +1,218 @@
+"""
+Differential comparison between the analysis of `analysis.py` and the one of
+`analysis_ssg15.py`, over large sets of client/service configurations.
+"""
+
+import csv
+import numpy as np
+
+from typing import Dict, List, Mapping, Tuple, Union
+from .tables import RelationTable
+from . import analysis
+from . import analysis_ssg15
+
+# The arguments of the batch analysis, i.e., the columns of a configuration.
+COLUMNS = [
+    "s_boot_del", "s_init_del", "s_rep_del", "s_rep_max", "s_cyc_del", "s_ans_del", "s_offer_mode",
+    "c_boot_del", "c_init_del", "c_rep_del", "c_rep_max", "c_find_mode", "t_c",
+]
+
+# The names of the cases of the two analyses.
+CASE_NAMES = {
+    analysis.CASE_INVALID: "-",
+    analysis.CASE_A: "a",
+    analysis.CASE_B: "b",
+    analysis.CASE_C: "c",
+}
+CASE_NAMES_SSG15 = {
+    analysis_ssg15.CASE_INVALID: "-",
+    analysis_ssg15.CASE_A1: "A1",
+    analysis_ssg15.CASE_A2: "A2",
+    analysis_ssg15.CASE_B: "B",
+    analysis_ssg15.CASE_C1: "C1",
+    analysis_ssg15.CASE_C2: "C2",
+}
+
+
+def random_configurations(count: int, seed: int = None, ranges: Dict[str, Tuple[float, float]] = None) -> Dict[str, np.ndarray]:
+    """
+    Generates random client/service configurations, where at least one of
+    the two entities is active.
+
+    Args:
+        count  (int)                            : the number of configurations.
+        seed   (int)                            : the seed of the random generator.
+        ranges (Dict[str, Tuple[float, float]]) : the [min, max] interval of some columns
+                                                  (e.g., {"s_boot_del": (0, 10)}), which replace
+                                                  the default ones.
+    Returns:
+        Dict[str, np.ndarray]: the columns of the configurations.
+    """
+    intervals = {
+        "s_boot_del": (0, 20), "s_init_del": (0, 20), "s_rep_del": (1, 4), "s_rep_max": (0, 5),
+        "s_cyc_del": (1, 5), "s_ans_del": (0, 3), "c_boot_del": (0, 40), "c_init_del": (0, 20),
+        "c_rep_del": (1, 4), "c_rep_max": (0, 5), "t_c": (0, 3),
+    }
+    intervals.update(ranges or {})
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name, (lo, hi) in intervals.items():
+        if name.endswith("rep_max"):
+            columns[name] = rng.integers(lo, hi, size=count, endpoint=True)
+        else:
+            columns[name] = rng.uniform(lo, hi, size=count)
+    # Pick one of the three combinations of active entities.
+    modes = rng.integers(0, 3, size=count)
+    columns["s_offer_mode"] = modes != 1
+    columns["c_find_mode"] = modes != 0
+    return {name: columns[name] for name in COLUMNS}
+
+
+class Comparison(object):
+    """
+    The divergence between the discovery times of `analysis_ssg15` and those
+    of `analysis` (i.e., ssg15 minus analysis), grouped by the pair of cases
+    taken by the two analyses.
+
+    Parameters:
+        count   (int)                                  : The number of compared configurations.
+        groups  (Dict[Tuple[int, int], Dict[str, float]]) : For each (case, ssg15 case), the
+                                                         count, mean, min, max, mean_abs, and
+                                                         rmse of the divergence.
+        top     (Dict[str, np.ndarray])                : The most divergent configurations,
+                                                         sorted by decreasing absolute divergence,
+                                                         with their index, cases, and discovery times.
+    """
+
+    count: int
+    groups: Dict[Tuple[int, int], Dict[str, float]]
+    top: Dict[str, np.ndarray]
+
+    def __init__(self, count: int, groups: Dict[Tuple[int, int], Dict[str, float]], top: Dict[str, np.ndarray]) -> None:
+        self.count = count
+        self.groups = groups
+        self.top = top
+
+    def __repr__(self) -> str:
+        """
+        Transforms the comparison into a string.
+
+        Returns:
+            str: the comparison to string.
+        """
+        return f"<Comparison: {self.count} configurations, {len(self.groups)} groups>"
+
+    def table(self) -> List[List[object]]:
+        """
+        Returns the statistics of each group as rows, with the names of the cases.
+
+        Returns:
+            List[List[object]]: the rows, i.e., case, ssg15 case, count, mean, min, max, mean_abs, rmse.
+        """
+        return [
+            [CASE_NAMES[case], CASE_NAMES_SSG15[case_ssg15]] + [statistics[key] for key in ("count", "mean", "min", "max", "mean_abs", "rmse")]
+            for (case, case_ssg15), statistics in sorted(self.groups.items())
+        ]
+
+    def write_csv(self, filename: str) -> None:
+        """
+        Writes the most divergent configurations to a CSV file, one per row.
+
+        Args:
+            filename (str) : the file.
+        """
+        names = ["index", "case", "case_ssg15", "discovery_time", "discovery_time_ssg15", "divergence"] + COLUMNS
+        with open(filename, 'w', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(names)
+            for row in zip(*[self.top[name].tolist() for name in names]):
+                row = list(row)
+                row[1] = CASE_NAMES[row[1]]
+                row[2] = CASE_NAMES_SSG15[row[2]]
+                writer.writerow(row)
+
+
+def compare(configurations: Union[Mapping[str, np.ndarray], RelationTable], chunk_size: int = 1 << 20, top: int = 100) -> Comparison:
+    """
+    Runs both analyses over the configurations, a chunk at a time, and
+    collects the statistics of their divergence. Configurations where neither
+    entity is active are skipped.
+
+    Args:
+        configurations (Union[Mapping[str, np.ndarray], RelationTable]) : the columns of the
+                                        configurations (e.g., from `random_configurations`, or
+                                        loaded with `np.load`), or a table of relations.
+        chunk_size     (int)          : the number of configurations analysed at once.
+        top            (int)          : the number of most divergent configurations kept.
+    Returns:
+        Comparison: the divergence statistics, and the most divergent configurations.
+    """
+    if isinstance(configurations, RelationTable):
+        configurations = configurations.columns()
+    # Broadcast the scalar columns, without copying them.
+    shape = np.broadcast_shapes(*[np.shape(configurations[name]) for name in COLUMNS])
+    columns = {name: np.broadcast_to(configurations[name], shape).reshape(-1) for name in COLUMNS}
+    size = int(np.prod(shape))
+    # Each pair of cases is a group, identified by `case * groups + case_ssg15`.
+    groups = max(CASE_NAMES_SSG15) + 1
+    size_groups = (max(CASE_NAMES) + 1) * groups
+    count = np.zeros(size_groups, dtype=np.int64)
+    total = np.zeros(size_groups)
+    total_abs = np.zeros(size_groups)
+    total_sq = np.zeros(size_groups)
+    minimum = np.full(size_groups, np.inf)
+    maximum = np.full(size_groups, -np.inf)
+    top_index = np.empty(0, dtype=np.int64)
+    top_divergence = np.empty(0)
+    for start in range(0, size, chunk_size):
+        chunk = {name: column[start:start + chunk_size] for name, column in columns.items()}
+        terms = analysis._timing_analysis_arrays(**chunk)
+        terms_ssg15 = analysis_ssg15._timing_analysis_arrays(**chunk)
+        valid = np.flatnonzero(terms["case"] != analysis.CASE_INVALID)
+        divergence = terms_ssg15["discovery_time"][valid] - terms["discovery_time"][valid]
+        key = terms["case"][valid].astype(np.int64) * groups + terms_ssg15["case"][valid]
+        # Accumulate the statistics of each group.
+        count += np.bincount(key, minlength=len(count))
+        total += np.bincount(key, weights=divergence, minlength=len(count))
+        total_abs += np.bincount(key, weights=np.abs(divergence), minlength=len(count))
+        total_sq += np.bincount(key, weights=divergence * divergence, minlength=len(count))
+        for group in np.unique(key).tolist():
+            values = divergence[key == group]
+            minimum[group] = min(minimum[group], values.min())
+            maximum[group] = max(maximum[group], values.max())
+        # Keep the most divergent configurations seen so far.
+        top_index = np.concatenate((top_index, valid + start))
+        top_divergence = np.concatenate((top_divergence, np.abs(divergence)))
+        if len(top_index) > top:
+            keep = np.argpartition(-top_divergence, top - 1)[:top] if top > 0 else np.empty(0, dtype=np.int64)
+            top_index, top_divergence = top_index[keep], top_divergence[keep]
+    # Sort by decreasing divergence, then by index.
+    order = np.lexsort((top_index, -top_divergence))
+    top_index = top_index[order]
+    selected = {name: column[top_index] for name, column in columns.items()}
+    terms = analysis._timing_analysis_arrays(**selected)
+    terms_ssg15 = analysis_ssg15._timing_analysis_arrays(**selected)
+    result = {
+        "index": top_index,
+        "case": terms["case"],
+        "case_ssg15": terms_ssg15["case"],
+        "discovery_time": terms["discovery_time"],
+        "discovery_time_ssg15": terms_ssg15["discovery_time"],
+        "divergence": terms_ssg15["discovery_time"] - terms["discovery_time"],
+    }
+    result.update(selected)
+    return Comparison(
+        int(count.sum()),
+        {
+            (group // groups, group % groups): {
+                "count": int(count[group]),
+                "mean": float(total[group] / count[group]),
+                "min": float(minimum[group]),
+                "max": float(maximum[group]),
+                "mean_abs": float(total_abs[group] / count[group]),
+                "rmse": float(np.sqrt(total_sq[group] / count[group])),
+            }
+            for group in np.flatnonzero(count).tolist()
+        },
+        result,
+    )
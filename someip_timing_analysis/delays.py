@@ -0,0 +1,455 @@
+"""
+All-pairs delays between the nodes of a network, i.e., the cost of the
+shortest path between every pair of devices, computed once and optionally
+kept on disk, so that the communication delay of a relation becomes a lookup.
+"""
+
+import hashlib
+import os
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Sequence, Tuple
+from .graph import Node, Graph, CompiledGraph
+
+# The compiled graph being searched, set once in each worker.
+_compiled: CompiledGraph = None
+
+
+class DelayMatrix(object):
+    """
+    The delay between every pair of nodes of a network, where `delays[i, j]`
+    is the delay from the i-th node to the j-th one (infinite if j cannot be
+    reached from i, zero if i == j).
+
+    Parameters:
+        nodes  (List[Node])      : The nodes, in the same order of the rows and columns.
+        index  (Dict[Node, int]) : The position of each node.
+        delays (np.ndarray)      : The delays, with shape (number of nodes, number of nodes).
+    """
+
+    def __init__(self, nodes: List[Node], delays: np.ndarray) -> None:
+        self.nodes = list(nodes)
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.delays = delays
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __repr__(self) -> str:
+        """
+        Transforms the matrix into a string.
+
+        Returns:
+            str: the matrix to string.
+        """
+        return f"<DelayMatrix: {len(self)} nodes>"
+
+    def delay(self, source: Node, target: Node) -> float:
+        """
+        Returns the delay from source to target.
+
+        Args:
+            source (Node) : Source node.
+            target (Node) : Target node.
+        Returns:
+            float: the delay.
+        """
+        return float(self.delays[self.index[source], self.index[target]])
+
+    def positions(self, nodes: Sequence[Node]) -> np.ndarray:
+        """
+        Returns the position of each node, to be used with `lookup`.
+
+        Args:
+            nodes (Sequence[Node]) : The nodes.
+        Returns:
+            np.ndarray: the positions.
+        """
+        return np.fromiter((self.index[node] for node in nodes), dtype=np.int64, count=len(nodes))
+
+    def lookup(self, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+        """
+        Returns the delays between several pairs of nodes at once.
+
+        Args:
+            sources (np.ndarray) : The positions of the source nodes.
+            targets (np.ndarray) : The positions of the target nodes.
+        Returns:
+            np.ndarray: the delays.
+        """
+        return self.delays[sources, targets]
+
+
+def topology_hash(compiled: CompiledGraph, node_delays: np.ndarray) -> str:
+    """
+    Computes a digest of the topology, i.e., of the nodes, the edges and
+    their weights, and the delays of the nodes.
+
+    Args:
+        compiled    (CompiledGraph) : The compiled graph.
+        node_delays (np.ndarray)    : The delay of each node.
+    Returns:
+        str: the hexadecimal digest.
+    """
+    digest = hashlib.sha256()
+    digest.update(repr([node.id for node in compiled.nodes]).encode())
+    for array in (compiled.indptr, compiled.indices, compiled.weights, node_delays):
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+
+def _initialize(compiled: CompiledGraph):
+    """
+    Stores the compiled graph inside the worker, so that it is sent only once.
+
+    Args:
+        compiled (CompiledGraph) : The compiled graph.
+    """
+    global _compiled
+    _compiled = compiled
+
+
+def _search_chunk(sources: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Runs Dijkstra from each of the sources inside a worker.
+
+    Args:
+        sources (Sequence[int]) : The sources.
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: the cost of the paths, and the predecessors, one row per source.
+    """
+    rows = [_compiled.shortest_paths(source) for source in sources]
+    shape = (len(rows), len(_compiled))
+    return (
+        np.array([distances for distances, _ in rows], dtype=np.float64).reshape(shape),
+        np.array([predecessors for _, predecessors in rows], dtype=np.int64).reshape(shape),
+    )
+
+
+def shortest_path_trees(compiled: CompiledGraph, sources: Sequence[int] = None, workers: int = None,
+                        chunk_size: int = 64) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Runs Dijkstra from each source over a pool of processes, and returns the
+    shortest path trees.
+
+    Args:
+        compiled   (CompiledGraph) : The compiled graph.
+        sources    (Sequence[int]) : The sources, all the nodes by default.
+        workers    (int)           : The number of worker processes. Defaults to the number of CPUs.
+        chunk_size (int)           : The number of sources sent to a worker at once.
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: the cost of the path from each source to each node
+            (infinite if not reached), and the node preceding it along the path (-1 for the
+            source and the nodes not reached), one row per source.
+    """
+    size = len(compiled)
+    sources = range(size) if sources is None else [int(source) for source in sources]
+    chunks = [sources[start:start + chunk_size] for start in range(0, len(sources), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+    if not chunks:
+        return np.zeros((0, size)), np.zeros((0, size), dtype=np.int64)
+    if (workers == 1) or (len(chunks) == 1):
+        _initialize(compiled)
+        parts = [_search_chunk(chunk) for chunk in chunks]
+    else:
+        # The workers only need the edges, not the nodes (e.g., devices with their entities).
+        edges = CompiledGraph(range(size), compiled.indptr, compiled.indices, compiled.weights)
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=_initialize, initargs=(edges,)) as executor:
+            # Map keeps the results in the same order of the chunks.
+            parts = list(executor.map(_search_chunk, chunks))
+    return np.concatenate([part[0] for part in parts]), np.concatenate([part[1] for part in parts])
+
+
+def _floyd_warshall(compiled: CompiledGraph) -> np.ndarray:
+    """
+    Computes the all-pairs shortest paths with Floyd-Warshall, relaxing a
+    whole row of the matrix at once.
+    """
+    size = len(compiled)
+    distances = np.full((size, size), np.inf)
+    sources, targets, weights = compiled.edges()
+    np.minimum.at(distances, (sources, targets), weights)
+    np.fill_diagonal(distances, 0.0)
+    for k in range(size):
+        np.minimum(distances, distances[:, k, None] + distances[None, k, :], out=distances)
+    return distances
+
+
+def delay_matrix(graph: Graph, node_delay: Callable[[Node], float] = None, method: str = "auto",
+                 workers: int = None, chunk_size: int = 64, cache_dir: str = None, weights: str = "nominal") -> DelayMatrix:
+    """
+    Computes the delay between every pair of nodes, i.e., the cost of the
+    shortest path between them plus the delay of the two nodes at its ends
+    (the delay of a node to itself is zero).
+
+    Args:
+        graph      (Graph)                   : The network.
+        node_delay (Callable[[Node], float]) : The delay of each node (e.g., `Device.device_delay`),
+                                               none by default.
+        method     (str)                     : "dijkstra", which runs Dijkstra from each node over a
+                                               pool of processes, "floyd_warshall", or "auto", which
+                                               picks Floyd-Warshall for small or dense graphs.
+        workers    (int)                     : The number of worker processes. Defaults to the number of CPUs.
+        chunk_size (int)                     : The number of sources sent to a worker at once.
+        cache_dir  (str)                     : The folder where the matrix is kept, under a hash of the
+                                               topology; later calls on the same topology load it
+                                               instead of computing it.
+        weights    (str)                     : The weight of the edges, i.e., "nominal", or the lower
+                                               ("min") or upper ("max") bound given by `Graph.get_bounds`.
+    Returns:
+        DelayMatrix: the delays.
+    """
+    if method not in ("auto", "dijkstra", "floyd_warshall"):
+        raise ValueError(f"Unknown method '{method}', valid methods are: auto, dijkstra, floyd_warshall")
+    if weights not in ("nominal", "min", "max"):
+        raise ValueError(f"Unknown weights '{weights}', valid weights are: nominal, min, max")
+    compiled = graph.freeze()
+    if weights != "nominal":
+        compiled = compiled.with_weights(compiled.weights_min if weights == "min" else compiled.weights_max)
+    size = len(compiled)
+    node_delays = np.array([node_delay(node) if node_delay else 0.0 for node in compiled.nodes], dtype=np.float64).reshape(size)
+    filename = None
+    if cache_dir is not None:
+        filename = os.path.join(cache_dir, f"delays-{topology_hash(compiled, node_delays)}.npz")
+        if os.path.exists(filename):
+            with np.load(filename) as data:
+                return DelayMatrix(compiled.nodes, data["delays"])
+    if method == "auto":
+        # Floyd-Warshall costs V^3 vectorized steps, Dijkstra about E log V
+        # interpreted steps per source.
+        method = "floyd_warshall" if (size <= 256) or (len(compiled.indices) * 8 >= size * size) else "dijkstra"
+    if method == "floyd_warshall":
+        delays = _floyd_warshall(compiled)
+    else:
+        delays, _ = shortest_path_trees(compiled, None, workers, chunk_size)
+    # Add the delay of the nodes at both ends.
+    delays += node_delays[:, None] + node_delays[None, :]
+    np.fill_diagonal(delays, 0.0)
+    if filename is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write to a temporary file first, so that readers never see half a matrix.
+        temporary = f"{filename}.{os.getpid()}.tmp.npz"
+        np.savez(temporary, delays=delays)
+        os.replace(temporary, filename)
+    return DelayMatrix(compiled.nodes, delays)
+
+
+class DynamicDelays(object):
+    """
+    Keeps the shortest paths between every pair of nodes of a graph, and
+    updates them when the graph changes, instead of computing them again.
+
+    Lowering the weight of an edge (or adding it) updates the paths with a
+    single vectorized relaxation; raising it (or removing an edge or a node)
+    only runs Dijkstra again from the sources whose shortest path tree uses
+    it. Each update returns the pairs of nodes whose delay changed.
+
+    Nodes keep their position even after being removed from the graph, in
+    which case they cannot be reached anymore.
+
+    Parameters:
+        graph        (Graph)                   : The network, which must only be changed through this object.
+        node_delay   (Callable[[Node], float]) : The delay of each node.
+        nodes        (List[Node])              : The nodes, in the same order of the rows and columns.
+        index        (Dict[Node, int])         : The position of each node.
+        node_delays  (np.ndarray)              : The delay of each node.
+        distances    (np.ndarray)              : The cost of the shortest path between each pair of nodes.
+        predecessors (np.ndarray)              : The node preceding the target along each path (-1 if none).
+        workers      (int)                     : The number of worker processes running Dijkstra.
+        chunk_size   (int)                     : The number of sources sent to a worker at once.
+    """
+
+    def __init__(self, graph: Graph, node_delay: Callable[[Node], float] = None, workers: int = None, chunk_size: int = 64) -> None:
+        """
+        Computes the shortest paths between every pair of nodes.
+
+        Args:
+            graph      (Graph)                   : The network.
+            node_delay (Callable[[Node], float]) : The delay of each node (e.g., `Device.device_delay`),
+                                                   none by default.
+            workers    (int)                     : The number of worker processes running Dijkstra.
+            chunk_size (int)                     : The number of sources sent to a worker at once.
+        """
+        self.graph = graph
+        self.node_delay = node_delay
+        self.workers = workers
+        self.chunk_size = chunk_size
+        compiled = graph.freeze()
+        self.nodes = list(compiled.nodes)
+        self.index = dict(compiled.index)
+        self.node_delays = np.array([node_delay(node) if node_delay else 0.0 for node in self.nodes], dtype=np.float64).reshape(len(self.nodes))
+        self.distances, self.predecessors = shortest_path_trees(compiled, None, workers, chunk_size)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __repr__(self) -> str:
+        """
+        Transforms the structure into a string.
+
+        Returns:
+            str: the structure to string.
+        """
+        return f"<DynamicDelays: {len(self)} nodes>"
+
+    def matrix(self) -> DelayMatrix:
+        """
+        Returns the current delays, as `delay_matrix` would compute them.
+
+        Returns:
+            DelayMatrix: the delays.
+        """
+        delays = self.distances + self.node_delays[:, None] + self.node_delays[None, :]
+        np.fill_diagonal(delays, 0.0)
+        return DelayMatrix(self.nodes, delays)
+
+    def pairs(self, changed: np.ndarray) -> List[Tuple[Node, Node]]:
+        """
+        Returns the pairs of nodes marked in the result of an update.
+
+        Args:
+            changed (np.ndarray) : The result of an update.
+        Returns:
+            List[Tuple[Node, Node]]: the (source, target) pairs whose delay changed.
+        """
+        return [(self.nodes[i], self.nodes[j]) for i, j in zip(*np.nonzero(changed))]
+
+    def add_connection(self, source: Node, target: Node, weight_function: Callable) -> np.ndarray:
+        """
+        Adds a connection between source and target, or changes its weight.
+
+        Args:
+            source          (Node)     : The source node.
+            target          (Node)     : The target node.
+            weight_function (Callable) : The weight function.
+        Returns:
+            np.ndarray: changed[i, j] is True if the delay from the i-th node to the j-th one changed.
+        """
+        edges = self._edges(source, target)
+        before = [self.graph.get_weight(u, v) if self.graph.is_connected(u, v) else np.inf for u, v in edges]
+        self.graph.add_connection(source, target, weight_function)
+        after = [self.graph.get_weight(u, v) for u, v in edges]
+        # The sources using the edges which got heavier search again, then
+        # the edges which got lighter are relaxed.
+        users = self._users([edge for edge, new, old in zip(edges, after, before) if new > old])
+        self._add_node(source)
+        self._add_node(target)
+        changed = np.zeros(self.distances.shape, dtype=bool)
+        self._search(users, changed)
+        for (u, v), new, old in zip(edges, after, before):
+            if new < old:
+                self._relax(self.index[u], self.index[v], new, changed)
+        return changed
+
+    def remove_connection(self, source: Node, target: Node) -> np.ndarray:
+        """
+        Removes the connection between source and target.
+
+        Args:
+            source (Node) : The source node.
+            target (Node) : The target node.
+        Returns:
+            np.ndarray: changed[i, j] is True if the delay from the i-th node to the j-th one changed.
+        """
+        edges = [(u, v) for u, v in self._edges(source, target) if self.graph.is_connected(u, v)]
+        users = self._users(edges)
+        self.graph.remove_connection(source, target)
+        changed = np.zeros(self.distances.shape, dtype=bool)
+        self._search(users, changed)
+        return changed
+
+    def remove(self, node: Node) -> np.ndarray:
+        """
+        Removes the node, and all its connections.
+
+        Args:
+            node (Node) : The node.
+        Returns:
+            np.ndarray: changed[i, j] is True if the delay from the i-th node to the j-th one changed.
+        """
+        changed = np.zeros(self.distances.shape, dtype=bool)
+        if node not in self.index:
+            self.graph.remove(node)
+            return changed
+        k = self.index[node]
+        # The sources whose paths pass through the node.
+        users = np.flatnonzero(np.any(self.predecessors == k, axis=1))
+        self.graph.remove(node)
+        # The node cannot be reached anymore, and cannot reach any node.
+        changed[:, k] = np.isfinite(self.distances[:, k])
+        changed[k, :] = np.isfinite(self.distances[k, :])
+        changed[k, k] = False
+        self.distances[:, k] = np.inf
+        self.distances[k, :] = np.inf
+        self.distances[k, k] = 0.0
+        self.predecessors[:, k] = -1
+        self.predecessors[k, :] = -1
+        self._search(users[users != k], changed)
+        return changed
+
+    def _edges(self, source: Node, target: Node) -> List[Tuple[Node, Node]]:
+        """
+        Returns the directed edges of a connection.
+        """
+        if self.graph.directed or (source == target):
+            return [(source, target)]
+        return [(source, target), (target, source)]
+
+    def _users(self, edges: List[Tuple[Node, Node]]) -> np.ndarray:
+        """
+        Returns the sources whose shortest path tree uses one of the edges.
+        """
+        used = np.zeros(len(self.nodes), dtype=bool)
+        for u, v in edges:
+            if (u in self.index) and (v in self.index):
+                used |= self.predecessors[:, self.index[v]] == self.index[u]
+        return np.flatnonzero(used)
+
+    def _add_node(self, node: Node):
+        """
+        Adds a row and a column for a new node.
+        """
+        if node in self.index:
+            return
+        self.index[node] = len(self.nodes)
+        self.nodes.append(node)
+        self.node_delays = np.append(self.node_delays, self.node_delay(node) if self.node_delay else 0.0)
+        self.distances = np.pad(self.distances, ((0, 1), (0, 1)), constant_values=np.inf)
+        self.distances[-1, -1] = 0.0
+        self.predecessors = np.pad(self.predecessors, ((0, 1), (0, 1)), constant_values=-1)
+
+    def _relax(self, u: int, v: int, weight: float, changed: np.ndarray):
+        """
+        Updates the paths after the weight of the edge from u to v decreased,
+        i.e., each path either stays the same, or goes through the edge.
+        """
+        candidate = self.distances[:, u, None] + weight + self.distances[None, v, :]
+        improved = candidate < self.distances
+        # The paths through the edge continue along the tree of v.
+        tree = self.predecessors[v].copy()
+        tree[v] = u
+        changed |= improved & ~np.isclose(candidate, self.distances, rtol=1e-12, atol=0.0)
+        self.distances[improved] = candidate[improved]
+        self.predecessors[improved] = np.broadcast_to(tree, improved.shape)[improved]
+
+    def _search(self, sources: np.ndarray, changed: np.ndarray):
+        """
+        Runs Dijkstra again from the sources, on the current graph.
+        """
+        if not len(sources):
+            return
+        compiled = self.graph.freeze()
+        # The position of each node of the compiled graph.
+        position = np.array([self.index[node] for node in compiled.nodes], dtype=np.int64).reshape(len(compiled))
+        present = np.array([self.nodes[source] in compiled.index for source in sources.tolist()], dtype=bool)
+        distances = np.full((len(sources), len(self.nodes)), np.inf)
+        predecessors = np.full((len(sources), len(self.nodes)), -1, dtype=np.int64)
+        rows = [compiled.index[self.nodes[source]] for source in sources[present].tolist()]
+        found_distances, found_predecessors = shortest_path_trees(compiled, rows, self.workers, self.chunk_size)
+        distances[np.ix_(present, position)] = found_distances
+        predecessors[np.ix_(present, position)] = np.where(found_predecessors >= 0, position[found_predecessors], -1)
+        distances[np.arange(len(sources)), sources] = 0.0
+        changed[sources] |= ~np.isclose(distances, self.distances[sources], rtol=1e-12, atol=0.0)
+        self.distances[sources] = distances
+        self.predecessors[sources] = predecessors
@@ -2,6 +2,7 @@
 SOME/IP entities definition.
 """
 
+import copy
 import math
 import json
 
@@ -20,6 +21,8 @@ class Phase(object):
         label    (str)   : The lable identifying the phase.
     """
 
+    __slots__ = ("start", "end", "duration", "label")
+
     start: float
     end: float
     duration: float
@@ -64,20 +67,21 @@ class Entity(object):
         rep_times  (List[float]) : The instants when messages are sents in the Repetition Phase.
     """
 
+    __slots__ = ("name", "boot_del", "init_del", "rep_del", "rep_max", "t_init", "_phases", "_rep_times")
+
     name: str
     boot_del: float
     init_del: float
     rep_del: float
     rep_max: int
     t_init: float
-    phases: List[Phase]
-    rep_times: List[float]
 
     def __init__(
         self, name: str, boot_del: float, init_del: float, rep_del: float, rep_max: int
     ):
         """
-        The constructor for SOME/IP entities.
+        The constructor for SOME/IP entities. The phases and the repetition
+        times are only built when they are first accessed.
 
         Args:
             name     (str)   : The name of the entity.
@@ -92,29 +96,81 @@ class Entity(object):
         self.rep_del = rep_del
         self.rep_max = rep_max
         self.t_init = self.boot_del + self.init_del
-        # Generate the phases.
-        # [0] Boot Phase
-        self.phases = []
-        self.phases.append(Phase(0, boot_del, "Boot"))
-        # [1] Initial Wait Phase
-        self.phases.append(Phase(self.phases[-1].end, init_del, "Initial"))
-        # [2] Repetition Phase
-        self.phases.append(
-            Phase(
-                self.phases[-1].end,
-                sum(math.pow(2, i) * rep_del for i in range(0, rep_max)),
-                "Repetition",
+        self._phases = None
+        self._rep_times = None
+
+    @property
+    def phases(self) -> List[Phase]:
+        """
+        Returns:
+            List[Phase]: the list of phases, built on first access.
+        """
+        if self._phases is None:
+            # Generate the phases.
+            # [0] Boot Phase
+            phases = []
+            phases.append(Phase(0, self.boot_del, "Boot"))
+            # [1] Initial Wait Phase
+            phases.append(Phase(phases[-1].end, self.init_del, "Initial"))
+            # [2] Repetition Phase
+            phases.append(
+                Phase(
+                    phases[-1].end,
+                    sum(math.pow(2, i) * self.rep_del for i in range(0, self.rep_max)),
+                    "Repetition",
+                )
             )
-        )
-        # [3] Main Phase
-        self.phases.append(Phase(self.phases[-1].end, 1, "Main"))
-        # Compute the time instants when the repetition messages are sent.
-        self.rep_times = []
-        # Actually, this is the one sent at the end of the Initial Wait Phase.
-        self.rep_times.append(self.boot_del + self.init_del)
-        # Then, the other are sent.
-        for i in range(0, self.rep_max):
-            self.rep_times.append(self.rep_times[-1] + pow(2, i) * self.rep_del)
+            # [3] Main Phase
+            phases.append(Phase(phases[-1].end, 1, "Main"))
+            self._phases = phases
+        return self._phases
+
+    @property
+    def rep_times(self) -> List[float]:
+        """
+        Returns:
+            List[float]: the instants when messages are sents in the Repetition Phase, built on first access.
+        """
+        if self._rep_times is None:
+            # Compute the time instants when the repetition messages are sent.
+            rep_times = []
+            # Actually, this is the one sent at the end of the Initial Wait Phase.
+            rep_times.append(self.boot_del + self.init_del)
+            # Then, the other are sent.
+            for i in range(0, self.rep_max):
+                rep_times.append(rep_times[-1] + pow(2, i) * self.rep_del)
+            self._rep_times = rep_times
+        return self._rep_times
+
+    def update(self, **parameters):
+        """
+        Changes some parameters of the entity, keeping t_init up to date and
+        discarding the phases and repetition times built so far.
+
+        Args:
+            parameters : The new values, by parameter name (e.g., boot_del=2).
+        """
+        for name, value in parameters.items():
+            if (name.startswith("_")) or (name == "t_init") or (not hasattr(self, name)):
+                raise AttributeError(f"{type(self).__name__} has no parameter '{name}'")
+            setattr(self, name, value)
+        self.t_init = self.boot_del + self.init_del
+        self._phases = None
+        self._rep_times = None
+
+    def replace(self, **parameters) -> 'Entity':
+        """
+        Returns a copy of the entity, with some parameters changed.
+
+        Args:
+            parameters : The new values, by parameter name (e.g., boot_del=2).
+
+        Returns:
+            Entity: the modified copy.
+        """
+        entity = copy.copy(self)
+        entity.update(**parameters)
+        return entity
 
     def __repr__(self) -> str:
         """
@@ -144,6 +200,8 @@ class Client(Entity):
         rep_times  (List[float]) : The instants when messages are sents in the Repetition Phase.
     """
 
+    __slots__ = ("find_mode",)
+
     find_mode: bool
 
     def __init__(
@@ -190,6 +248,8 @@ class Service(Entity):
         rep_times  (List[float]) : The instants when messages are sents in the Repetition Phase.
     """
 
+    __slots__ = ("cyc_del", "ans_del", "offer_mode")
+
     cyc_del: float
     ans_del: float
     offer_mode: bool
@@ -234,6 +294,8 @@ class Relation:
         t_c     (float)     : The communication delay specific of a client/service pair.
     """
 
+    __slots__ = ("client", "service", "t_c")
+
     client: Client
     service: Service
     t_c: float
@@ -279,9 +341,30 @@ class System:
         """
         return f"{self.relations}"
 
+def _attributes(o) -> dict:
+    """
+    Returns the attributes of an object, taken either from its `__dict__` or
+    from the `__slots__` of its classes. Slots starting with an underscore hold
+    lazily built values, which are read through the matching property.
+
+    Args:
+        o : The object.
+    Returns:
+        dict: the attributes of the object.
+    """
+    if hasattr(o, "__dict__"):
+        return o.__dict__
+    attributes = {}
+    for cls in reversed(type(o).__mro__):
+        for slot in cls.__dict__.get("__slots__", ()):
+            name = slot.lstrip("_")
+            attributes[name] = getattr(o, name)
+    return attributes
+
+
 class EntitiesEncoder(json.JSONEncoder):
     def default(self, o):
-        return o.__dict__
+        return _attributes(o)
 
 
 class EntitiesDecoder(json.JSONDecoder):
@@ -310,11 +393,8 @@ class EntitiesDecoder(json.JSONDecoder):
                 d["find_mode"],
             )
         elif ("client" in d) and ("service" in d) and ("t_c" in d):
-            return Relation(
-                EntitiesDecoder().decode(d["client"]),
-                EntitiesDecoder().decode(d["service"]),
-                d["t_c"],
-            )
+            # The hook runs bottom-up, so the client and the service are already decoded.
+            return Relation(d["client"], d["service"], d["t_c"])
         return d
 
 
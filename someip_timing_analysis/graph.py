@@ -1,11 +1,17 @@
 # For typing.
-from typing import Tuple, Callable, List
+from typing import Dict, Tuple, Callable, List
 # For creating a dictionary of sets.
 import collections
 # For saving the graph to file.
 import csv
+import itertools
+import json
+import os
 # For finding the shortest path.
-from queue import Queue
+import heapq
+import math
+# For the compiled graph.
+import numpy as np
 
 class Node:
     """A node of the graph.
@@ -42,8 +48,209 @@ class Node:
         return str(self.id)
 
 
+def build_path(predecessors: Dict[Node, Node], target: Node) -> List[Node]:
+    """Rebuilds the path to target, by following the predecessors back to the source.
+
+    Args:
+        predecessors (Dict[Node, Node]): The node preceding each node along the path, None for the source.
+        target (Node): Target node.
+
+    Returns:
+        List[Node]: The path, from the source to target.
+    """
+    path = []
+    while target is not None:
+        path.append(target)
+        target = predecessors[target]
+    path.reverse()
+    return path
+
+
+# The layout of a binary edge list.
+EDGE_DTYPE = np.dtype([("source", np.int64), ("target", np.int64), ("weight", np.float64)])
+
+
+class ConstantWeight(object):
+    """Weight function returning the same weight for every edge. Unlike a
+    lambda, it keeps its own value, and it can be sent to other processes.
+
+    Parameters:
+        weight (float) : The weight.
+    """
+
+    __slots__ = ("weight",)
+
+    def __init__(self, weight: float):
+        self.weight = weight
+
+    def __call__(self, graph: 'Graph', source: Node, target: Node) -> float:
+        return self.weight
+
+    def __repr__(self) -> str:
+        return f"<ConstantWeight: {self.weight}>"
+
+
+class CompiledGraph(object):
+    """Frozen, array-backed (CSR) form of a graph, where nodes are identified
+    by integers and the weight of each edge is computed once.
+
+    Parameters:
+        nodes       (List[Node])      : The nodes, by integer id.
+        index       (Dict[Node, int]) : The integer id of each node.
+        indptr      (np.ndarray)      : The edges leaving node i are the ones in [indptr[i], indptr[i + 1]).
+        indices     (np.ndarray)      : The target of each edge, sorted within each node.
+        weights     (np.ndarray)      : The weight of each edge.
+        weights_min (np.ndarray)      : The lower bound of the weight of each edge.
+        weights_max (np.ndarray)      : The upper bound of the weight of each edge.
+    """
+
+    def __init__(self, nodes: List[Node], indptr, indices, weights, weights_min=None, weights_max=None):
+        """Creates a new compiled graph.
+
+        Args:
+            nodes       (List[Node]) : The nodes, by integer id.
+            indptr      (array)      : The edges leaving node i are the ones in [indptr[i], indptr[i + 1]).
+            indices     (array)      : The target of each edge.
+            weights     (array)      : The weight of each edge.
+            weights_min (array)      : The lower bound of the weight of each edge, the weight by default.
+            weights_max (array)      : The upper bound of the weight of each edge, the weight by default.
+        """
+        self.nodes = list(nodes)
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.weights_min = self.weights if weights_min is None else np.asarray(weights_min, dtype=np.float64)
+        self.weights_max = self.weights if weights_max is None else np.asarray(weights_max, dtype=np.float64)
+        # Plain lists are faster than arrays, when accessed one item at a time.
+        indices, weights = self.indices.tolist(), self.weights.tolist()
+        self.adjacency = [
+            list(zip(indices[start:end], weights[start:end]))
+            for start, end in zip(self.indptr[:-1].tolist(), self.indptr[1:].tolist())
+        ]
+
+    @staticmethod
+    def from_graph(graph: 'Graph') -> 'CompiledGraph':
+        """Compiles a graph, calling each weight function once.
+
+        Args:
+            graph (Graph): The graph.
+
+        Returns:
+            CompiledGraph: the compiled graph.
+        """
+        nodes = graph.get_node_list()
+        index = {node: i for i, node in enumerate(nodes)}
+        indptr = [0]
+        indices = []
+        weights = []
+        bounds = []
+        for node in nodes:
+            # Sort the edges by target, so that they do not depend on hashing.
+            for neighbour in sorted(graph.graph.get(node, ()), key=index.__getitem__):
+                indices.append(index[neighbour])
+                weight = graph.get_weight(node, neighbour)
+                weights.append(weight)
+                # Only call the weight function again if it has its own bounds.
+                weight_function = graph.weight_functions[node, neighbour]
+                if hasattr(weight_function, "bounds"):
+                    bounds.append(weight_function.bounds(graph, node, neighbour))
+                else:
+                    bounds.append((weight, weight))
+            indptr.append(len(indices))
+        bounds = np.array(bounds, dtype=np.float64).reshape(len(indices), 2)
+        return CompiledGraph(nodes, indptr, indices, weights, bounds[:, 0], bounds[:, 1])
+
+    def with_weights(self, weights) -> 'CompiledGraph':
+        """Returns the same graph, with other weights (e.g., `weights_max`).
+
+        Args:
+            weights (array): The weight of each edge.
+
+        Returns:
+            CompiledGraph: the new graph.
+        """
+        return CompiledGraph(self.nodes, self.indptr, self.indices, weights)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __repr__(self) -> str:
+        return f"<CompiledGraph: {len(self.nodes)} nodes, {len(self.indices)} edges>"
+
+    def edges(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns the complete list of edges, as arrays.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: The source, target, and weight of each edge.
+        """
+        sources = np.repeat(np.arange(len(self.nodes), dtype=np.int64), np.diff(self.indptr))
+        return sources, self.indices, self.weights
+
+    def shortest_paths(self, source: int, target: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Runs Dijkstra from source, stopping at target if it is given.
+
+        Args:
+            source (int): Source node id.
+            target (int): Target node id, or None to visit all the nodes.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The cost of the path to each node
+                (infinite if not reached), and the node preceding it along the
+                path (-1 for the source and for the nodes not reached).
+        """
+        distances = [math.inf] * len(self.nodes)
+        predecessors = [-1] * len(self.nodes)
+        visited = [False] * len(self.nodes)
+        adjacency = self.adjacency
+        distances[source] = 0.0
+        queue = [(0.0, source)]
+        while queue:
+            cost, node = heapq.heappop(queue)
+            # Skip the nodes already reached through a shorter path.
+            if visited[node]:
+                continue
+            visited[node] = True
+            # Hit the target.
+            if node == target:
+                break
+            # Visit neighbours.
+            for neighbour, weight in adjacency[node]:
+                candidate = cost + weight
+                if candidate < distances[neighbour]:
+                    distances[neighbour] = candidate
+                    predecessors[neighbour] = node
+                    heapq.heappush(queue, (candidate, neighbour))
+        return np.array(distances), np.array(predecessors, dtype=np.int64)
+
+    def find_shortest_path(self, source: int, target: int) -> Tuple[float, List[int]]:
+        """Finds the shortest path from source to target.
+
+        Args:
+            source (int): Source node id.
+            target (int): Target node id.
+
+        Returns:
+            Tuple[float, List[int]]: The path's cost, and the ids of the nodes along the path.
+        """
+        distances, predecessors = self.shortest_paths(source, target)
+        if distances[target] == math.inf:
+            return (float("inf"), [])
+        path = [target]
+        while path[-1] != source:
+            path.append(int(predecessors[path[-1]]))
+        path.reverse()
+        return (float(distances[target]), path)
+
+
 class Graph(object):
-    """Graph data structure, undirected by default."""
+    """Graph data structure, undirected by default.
+
+    Searches call the weight functions every time, hence, they always see the
+    current weights (e.g., of a `LinkDelay` whose `frame_length` was edited).
+    Code running many searches on the same weights should compile the graph
+    once with `freeze`, and search the returned `CompiledGraph` instead.
+    """
 
     def __init__(self, connections: List[Tuple[Node, Node, Callable]], directed: bool = False):
         """Creates a new graph.
@@ -55,6 +262,8 @@ class Graph(object):
         self.graph = collections.defaultdict(set)
         self.weight_functions = collections.defaultdict(set)
         self.directed: bool = directed
+        # The compiled graph built by `from_edges`, dropped when the graph changes.
+        self.compiled = None
         # Add the connections.
         self.add_connections(connections)
 
@@ -75,6 +284,7 @@ class Graph(object):
             target (Node): The target node.
             weight_function (Callable): The weight function.
         """
+        self.changed()
         self.graph[source].add(target)
         self.weight_functions[source, target] = weight_function
         # If the graph is not directed, we add the connection on the oposite direction.
@@ -82,23 +292,60 @@ class Graph(object):
             self.graph[target].add(source)
             self.weight_functions[target, source] = weight_function
 
+    def remove_connection(self, source: Node, target: Node):
+        """Removes the connection between source and target, if any.
+
+        Args:
+            source (Node): The source node.
+            target (Node): The target node.
+        """
+        self.changed()
+        if source in self.graph:
+            self.graph[source].discard(target)
+        self.weight_functions.pop((source, target), None)
+        # If the graph is not directed, we remove the connection on the oposite direction.
+        if not self.directed:
+            if target in self.graph:
+                self.graph[target].discard(source)
+            self.weight_functions.pop((target, source), None)
+
     def remove(self, node: Node):
         """Remove all references to node.
 
         Args:
             node (Node): The node we want to remove.
         """
+        self.changed()
         # Delete the node itself.
-        try:
-            del self.graph[node]
-        except KeyError:
-            pass
-        # Delete the connections to the node.
-        for _, cxns in self.graph.items():
-            try:
-                cxns.remove(node)
-            except KeyError:
-                pass
+        neighbours = self.graph.pop(node, set())
+        for neighbour in neighbours:
+            self.weight_functions.pop((node, neighbour), None)
+        # Delete the connections to the node. In an undirected graph, they
+        # can only come from its neighbours.
+        sources = [source for source in self.graph if node in self.graph[source]] if self.directed else neighbours
+        for source in sources:
+            if source in self.graph:
+                self.graph[source].discard(node)
+            self.weight_functions.pop((source, node), None)
+
+    def changed(self):
+        """Drops the compiled graph built by `from_edges`, it is called by
+        every method adding or removing connections and nodes.
+        """
+        self.compiled = None
+
+    def freeze(self) -> CompiledGraph:
+        """Returns the compiled (CSR) form of the graph, a snapshot where each
+        weight function has been called once. Later changes to the graph, or
+        to the values returned by its weight functions, are not seen by the
+        snapshot: `freeze` must be called again to get them.
+
+        Returns:
+            CompiledGraph: the compiled graph.
+        """
+        if self.compiled is not None:
+            return self.compiled
+        return CompiledGraph.from_graph(self)
 
     def is_connected(self, source: Node, target: Node) -> bool:
         """Is source directly connected to target.
@@ -111,7 +358,7 @@ class Graph(object):
             bool: if source is connected to target.
         """
         return source in self.graph and target in self.graph[source]
-    
+
     def get_weight(self, source: Node, target: Node) -> float:
         """Returns the weight between source and target.
 
@@ -126,7 +373,26 @@ class Graph(object):
             if self.weight_functions[source, target]:
                 return self.weight_functions[source, target](self, source, target)
         return 0
-    
+
+    def get_bounds(self, source: Node, target: Node) -> Tuple[float, float]:
+        """Returns the lower and upper bound of the weight between source and
+        target, which are given by the `bounds` method of the weight function,
+        if it has one, and are both equal to the weight otherwise.
+
+        Args:
+            source (Node): Source node.
+            target (Node): Target node.
+
+        Returns:
+            Tuple[float, float]: the bounds of the weight between source and target.
+        """
+        if self.is_connected(source, target):
+            weight_function = self.weight_functions[source, target]
+            if hasattr(weight_function, "bounds"):
+                return weight_function.bounds(self, source, target)
+        weight = self.get_weight(source, target)
+        return (weight, weight)
+
     def get_edge_list(self) -> List[Tuple[Node, Node]]:
         """Returns the complete list of edges.
 
@@ -138,22 +404,70 @@ class Graph(object):
             for neighbour in neighbours:
                 edge_list.append((source, neighbour))
         return edge_list
-    
+
     def get_node_list(self) -> List[Node]:
         """Returns the complete list of nodes.
 
         Returns:
             List[Node]: The list of nodes.
         """
-        node_list = []
-        for source, neighbours in self.graph.items():
-            if source not in node_list:
-                node_list.append(source)
-            for neighbour in neighbours:
-                if neighbour not in node_list:
-                    node_list.append(neighbour)
-        return node_list
+        # Dictionaries keep the order of insertion, and are looked up in O(1).
+        node_list = dict.fromkeys(self.graph)
+        for neighbours in self.graph.values():
+            node_list.update(dict.fromkeys(neighbours))
+        return list(node_list)
+
+
+    def shortest_paths(self, source: Node) -> Tuple[Dict[Node, float], Dict[Node, Node]]:
+        """Finds the shortest paths from source to every reachable node.
+        Looking up several paths from the same source costs a single search.
+
+        Args:
+            source (Node): Source node.
+
+        Returns:
+            Tuple[Dict[Node, float], Dict[Node, Node]]: The cost of the path to
+                each reachable node, and the node preceding it along the path.
+        """
+        return self._dijkstra(source, None)
 
+    def _dijkstra(self, source: Node, target: Node) -> Tuple[Dict[Node, float], Dict[Node, Node]]:
+        """Runs Dijkstra from source, stopping at target if it is given.
+
+        Args:
+            source (Node): Source node.
+            target (Node): Target node, or None to visit all the nodes.
+
+        Returns:
+            Tuple[Dict[Node, float], Dict[Node, Node]]: The cost of the path to
+                each visited node, and the node preceding it along the path.
+        """
+        distances = {}
+        predecessors = {source: None}
+        best = {source: 0}
+        # Nodes are not comparable, the counter breaks the ties.
+        counter = itertools.count()
+        queue = [(0, next(counter), source)]
+        while queue:
+            cost, _, node = heapq.heappop(queue)
+            # Skip the nodes already reached through a shorter path.
+            if node in distances:
+                continue
+            distances[node] = cost
+            # Hit the target.
+            if node == target:
+                break
+            # Visit neighbours.
+            for neighbour in self.graph.get(node, ()):
+                if neighbour in distances:
+                    continue
+                # Compute the weight using the connection-specific weight function.
+                candidate = cost + self.get_weight(node, neighbour)
+                if (neighbour not in best) or (candidate < best[neighbour]):
+                    best[neighbour] = candidate
+                    predecessors[neighbour] = node
+                    heapq.heappush(queue, (candidate, next(counter), neighbour))
+        return distances, {node: predecessors[node] for node in distances}
 
     def find_shortest_path(self, source: Node, target: Node) -> Tuple[float, List]:
         """Finds the shortest path from source to target.
@@ -165,59 +479,147 @@ class Graph(object):
         Returns:
             Tuple[float, List]: The path's cost, and the path itself.
         """
-        # Create a priority queue and hash set to store visited nodes.
-        queue = Queue()
-        visited = set()
-        queue.put((0, source, []))
-        # Create the empty path.
-        path = []
-        # Traverse graph with BFS.
-        while queue:
-            (cost, node, path) = queue.get()
-            # Visit the node if it was not visited before.
-            if node not in visited:
-                visited.add(node)
-                path = path + [node]
-                # Hit the target.
-                if node == target:
-                    return (cost, path)
-                # Visit neighbours.
-                for neighbour in self.graph[node]:
-                    if neighbour not in visited:
-                        # Compute the weight using the connection-specific weight function.
-                        weight = self.get_weight(node, neighbour)
-                        # Update the queue.
-                        queue.put((cost + weight, neighbour, path))
-        return (float("inf"), [])
-    
+        # Stop the search as soon as the target is reached.
+        distances, predecessors = self._dijkstra(source, target)
+        if target not in distances:
+            return (float("inf"), [])
+        return (distances[target], build_path(predecessors, target))
+
+    def from_edges(nodes: List[Node], sources, targets, weights, directed: bool = False) -> 'Graph':
+        """Builds a graph from an edge list given as arrays, where each edge
+        gets a `ConstantWeight`. The compiled form is built from the arrays
+        directly, without calling the weight functions, and `freeze` returns
+        it until the graph changes.
+
+        Args:
+            nodes (List[Node]): The nodes, by integer id.
+            sources (array): The integer id of the source of each edge.
+            targets (array): The integer id of the target of each edge.
+            weights (array): The weight of each edge.
+            directed (bool, optional): Determines if the graph is directed. Defaults to False.
+
+        Returns:
+            Graph: the new graph.
+        """
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        weights = np.asarray(weights, dtype=np.float64)
+        if not directed:
+            # Each edge is followed by its opposite, so that the last one given wins on both.
+            sources, targets = np.stack((sources, targets), axis=1).ravel(), np.stack((targets, sources), axis=1).ravel()
+            weights = np.repeat(weights, 2)
+        # Sort the edges by source and target, keeping the last of the duplicates.
+        keys = sources * len(nodes) + targets
+        _, last = np.unique(keys[::-1], return_index=True)
+        order = len(keys) - 1 - last
+        sources, targets, weights = sources[order], targets[order], weights[order]
+        indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=len(nodes)), out=indptr[1:])
+        graph = Graph([], directed)
+        # Register every node, in order, so that nodes without edges survive
+        # a rebuild of the compiled graph, and keep their integer id.
+        for node in nodes:
+            graph.graph[node] = set()
+        # Fill the adjacency of each source at once, since the edges are sorted.
+        heads = [nodes[i] for i in targets.tolist()]
+        for i, (start, end) in enumerate(zip(indptr[:-1].tolist(), indptr[1:].tolist())):
+            if start < end:
+                graph.graph[nodes[i]] = set(heads[start:end])
+        tails = [nodes[i] for i in sources.tolist()]
+        graph.weight_functions.update(zip(zip(tails, heads), map(ConstantWeight, weights.tolist())))
+        graph.compiled = CompiledGraph(nodes, indptr, targets, weights)
+        return graph
+
     def write_to_csv(graph: 'Graph', filename: str):
-        """Writes the graph to csv.
+        """Writes the graph to csv, one edge per row (once per pair, if the
+        graph is undirected), after a comment telling if it is directed.
 
         Args:
             graph (Graph): The graph we want to write to csv.
             filename (str): The file where we store the graph.
         """
+        compiled = graph.freeze()
+        sources, targets, weights = compiled.edges()
+        if not graph.directed:
+            keep = sources <= targets
+            sources, targets, weights = sources[keep], targets[keep], weights[keep]
+        ids = [node.id for node in compiled.nodes]
         with open(filename, 'w', newline='') as csvfile:
+            csvfile.write("# directed\n" if graph.directed else "# undirected\n")
             writer = csv.writer(csvfile, delimiter=' ', quotechar='|', quoting=csv.QUOTE_MINIMAL)
-            for source, target in graph.get_edge_list():
-                writer.writerow([source.id, target.id, graph.get_weight(source, target)])
+            # Floats are written with repr, hence, they are read back exactly.
+            writer.writerows(zip(map(ids.__getitem__, sources.tolist()), map(ids.__getitem__, targets.tolist()), weights.tolist()))
 
     def read_from_csv(filename: str) -> 'Graph':
-        """Reads the graph from csv.
+        """Reads the graph from csv. Files whose first line is not the
+        comment telling if the graph is directed are read as undirected.
 
         Args:
             filename (str): The file from which we read the graph.
 
         Returns:
-            Graph: the new graph.
+            Graph: the new graph, whose nodes have string ids.
         """
-        graph = Graph(connections={}, directed=False)
+        directed = False
+        rows = []
         with open(filename, newline='') as csvfile:
             reader = csv.reader(csvfile, delimiter=' ', quotechar='|')
-            for row in reader:
-                graph.add_connection(Node(row[0]), Node(row[1]), lambda graph, node0, node1: float(row[2]))
-        return graph
-    
+            for position, row in enumerate(reader):
+                if (position == 0) and (row in (["#", "directed"], ["#", "undirected"])):
+                    directed = row[1] == "directed"
+                elif row:
+                    rows.append(row)
+        sources, targets, weights = zip(*rows) if rows else ((), (), ())
+        # Intern the nodes, in order of appearance.
+        ids = list(dict.fromkeys(itertools.chain.from_iterable(zip(sources, targets))))
+        index = {id: i for i, id in enumerate(ids)}
+        return Graph.from_edges(
+            [Node(id) for id in ids],
+            np.fromiter(map(index.__getitem__, sources), dtype=np.int64, count=len(rows)),
+            np.fromiter(map(index.__getitem__, targets), dtype=np.int64, count=len(rows)),
+            np.array(weights, dtype=np.float64),
+            directed,
+        )
+
+    def write_edges(graph: 'Graph', directory: str):
+        """Writes the graph as a binary edge list: `edges.npy`, with the
+        source, target, and weight of each edge (once per pair, if the graph
+        is undirected), and `nodes.json`, with the id of each node and if the
+        graph is directed. Ids must be JSON values (e.g., int or str).
+
+        Args:
+            graph (Graph): The graph we want to write.
+            directory (str): The folder where we store the graph.
+        """
+        compiled = graph.freeze()
+        sources, targets, weights = compiled.edges()
+        if not graph.directed:
+            keep = sources <= targets
+            sources, targets, weights = sources[keep], targets[keep], weights[keep]
+        edges = np.empty(len(sources), dtype=EDGE_DTYPE)
+        edges["source"], edges["target"], edges["weight"] = sources, targets, weights
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "edges.npy"), edges)
+        with open(os.path.join(directory, "nodes.json"), "w") as jsonfile:
+            json.dump({"directed": graph.directed, "nodes": [node.id for node in compiled.nodes]}, jsonfile)
+
+    def read_edges(directory: str, mmap_mode: str = "r") -> 'Graph':
+        """Reads a graph written by `write_edges`.
+
+        Args:
+            directory (str): The folder from which we read the graph.
+            mmap_mode (str, optional): How the edge list is memory-mapped (see `numpy.load`),
+                or None to read it in memory. Defaults to "r".
+
+        Returns:
+            Graph: the new graph.
+        """
+        with open(os.path.join(directory, "nodes.json")) as jsonfile:
+            header = json.load(jsonfile)
+        edges = np.load(os.path.join(directory, "edges.npy"), mmap_mode=mmap_mode)
+        nodes = [Node(id) for id in header["nodes"]]
+        return Graph.from_edges(nodes, edges["source"], edges["target"], edges["weight"], header["directed"])
+
     def __str__(self):
         return str([(S, T, self.get_weight(S, T))for (S, T) in self.get_edge_list()])
 
@@ -0,0 +1,558 @@
+"""
+Worst-case and best-case discovery times when the parameters of the entities
+are only known to lie within an interval (e.g., the `initial_delay_min` and
+`initial_delay_max` of a vSOME/IP configuration).
+
+Instead of enumerating the combinations of the parameters, the space of the
+parameters is explored with branch-and-bound: interval arithmetic over the
+formulas of `analysis.py` bounds the discovery time inside a box of
+parameters, and boxes that cannot improve on the best assignment found so far
+are pruned.
+
+When only the communication delay is an interval (e.g., from the jitter of
+the links, see `network.delay_intervals`), the bounds of all the relations of
+a system are computed at once by `communication_delay_bounds`.
+"""
+
+import heapq
+import itertools
+import math
+import sys
+import numpy as np
+
+from typing import Dict, List, Tuple
+from .entities import Client, Entity, Service, System
+from .tables import RelationTable
+from .piecewise import compile_discovery_time
+from . import analysis
+
+# The parameters that can be given as an interval.
+PARAMETERS = [
+    "s.boot_del", "s.init_del", "s.rep_del", "s.cyc_del", "s.ans_del",
+    "c.boot_del", "c.init_del", "c.rep_del",
+]
+
+
+class BoundResult(object):
+    """
+    The worst-case (or best-case) discovery time over the parameter intervals.
+
+    Parameters:
+        value      (float)           : The discovery time reached by the assignment.
+        assignment (Dict[str, float]) : The value of each interval parameter reaching it.
+        bound      (float)           : No assignment gives a larger (for the
+                                       worst-case) or smaller (for the best-case)
+                                       discovery time than this bound.
+        nodes      (int)             : The number of boxes explored.
+    """
+
+    value: float
+    assignment: dict
+    bound: float
+    nodes: int
+
+    def __init__(self, value: float, assignment: dict, bound: float, nodes: int) -> None:
+        self.value = value
+        self.assignment = assignment
+        self.bound = bound
+        self.nodes = nodes
+
+    def __repr__(self) -> str:
+        """
+        Transforms the result into a string.
+
+        Returns:
+            str: the result to string.
+        """
+        return f"<{self.value:.2f} (bound {self.bound:.2f}), {self.assignment}>"
+
+
+def _ceil_log2_ratio(d: float, rep_del: float) -> int:
+    """
+    Computes `ceil(log2((d / rep_del) + 1))` for a positive `d`, otherwise zero.
+    """
+    if d <= 0:
+        return 0
+    if rep_del <= 0:
+        return math.inf
+    return math.ceil(math.log2((d / rep_del) + 1))
+
+
+def _bounds(v: Dict[str, Tuple[float, float]], s: Service, c: Client) -> Tuple[float, float]:
+    """
+    Bounds the discovery time of `timing_analysis` by means of interval
+    arithmetic, when each parameter lies within its interval.
+
+    Args:
+        v (Dict[str, Tuple[float, float]]) : The interval of each parameter, including t_c.
+        s (Service)                        : The service, for its rep_max and offer_mode.
+        c (Client)                         : The client, for its rep_max and find_mode.
+    Returns:
+        Tuple[float, float]: the lower and upper bounds.
+    """
+    t_c_lo, t_c_hi = v["t_c"]
+    s_t_init_lo = v["s.boot_del"][0] + v["s.init_del"][0]
+    s_t_init_hi = v["s.boot_del"][1] + v["s.init_del"][1]
+    c_t_init_lo = v["c.boot_del"][0] + v["c.init_del"][0]
+    c_t_init_hi = v["c.boot_del"][1] + v["c.init_del"][1]
+    bounds = []
+    if s.offer_mode:
+        rep_lo, rep_hi = v["s.rep_del"]
+        cyc_lo, cyc_hi = v["s.cyc_del"]
+        # Compute z_c, and hat(x_c), which grows with z_c and shrinks with rep_del.
+        z_lo = max(v["c.boot_del"][0] - s_t_init_hi, 0)
+        z_hi = max(v["c.boot_del"][1] - s_t_init_lo, 0)
+        x_lo = min(s.rep_max, _ceil_log2_ratio(z_lo - t_c_hi, rep_hi))
+        x_hi = min(s.rep_max, _ceil_log2_ratio(z_hi - t_c_lo, rep_lo))
+        t_rep_lo = (math.pow(2, x_lo) - 1) * rep_lo
+        t_rep_hi = (math.pow(2, x_hi) - 1) * rep_hi
+        # Compute y, from the interval of its numerator.
+        num_lo = z_lo - t_c_hi - (math.pow(2, s.rep_max) - 1) * rep_hi
+        num_hi = z_hi - t_c_lo - (math.pow(2, s.rep_max) - 1) * rep_lo
+        y_lo = math.ceil(num_lo / (cyc_lo if num_lo < 0 else cyc_hi))
+        y_hi = math.ceil(num_hi / (cyc_hi if num_hi < 0 else cyc_lo))
+        # Compute hat(y), which is either y or zero.
+        y_hat_lo = y_hat_hi = None
+        if (y_hi >= 0) and (x_hi >= s.rep_max):
+            y_hat_lo, y_hat_hi = max(y_lo, 0), y_hi
+        if (y_lo < 0) or (x_lo < s.rep_max):
+            y_hat_lo, y_hat_hi = 0, (y_hat_hi or 0)
+        t_cyc_lo = y_hat_lo * cyc_lo
+        t_cyc_hi = y_hat_hi * cyc_hi
+        # The offer is received at the first message sent after the client is
+        # up, i.e., at most one period (the longest gap between two messages)
+        # after max(s_t_init + t_c, c.boot_del).
+        gap = max((math.pow(2, s.rep_max - 1) * rep_hi) if s.rep_max > 0 else 0, cyc_hi)
+        bounds.append((
+            max(s_t_init_lo + t_rep_lo + t_cyc_lo + t_c_lo, s_t_init_lo + t_c_lo, v["c.boot_del"][0]),
+            min(s_t_init_hi + t_rep_hi + t_cyc_hi + t_c_hi, max(s_t_init_hi + t_c_hi, v["c.boot_del"][1]) + gap),
+        ))
+    if c.find_mode:
+        rep_lo, rep_hi = v["c.rep_del"]
+        # Compute z_s, and hat(x_s).
+        z_lo = max(s_t_init_lo - c_t_init_hi, 0)
+        z_hi = max(s_t_init_hi - c_t_init_lo, 0)
+        x_lo = min(c.rep_max, _ceil_log2_ratio(z_lo - t_c_hi, rep_hi))
+        x_hi = min(c.rep_max, _ceil_log2_ratio(z_hi - t_c_lo, rep_lo))
+        t_rep_lo = (math.pow(2, x_lo) - 1) * rep_lo
+        t_rep_hi = (math.pow(2, x_hi) - 1) * rep_hi
+        # Likewise, the find is sent at most one period after the service is
+        # up, unless the repetitions are over.
+        gap = (math.pow(2, c.rep_max - 1) * rep_hi) if c.rep_max > 0 else 0
+        t_last_lo = (math.pow(2, c.rep_max) - 1) * rep_lo
+        bounds.append((
+            max(c_t_init_lo + t_rep_lo, min(s_t_init_lo - t_c_hi, c_t_init_lo + t_last_lo)) + 2 * t_c_lo + v["s.ans_del"][0],
+            min(c_t_init_hi + t_rep_hi, max(c_t_init_hi, s_t_init_hi - t_c_lo) + gap) + 2 * t_c_hi + v["s.ans_del"][1],
+        ))
+    # Case (c) takes the minimum of both.
+    return (min(bound[0] for bound in bounds), min(bound[1] for bound in bounds))
+
+
+def _replace_all(s: Service, c: Client, t_c: float, point: Dict[str, float]) -> Tuple[Service, Client, float]:
+    """
+    Returns the pair, with the parameters set to the given point.
+    """
+    service = {name[2:]: value for name, value in point.items() if name.startswith("s.")}
+    client = {name[2:]: value for name, value in point.items() if name.startswith("c.")}
+    return (s.replace(**service) if service else s), (c.replace(**client) if client else c), point.get("t_c", t_c)
+
+
+def _evaluate(s: Service, c: Client, t_c: float, point: Dict[str, float]) -> float:
+    """
+    Computes the discovery time with the parameters set to the given point.
+    """
+    return analysis.timing_analysis(*_replace_all(s, c, t_c, point))
+
+
+def _line_search(s: Service, c: Client, t_c: float, point: Dict[str, float], name: str, lo: float, hi: float,
+                 sign: int, current: float) -> Tuple[float, Dict[str, float]]:
+    """
+    Finds the best value along one parameter, from the exact piecewise-linear
+    form of the discovery time. Since the discovery time jumps at the
+    breakpoints, the extreme can be approached only from one side: the
+    segments are hence also evaluated right next to their ends.
+
+    Args:
+        s       (Service)          : the service.
+        c       (Client)           : the client.
+        t_c     (float)            : the communication delay.
+        point   (Dict[str, float]) : the starting point.
+        name    (str)              : the parameter to move.
+        lo      (float)            : the start of its interval.
+        hi      (float)            : the end of its interval.
+        sign    (int)              : 1 to maximize, -1 to minimize.
+        current (float)            : the (signed) value at the starting point.
+    Returns:
+        Tuple[float, Dict[str, float]]: the (signed) best value, and its point.
+    """
+    others = {n: v for n, v in point.items() if n != name}
+    f = compile_discovery_time(*_replace_all(s, c, t_c, others), name, lo, hi)
+    points = np.concatenate((
+        f.points,
+        np.nextafter(f.points[:-1], np.inf),
+        np.nextafter(f.points[1:], -np.inf),
+    ))
+    best = int(np.argmax(sign * f(points)))
+    candidate = sign * _evaluate(s, c, t_c, {**others, name: float(points[best])})
+    if candidate > current:
+        return candidate, {**others, name: float(points[best])}
+    return current, point
+
+
+def _relevant(name: str, s: Service, c: Client) -> bool:
+    """
+    Checks if the discovery time depends on the parameter, given the modes.
+    """
+    if name in ("s.rep_del", "s.cyc_del"):
+        return s.offer_mode
+    if name in ("c.rep_del", "s.ans_del"):
+        return c.find_mode
+    return True
+
+
+def _search(s: Service, c: Client, t_c: float, ranges: Dict[str, Tuple[float, float]], maximize: bool,
+            tolerance: float, max_nodes: int) -> BoundResult:
+    """
+    Searches the extreme discovery time of a pair with branch-and-bound.
+    """
+    for name, (lo, hi) in ranges.items():
+        if name not in PARAMETERS:
+            raise ValueError(f"'{name}' cannot be an interval, valid parameters are: {', '.join(PARAMETERS)}")
+        if lo > hi:
+            raise ValueError(f"The interval of '{name}' is empty")
+    sign = 1 if maximize else -1
+    # The discovery time grows with s.ans_del, and ignores the parameters of
+    # the inactive messages: those are fixed at their best end.
+    fixed = {}
+    box = {}
+    for name, (lo, hi) in ranges.items():
+        if (lo == hi) or not _relevant(name, s, c):
+            fixed[name] = lo
+        elif name == "s.ans_del":
+            fixed[name] = hi if maximize else lo
+        else:
+            box[name] = (lo, hi)
+    nominal = {
+        "s.boot_del": s.boot_del, "s.init_del": s.init_del, "s.rep_del": s.rep_del,
+        "s.cyc_del": s.cyc_del, "s.ans_del": s.ans_del, "c.boot_del": c.boot_del,
+        "c.init_del": c.init_del, "c.rep_del": c.rep_del, "t_c": t_c,
+    }
+    width = {name: hi - lo for name, (lo, hi) in box.items()}
+
+    def bound(b: Dict[str, Tuple[float, float]]) -> float:
+        # The bound on the value we are looking for, with the sign applied.
+        v = {name: (value, value) for name, value in nominal.items()}
+        v.update({name: (value, value) for name, value in fixed.items()})
+        v.update(b)
+        lo, hi = _bounds(v, s, c)
+        return hi if maximize else -lo
+
+    def value(point: Dict[str, float]) -> float:
+        return sign * _evaluate(s, c, t_c, {**fixed, **point})
+
+    def improve(candidate: float, point: Dict[str, float]) -> Tuple[float, Dict[str, float]]:
+        # Moves the point along each parameter, to the best value of the line.
+        for name, (lo, hi) in box.items():
+            candidate, point = _line_search(s, c, t_c, {**fixed, **point}, name, lo, hi, sign, candidate)
+            point = {n: point[n] for n in box}
+        return candidate, point
+
+    # Start from the center and the two opposite corners of the box.
+    incumbent, assignment = -math.inf, None
+    for point in (
+        {name: (lo + hi) / 2 for name, (lo, hi) in box.items()},
+        {name: lo for name, (lo, hi) in box.items()},
+        {name: hi for name, (lo, hi) in box.items()},
+    ):
+        candidate = value(point)
+        if candidate > incumbent:
+            incumbent, assignment = candidate, point
+    incumbent, assignment = improve(incumbent, assignment)
+    # Explore the boxes, from the most promising one.
+    counter = itertools.count()
+    heap = [(-bound(box), next(counter), box)]
+    unresolved = -math.inf
+    nodes = 0
+    while heap and (nodes < max_nodes):
+        upper = -heap[0][0]
+        if upper <= incumbent + tolerance:
+            break
+        _, _, current = heapq.heappop(heap)
+        nodes += 1
+        # Split the widest dimension, relatively to the initial intervals.
+        name = max(current, key=lambda n: (current[n][1] - current[n][0]) / width[n] if width[n] else 0)
+        lo, hi = current[name]
+        if (hi - lo) <= 1e-12 * (abs(lo) + abs(hi) + 1):
+            # The box cannot be split any further.
+            unresolved = max(unresolved, upper)
+            continue
+        for child in ({**current, name: (lo, (lo + hi) / 2)}, {**current, name: ((lo + hi) / 2, hi)}):
+            point = {n: (l + h) / 2 for n, (l, h) in child.items()}
+            candidate = value(point)
+            if candidate > incumbent:
+                incumbent, assignment = improve(candidate, point)
+            child_bound = bound(child)
+            if child_bound > incumbent + tolerance:
+                heapq.heappush(heap, (-child_bound, next(counter), child))
+    remaining = -heap[0][0] if heap else -math.inf
+    certified = max(incumbent, remaining, unresolved)
+    return BoundResult(sign * incumbent, {**fixed, **assignment}, sign * certified, nodes)
+
+
+def worst_case(s: Service, c: Client, t_c: float, ranges: Dict[str, Tuple[float, float]],
+               tolerance: float = 1e-3, max_nodes: int = 20000) -> BoundResult:
+    """
+    Finds the largest discovery time of a pair, when some of its parameters
+    lie within an interval.
+
+    Args:
+        s         (Service)                        : the service.
+        c         (Client)                         : the client.
+        t_c       (float)                          : the communication delay.
+        ranges    (Dict[str, Tuple[float, float]]) : the [min, max] interval of some parameters (e.g., "s.init_del").
+        tolerance (float)                          : the search stops when the bound is this close to the value.
+        max_nodes (int)                            : the maximum number of boxes explored.
+    Returns:
+        BoundResult: the worst-case discovery time, and the assignment reaching it.
+    """
+    return _search(s, c, t_c, ranges, True, tolerance, max_nodes)
+
+
+def best_case(s: Service, c: Client, t_c: float, ranges: Dict[str, Tuple[float, float]],
+              tolerance: float = 1e-3, max_nodes: int = 20000) -> BoundResult:
+    """
+    Finds the smallest discovery time of a pair, when some of its parameters
+    lie within an interval.
+
+    Args:
+        s         (Service)                        : the service.
+        c         (Client)                         : the client.
+        t_c       (float)                          : the communication delay.
+        ranges    (Dict[str, Tuple[float, float]]) : the [min, max] interval of some parameters (e.g., "s.init_del").
+        tolerance (float)                          : the search stops when the bound is this close to the value.
+        max_nodes (int)                            : the maximum number of boxes explored.
+    Returns:
+        BoundResult: the best-case discovery time, and the assignment reaching it.
+    """
+    return _search(s, c, t_c, ranges, False, tolerance, max_nodes)
+
+
+def _relation_ranges(relation, ranges: Dict[Entity, Dict[str, Tuple[float, float]]]) -> Dict[str, Tuple[float, float]]:
+    """
+    Collects the intervals of the client and of the service of a relation.
+    """
+    result = {}
+    for prefix, entity in (("s.", relation.service), ("c.", relation.client)):
+        for name, interval in ranges.get(entity, {}).items():
+            result[prefix + name] = interval
+    return result
+
+
+def system_worst_case(system: System, ranges: Dict[Entity, Dict[str, Tuple[float, float]]],
+                      tolerance: float = 1e-3, max_nodes: int = 20000) -> Tuple[List[BoundResult], BoundResult]:
+    """
+    Finds the largest discovery time of each relation, and of the whole
+    system, when some parameters of the entities lie within an interval.
+
+    Since the largest discovery time of the system is the largest one among
+    its relations, each relation is searched on its own. The assignment of
+    the system covers the entities of its slowest relation only, the other
+    entities can take any value within their intervals.
+
+    Args:
+        system    (System)                                 : the system.
+        ranges    (Dict[Entity, Dict[str, Tuple[float, float]]]) : the [min, max] interval of
+                                                              some parameters of some entities
+                                                              (e.g., {S0: {"init_del": (1, 3)}}).
+        tolerance (float)                                  : the search stops when the bound is this close to the value.
+        max_nodes (int)                                    : the maximum number of boxes explored for each relation.
+    Returns:
+        Tuple[List[BoundResult], BoundResult]: the result for each relation,
+            and for the system, whose assignment is keyed by (entity, parameter).
+    """
+    results = [
+        worst_case(relation.service, relation.client, relation.t_c, _relation_ranges(relation, ranges), tolerance, max_nodes)
+        for relation in system.relations
+    ]
+    index = max(range(len(results)), key=lambda i: results[i].value)
+    relation = system.relations[index]
+    assignment = {
+        ((relation.service if name.startswith("s.") else relation.client), name[2:]): value
+        for name, value in results[index].assignment.items()
+    }
+    return results, BoundResult(
+        results[index].value,
+        assignment,
+        max(result.bound for result in results),
+        sum(result.nodes for result in results),
+    )
+
+
+def system_best_case(system: System, ranges: Dict[Entity, Dict[str, Tuple[float, float]]],
+                     tolerance: float = 1e-3, max_nodes: int = 20000) -> Tuple[List[BoundResult], BoundResult]:
+    """
+    Finds the smallest discovery time of each relation, and of the whole
+    system, when some parameters of the entities lie within an interval.
+
+    The discovery time of the system is the largest among its relations, and
+    relations sharing an entity must agree on its parameters; hence, the
+    system is searched over the parameters of all the entities together.
+
+    Args:
+        system    (System)                                 : the system.
+        ranges    (Dict[Entity, Dict[str, Tuple[float, float]]]) : the [min, max] interval of
+                                                              some parameters of some entities
+                                                              (e.g., {S0: {"init_del": (1, 3)}}).
+        tolerance (float)                                  : the search stops when the bound is this close to the value.
+        max_nodes (int)                                    : the maximum number of boxes explored.
+    Returns:
+        Tuple[List[BoundResult], BoundResult]: the result for each relation,
+            and for the system, whose assignment is keyed by (entity, parameter).
+    """
+    results = [
+        best_case(relation.service, relation.client, relation.t_c, _relation_ranges(relation, ranges), tolerance, max_nodes)
+        for relation in system.relations
+    ]
+    keys = [(entity, name) for entity, intervals in ranges.items() for name in intervals if intervals[name][0] < intervals[name][1]]
+    width = {key: ranges[key[0]][key[1]][1] - ranges[key[0]][key[1]][0] for key in keys}
+
+    def restrict(relation, box):
+        # The intervals of the relation's parameters inside the box.
+        v = {}
+        for prefix, entity in (("s.", relation.service), ("c.", relation.client)):
+            for name, interval in ranges.get(entity, {}).items():
+                v[prefix + name] = box.get((entity, name), interval)
+        return v
+
+    def lower(box) -> float:
+        # The system cannot be faster than its slowest relation.
+        result = -math.inf
+        for relation in system.relations:
+            v = {
+                "s.boot_del": relation.service.boot_del, "s.init_del": relation.service.init_del,
+                "s.rep_del": relation.service.rep_del, "s.cyc_del": relation.service.cyc_del,
+                "s.ans_del": relation.service.ans_del, "c.boot_del": relation.client.boot_del,
+                "c.init_del": relation.client.init_del, "c.rep_del": relation.client.rep_del,
+                "t_c": relation.t_c,
+            }
+            v = {name: (value, value) for name, value in v.items()}
+            v.update(restrict(relation, box))
+            result = max(result, _bounds(v, relation.service, relation.client)[0])
+        return result
+
+    def value(point) -> float:
+        return max(
+            _evaluate(relation.service, relation.client, relation.t_c, {name: (lo + hi) / 2 for name, (lo, hi) in restrict(relation, point).items()})
+            for relation in system.relations
+        )
+
+    box = {key: ranges[key[0]][key[1]] for key in keys}
+    fixed = {(entity, name): interval for entity, intervals in ranges.items() for name, interval in intervals.items() if interval[0] == interval[1]}
+    incumbent, assignment = value({**fixed, **box}), {**fixed, **box}
+    counter = itertools.count()
+    heap = [(lower({**fixed, **box}), next(counter), box)]
+    unresolved = math.inf
+    nodes = 0
+    while heap and (nodes < max_nodes) and keys:
+        if heap[0][0] >= incumbent - tolerance:
+            break
+        low, _, current = heapq.heappop(heap)
+        nodes += 1
+        key = max(current, key=lambda k: (current[k][1] - current[k][0]) / width[k])
+        lo, hi = current[key]
+        if (hi - lo) <= 1e-12 * (abs(lo) + abs(hi) + 1):
+            unresolved = min(unresolved, low)
+            continue
+        for child in ({**current, key: (lo, (lo + hi) / 2)}, {**current, key: ((lo + hi) / 2, hi)}):
+            candidate = value({**fixed, **child})
+            if candidate < incumbent:
+                incumbent, assignment = candidate, {**fixed, **child}
+            child_lower = lower({**fixed, **child})
+            if child_lower < incumbent - tolerance:
+                heapq.heappush(heap, (child_lower, next(counter), child))
+    remaining = heap[0][0] if (heap and keys) else math.inf
+    return results, BoundResult(
+        incumbent,
+        {key: (lo + hi) / 2 for key, (lo, hi) in assignment.items()},
+        min(incumbent, remaining, unresolved),
+        nodes,
+    )
+
+
+def _delay_candidates(columns: Dict[str, np.ndarray], lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    """
+    Returns, for each relation, the values of t_c inside [lo, hi] where the
+    discovery time can reach its extremes. The discovery time increases with
+    t_c between the thresholds where hat(x_c), hat(y), or hat(x_s) change,
+    hence, its extremes are reached at the ends of the interval, or at the
+    thresholds (from either side, approached within a relative 1e-12).
+
+    Args:
+        columns (Dict[str, np.ndarray]) : The columns of the relations, see `RelationTable.columns`.
+        lo      (np.ndarray)            : The lower bound of t_c of each relation.
+        hi      (np.ndarray)            : The upper bound of t_c of each relation.
+    Returns:
+        np.ndarray: the candidates, with one row per relation.
+    """
+    s_t_init = columns["s_boot_del"] + columns["s_init_del"]
+    c_t_init = columns["c_boot_del"] + columns["c_init_del"]
+    z_c = np.where(s_t_init < columns["c_boot_del"], columns["c_boot_del"] - s_t_init, 0.0)
+    z_s = np.where(s_t_init > c_t_init, s_t_init - c_t_init, 0.0)
+    thresholds = []
+    # hat(x_c) and hat(x_s) change where z - t_c crosses (2^k - 1) * rep_del.
+    for z, rep_del, rep_max in ((z_c, columns["s_rep_del"], columns["s_rep_max"]), (z_s, columns["c_rep_del"], columns["c_rep_max"])):
+        k = np.arange(int(rep_max.max(initial=0)) + 1)
+        threshold = z[:, None] - (np.ldexp(1.0, k)[None, :] - 1) * rep_del[:, None]
+        thresholds.append(np.where(k[None, :] <= rep_max[:, None], threshold, np.nan))
+    # hat(y) changes where z_c - t_c - (2^rep_max - 1) * rep_del is a multiple
+    # of cyc_del; all the periods are alike, the first and the last are enough.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        a = z_c - (np.ldexp(1.0, columns["s_rep_max"].astype(np.int64)) - 1) * columns["s_rep_del"]
+        first = np.maximum(np.ceil((a - hi) / columns["s_cyc_del"]), 0.0)
+        last = np.floor((a - lo) / columns["s_cyc_del"])
+        thresholds.append(np.stack((a - first * columns["s_cyc_del"], a - last * columns["s_cyc_del"]), axis=1))
+    thresholds = np.concatenate(thresholds, axis=1)
+    delta = 1e-12 * (np.abs(z_c)[:, None] + np.abs(z_s)[:, None] + np.abs(thresholds) + 1)
+    candidates = np.concatenate((lo[:, None], hi[:, None], thresholds, thresholds - delta, thresholds + delta), axis=1)
+    # Unused thresholds fall back to the lower bound.
+    return np.where((candidates >= lo[:, None]) & (candidates <= hi[:, None]), candidates, lo[:, None])
+
+
+def communication_delay_bounds(target, t_c_min, t_c_max, chunk_size: int = 1 << 20) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes the best-case and worst-case discovery time of each relation,
+    when its communication delay is only known to lie within [t_c_min, t_c_max]
+    (e.g., from `network.delay_intervals`), analysing all the relations at once.
+
+    Args:
+        target     (Union[System, RelationTable]) : the system, or its table.
+        t_c_min    (array)                        : the lower bound of the delay of each relation.
+        t_c_max    (array)                        : the upper bound of the delay of each relation.
+        chunk_size (int)                          : the number of (relation, delay) pairs analysed at once.
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: the best-case and the worst-case discovery time of each relation.
+    """
+    table = target if isinstance(target, RelationTable) else RelationTable.from_system(target)
+    columns = table.columns()
+    lo = np.broadcast_to(np.asarray(t_c_min, dtype=np.float64), (len(table),))
+    hi = np.broadcast_to(np.asarray(t_c_max, dtype=np.float64), (len(table),))
+    if np.any(lo > hi):
+        raise ValueError("The lower bound of the delay must not exceed its upper bound")
+    best = np.empty(len(table))
+    worst = np.empty(len(table))
+    # Each relation has at most this many candidates.
+    count = 2 + 3 * (int(columns["s_rep_max"].max(initial=0)) + int(columns["c_rep_max"].max(initial=0)) + 4)
+    rows = max(1, chunk_size // count)
+    for start in range(0, len(table), rows):
+        # Analyse each chunk of relations at all their candidates.
+        chunk = {name: column[start:start + rows] for name, column in columns.items()}
+        candidates = _delay_candidates(chunk, lo[start:start + rows], hi[start:start + rows])
+        chunk = {name: column[:, None] for name, column in chunk.items()}
+        chunk["t_c"] = candidates
+        terms = analysis._timing_analysis_arrays(**chunk)
+        # Check that at least one of them is active.
+        if np.any(terms["case"] == analysis.CASE_INVALID):
+            sys.exit("Either service or client must be active (sending find/offer messages)")
+        best[start:start + rows] = terms["discovery_time"].min(axis=1)
+        worst[start:start + rows] = terms["discovery_time"].max(axis=1)
+    return best, worst
@@ -2,6 +2,7 @@
 SOME/IP support functions and variables.
 """
 
+import collections
 import logging
 
 
@@ -20,3 +21,66 @@ def create_logger(name: str):
     # add ch to logger
     logger.addHandler(ch)
     return logger
+
+
+# The analysis functions neither format nor log anything.
+TRACE_OFF = 0
+# The analysis functions send formatted records to their logger.
+TRACE_LOG = 1
+# The analysis functions store (function, inputs, output) records in a buffer.
+TRACE_BUFFER = 2
+
+
+class Tracer(object):
+    """
+    Collects the intermediate values computed by the analysis functions.
+
+    The analysis functions check `mode` before tracing anything, hence, when it
+    is TRACE_OFF, they neither format strings nor call the logger.
+
+    Parameters:
+        logger (logging.Logger) : The logger receiving the formatted records.
+        mode   (int)            : Either TRACE_OFF, or a combination of TRACE_LOG and TRACE_BUFFER.
+        buffer (deque)          : The bounded buffer of (function, inputs, output) records.
+    """
+
+    def __init__(self, logger: logging.Logger, mode: int = TRACE_LOG, buffer_size: int = 4096):
+        """
+        The constructor for the tracer.
+
+        Args:
+            logger      (logging.Logger) : The logger receiving the formatted records.
+            mode        (int)            : The tracing mode.
+            buffer_size (int)            : The maximum number of records kept in the buffer.
+        """
+        self.logger = logger
+        self.mode = mode
+        self.buffer = collections.deque(maxlen=buffer_size)
+
+    def set_mode(self, mode: int, buffer_size: int = None):
+        """
+        Changes the tracing mode, and optionally the size of the buffer.
+
+        Args:
+            mode        (int) : The tracing mode.
+            buffer_size (int) : The maximum number of records kept in the buffer.
+        """
+        self.mode = mode
+        if (buffer_size is not None) and (buffer_size != self.buffer.maxlen):
+            self.buffer = collections.deque(self.buffer, maxlen=buffer_size)
+
+    def trace(self, function: str, inputs: tuple, output, message: str, level: int = logging.DEBUG):
+        """
+        Traces the computation of a value.
+
+        Args:
+            function (str)   : The name of the function.
+            inputs   (tuple) : The inputs of the function.
+            output           : The computed value.
+            message  (str)   : The format of the log record, applied to the inputs and the output.
+            level    (int)   : The level of the log record.
+        """
+        if self.mode & TRACE_BUFFER:
+            self.buffer.append((function, inputs, output))
+        if self.mode & TRACE_LOG:
+            self.logger.log(level, message, *inputs, output)
@@ -0,0 +1,275 @@
+"""
+Monte Carlo estimation of the distribution of the discovery times, when the
+parameters of the entities are drawn at random (e.g., vSOME/IP draws the
+initial wait uniformly between `initial_delay_min` and `initial_delay_max`).
+
+The samples are drawn and analysed in blocks, and only a fixed-size
+histogram of the discovery times is kept for each relation (and for the
+whole system), so that the memory does not grow with the number of samples.
+"""
+
+import numpy as np
+
+from typing import Dict, Sequence, Tuple, Union
+from .entities import System
+from .tables import RelationTable
+from .intervals import _bounds
+from . import analysis
+
+# The parameters of the entities that can be drawn at random.
+PARAMETERS = ["boot_del", "init_del", "rep_del", "cyc_del", "ans_del"]
+
+
+class QuantileSketch(object):
+    """
+    Keeps the histograms of several streams of samples (one per row), each
+    with a fixed number of bins over a known range, together with the exact
+    minimum, maximum, and sum of the samples. Quantiles are estimated with an
+    error of at most one bin width.
+
+    Parameters:
+        lo      (np.ndarray) : The start of the range of each row.
+        hi      (np.ndarray) : The end of the range of each row.
+        counts  (np.ndarray) : The histogram of each row.
+        minimum (np.ndarray) : The smallest sample of each row.
+        maximum (np.ndarray) : The largest sample of each row.
+        total   (np.ndarray) : The sum of the samples of each row.
+        count   (int)        : The number of samples in each row.
+    """
+
+    lo: np.ndarray
+    hi: np.ndarray
+    counts: np.ndarray
+    minimum: np.ndarray
+    maximum: np.ndarray
+    total: np.ndarray
+    count: int
+
+    def __init__(self, lo, hi, bins: int = 4096) -> None:
+        """
+        The constructor for quantile sketches.
+
+        Args:
+            lo   (array) : The start of the range of each row.
+            hi   (array) : The end of the range of each row.
+            bins (int)   : The number of bins of each histogram.
+        """
+        self.lo = np.asarray(lo, dtype=np.float64)
+        self.hi = np.maximum(np.asarray(hi, dtype=np.float64), self.lo)
+        self.counts = np.zeros((len(self.lo), bins), dtype=np.int64)
+        self.minimum = np.full(len(self.lo), np.inf)
+        self.maximum = np.full(len(self.lo), -np.inf)
+        self.total = np.zeros(len(self.lo))
+        self.count = 0
+
+    def __len__(self) -> int:
+        return len(self.lo)
+
+    def __repr__(self) -> str:
+        """
+        Transforms the sketch into a string.
+
+        Returns:
+            str: the sketch to string.
+        """
+        return f"<QuantileSketch: {len(self)} rows, {self.counts.shape[1]} bins, {self.count} samples>"
+
+    @property
+    def mean(self) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: the mean of the samples of each row.
+        """
+        return self.total / self.count
+
+    def update(self, samples: np.ndarray) -> None:
+        """
+        Adds a block of samples.
+
+        Args:
+            samples (np.ndarray) : The samples, with shape (number of samples, number of rows).
+        """
+        rows, bins = self.counts.shape
+        width = np.where(self.hi > self.lo, self.hi - self.lo, 1.0)
+        # Find the bin of each sample, the ends of the range are clipped.
+        index = np.floor((samples - self.lo) / width * bins)
+        index = np.clip(index, 0, bins - 1).astype(np.int64)
+        index += np.arange(rows, dtype=np.int64) * bins
+        self.counts += np.bincount(index.ravel(), minlength=rows * bins).reshape(rows, bins)
+        self.minimum = np.minimum(self.minimum, samples.min(axis=0))
+        self.maximum = np.maximum(self.maximum, samples.max(axis=0))
+        self.total += samples.sum(axis=0)
+        self.count += samples.shape[0]
+
+    def quantile(self, q: Union[float, Sequence[float]]) -> np.ndarray:
+        """
+        Estimates the quantiles of each row, interpolating inside the bins.
+
+        Args:
+            q (Union[float, Sequence[float]]) : The quantiles, between 0 and 1.
+        Returns:
+            np.ndarray: the quantiles, with one entry per row (and one row per quantile, if q is a sequence).
+        """
+        q = np.asarray(q, dtype=np.float64)
+        if np.any((q < 0) | (q > 1)):
+            raise ValueError("The quantiles must be between 0 and 1")
+        if not self.count:
+            raise ValueError("The sketch does not contain any sample")
+        rows, bins = self.counts.shape
+        cumulative = np.cumsum(self.counts, axis=1)
+        width = (self.hi - self.lo) / bins
+        result = np.empty((np.size(q), rows))
+        for i, rank in enumerate(np.atleast_1d(q) * self.count):
+            # Find the bin containing the rank, and where the rank lies inside it.
+            position = np.minimum(np.count_nonzero(cumulative < rank, axis=1), bins - 1)
+            before = np.where(position > 0, cumulative[np.arange(rows), position - 1], 0)
+            inside = self.counts[np.arange(rows), position]
+            fraction = np.where(inside > 0, (rank - before) / np.maximum(inside, 1), 0.0)
+            result[i] = self.lo + (position + fraction) * width
+        result = np.clip(result, self.minimum, self.maximum)
+        return result if q.ndim else result[0]
+
+
+class Distribution(object):
+    """
+    The distributions of the discovery times estimated by `monte_carlo`.
+
+    Parameters:
+        table     (RelationTable)  : The analysed relations.
+        relations (QuantileSketch) : The sketch of the discovery time of each relation.
+        system    (QuantileSketch) : The sketch of the discovery time of the system.
+        samples   (int)            : The number of samples.
+    """
+
+    table: RelationTable
+    relations: QuantileSketch
+    system: QuantileSketch
+    samples: int
+
+    def __init__(self, table: RelationTable, relations: QuantileSketch, system: QuantileSketch) -> None:
+        self.table = table
+        self.relations = relations
+        self.system = system
+        self.samples = system.count
+
+    def __repr__(self) -> str:
+        """
+        Transforms the distribution into a string.
+
+        Returns:
+            str: the distribution to string.
+        """
+        return f"<Distribution: {len(self.table)} relations, {self.samples} samples>"
+
+    def quantile(self, q: Union[float, Sequence[float]]) -> np.ndarray:
+        """
+        Estimates the quantiles of the discovery time of each relation.
+
+        Args:
+            q (Union[float, Sequence[float]]) : The quantiles, between 0 and 1 (e.g., 0.99).
+        Returns:
+            np.ndarray: the quantiles, with one entry per relation (and one row per quantile, if q is a sequence).
+        """
+        return self.relations.quantile(q)
+
+    def system_quantile(self, q: Union[float, Sequence[float]]) -> Union[float, np.ndarray]:
+        """
+        Estimates the quantiles of the discovery time of the whole system, i.e.,
+        of the largest discovery time among the relations of each sample.
+
+        Args:
+            q (Union[float, Sequence[float]]) : The quantiles, between 0 and 1 (e.g., 0.99).
+        Returns:
+            Union[float, np.ndarray]: the quantile, or one entry per quantile if q is a sequence.
+        """
+        result = self.system.quantile(q)
+        return result[..., 0] if np.ndim(q) else float(result[0])
+
+
+def _relation_bounds(table: RelationTable, lo: Dict[str, np.ndarray], hi: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Bounds the discovery time of each relation, when the parameters of each
+    entity lie between `lo` and `hi`.
+    """
+    entities = table.entities.to_entities()
+    result_lo = np.empty(len(table))
+    result_hi = np.empty(len(table))
+    for index, (c, s, t_c) in enumerate(zip(table.client.tolist(), table.service.tolist(), table.t_c.tolist())):
+        v = {"t_c": (t_c, t_c)}
+        for prefix, entity in (("s.", s), ("c.", c)):
+            for name in PARAMETERS:
+                v[prefix + name] = (float(lo[name][entity]), float(hi[name][entity]))
+        result_lo[index], result_hi[index] = _bounds(v, entities[s], entities[c])
+    return result_lo, result_hi
+
+
+def monte_carlo(target: Union[System, RelationTable], ranges: Dict[object, Dict[str, Tuple[float, float]]],
+                samples: int = 1000000, block_size: int = None, bins: int = 4096, seed: int = None) -> Distribution:
+    """
+    Estimates the distribution of the discovery times, when some parameters
+    of the entities are drawn uniformly within an interval. Each entity draws
+    its parameters once per sample, hence, relations sharing an entity see the
+    same values.
+
+    Args:
+        target     (Union[System, RelationTable])          : the system, or its table.
+        ranges     (Dict[object, Dict[str, Tuple[float, float]]]) : the [min, max] interval
+                                                             of some parameters of some entities (e.g.,
+                                                             {S0: {"init_del": (0, 10)}}); entities are
+                                                             given by their index when target is a table.
+        samples    (int)                                   : the number of samples.
+        block_size (int)                                   : the number of samples analysed at once;
+                                                             by default, about 2^20 relations are analysed at once.
+        bins       (int)                                   : the number of bins of the histograms.
+        seed       (int)                                   : the seed of the random generator.
+    Returns:
+        Distribution: the distributions of the discovery times.
+    """
+    if isinstance(target, System):
+        table = RelationTable.from_system(target)
+        # Find the index of each entity, in the same order of the table.
+        index: Dict[int, int] = {}
+        for relation in target.relations:
+            for entity in (relation.client, relation.service):
+                index.setdefault(id(entity), len(index))
+        ranges = {index[id(entity)]: intervals for entity, intervals in ranges.items()}
+    else:
+        table = target
+    columns = table.columns()
+    if not np.all(columns["s_offer_mode"] | columns["c_find_mode"]):
+        raise ValueError("Either service or client must be active (sending find/offer messages)")
+    # Collect the intervals of each parameter, as columns over the entities.
+    entities = table.entities
+    lo = {name: getattr(entities, name).copy() for name in PARAMETERS}
+    hi = {name: getattr(entities, name).copy() for name in PARAMETERS}
+    for entity, intervals in ranges.items():
+        for name, (start, end) in intervals.items():
+            if name not in PARAMETERS:
+                raise ValueError(f"'{name}' cannot be drawn at random, valid parameters are: {', '.join(PARAMETERS)}")
+            if start > end:
+                raise ValueError(f"The interval of '{name}' is empty")
+            lo[name][entity], hi[name][entity] = start, end
+    drawn = {name: np.flatnonzero(lo[name] < hi[name]) for name in PARAMETERS}
+    # The histograms range over the bounds of the discovery times.
+    relation_lo, relation_hi = _relation_bounds(table, lo, hi)
+    relations = QuantileSketch(relation_lo, relation_hi, bins)
+    system = QuantileSketch([relation_lo.max(initial=0.0)], [relation_hi.max(initial=0.0)], bins)
+    rng = np.random.default_rng(seed)
+    block_size = block_size or max(1, (1 << 20) // max(len(table), 1))
+    for start in range(0, samples, block_size):
+        size = min(block_size, samples - start)
+        # Draw the parameters of the entities, and gather them by relation.
+        block = dict(columns)
+        for name in PARAMETERS:
+            if not len(drawn[name]):
+                continue
+            values = np.broadcast_to(getattr(entities, name), (size, len(entities))).copy()
+            values[:, drawn[name]] = rng.uniform(lo[name][drawn[name]], hi[name][drawn[name]], (size, len(drawn[name])))
+            block["s_" + name] = values[:, table.service]
+            block["c_" + name] = values[:, table.client]
+        block.pop("c_cyc_del", None)
+        block.pop("c_ans_del", None)
+        discovery_time = np.broadcast_to(analysis._timing_analysis_arrays(**block)["discovery_time"], (size, len(table)))
+        relations.update(discovery_time)
+        system.update(discovery_time.max(axis=1, initial=0.0)[:, None])
+    return Distribution(table, relations, system)
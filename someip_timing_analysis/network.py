@@ -0,0 +1,255 @@
+"""
+Networks of devices hosting SOME/IP entities, and their compilation into
+systems, where the communication delay of each relation is the delay of the
+path between the devices hosting its client and its service.
+"""
+
+import numpy as np
+
+from typing import Dict, List, Mapping, Tuple, Union
+from .entities import Entity, Client, Service, Relation, System
+from .graph import Node, Graph
+from .tables import EntityTable, RelationTable
+from .delays import DelayMatrix, delay_matrix
+
+
+class Device(Node):
+    """A device of the network, which hosts a set of entities.
+
+    Parameters:
+        id         (int)          : The unique id.
+        entities   (List[Entity]) : The entities hosted by the device.
+        base_delay (float)        : The software delay added by each hosted entity, in SECONDS.
+    """
+
+    def __init__(self, id: int, entities: List[Entity] = None, base_delay: float = 0):
+        """It takes as input the unique id, and the list of entities.
+
+        Args:
+            id (int): The unique id.
+            entities (List[Entity]): The list of entities.
+            base_delay (float, optional): Base software delay. Defaults to 0.
+        """
+        Node.__init__(self, id)
+        self.entities: List[Entity] = entities if entities is not None else []
+        self.base_delay = base_delay
+
+    def device_delay(self) -> float:
+        """Get the device delay in SECONDS.
+
+        Returns:
+            float: The device delay.
+        """
+        return len(self.entities) * self.base_delay
+
+
+class LinkDelay(object):
+    """Weight function of a link, i.e., the time needed to transmit a frame
+    over it, (frame_length * 8) / link_speed, in SECONDS. Unlike a lambda, it
+    can be sent to other processes. The actual delay of the link can exceed
+    the transmission time by up to `jitter` (e.g., queueing in a switch).
+
+    Parameters:
+        frame_length (int)   : The length of the frame, in bytes.
+        link_speed   (float) : The speed of the link, in bits per second.
+        jitter       (float) : The largest additional delay, in SECONDS.
+    """
+
+    __slots__ = ("frame_length", "link_speed", "jitter")
+
+    def __init__(self, frame_length: int, link_speed: float, jitter: float = 0):
+        self.frame_length = frame_length
+        self.link_speed = link_speed
+        self.jitter = jitter
+
+    def __call__(self, graph: Graph, source: Node, target: Node) -> float:
+        return (self.frame_length * 8) / self.link_speed
+
+    def bounds(self, graph: Graph, source: Node, target: Node) -> Tuple[float, float]:
+        delay = self(graph, source, target)
+        return (delay, delay + self.jitter)
+
+    def __repr__(self) -> str:
+        return f"<LinkDelay: {self.frame_length} B, {self.link_speed} bit/s, {self.jitter} s jitter>"
+
+
+def device_delay(node: Node) -> float:
+    """Get the delay of a node in SECONDS, which is zero if it is not a device.
+
+    Args:
+        node (Node): The node.
+
+    Returns:
+        float: The delay of the node.
+    """
+    return node.device_delay() if isinstance(node, Device) else 0.0
+
+
+def device_to_device_delay(graph: Graph, source: Device, target: Device) -> float:
+    """Get the delay between two devices in SECONDS.
+
+    Args:
+        graph (Graph): The network.
+        source (Device): Source device.
+        target (Device): Target device.
+
+    Returns:
+        float: The delay between the devices.
+    """
+    if source == target:
+        return 0
+    # Find the path with the lowest delay.
+    (delay, _) = graph.find_shortest_path(source, target)
+    # Compute the total delay.
+    return source.device_delay() + delay + target.device_delay()
+
+
+def get_placement(graph: Graph) -> Dict[Entity, Device]:
+    """Finds the device hosting each entity.
+
+    Args:
+        graph (Graph): The network.
+
+    Returns:
+        Dict[Entity, Device]: The device of each entity.
+    """
+    placement = {}
+    for node in graph.get_node_list():
+        for entity in getattr(node, "entities", ()):
+            placement[entity] = node
+    return placement
+
+
+def compile_system(graph: Graph, requirements: List[Tuple[Client, Service]], placement: Dict[Entity, Device] = None,
+                   time_scale: float = 1e03, as_table: bool = False, delays: DelayMatrix = None,
+                   workers: int = None, cache_dir: str = None) -> Union[System, RelationTable]:
+    """Builds the system of a network, where the communication delay of each
+    relation is the delay between the devices hosting its client and its
+    service (see `device_to_device_delay`). The delays between all the
+    devices are computed once, with `delay_matrix`.
+
+    Args:
+        graph        (Graph)                     : The network of devices, whose weights are in SECONDS.
+        requirements (List[Tuple[Client, Service]]) : The services required by each client.
+        placement    (Dict[Entity, Device])      : The device hosting each entity; by default,
+                                                   entities are hosted by the devices listing them.
+                                                   The delay of a device is always `device_delay()`.
+        time_scale   (float)                     : Converts the delays to the unit of the analysis
+                                                   (by default, from SECONDS to MILLISECONDS).
+        as_table     (bool)                      : If the relations are returned as a RelationTable.
+        delays       (DelayMatrix)               : The delays between the devices, computed if not given.
+        workers      (int)                       : The number of worker processes, see `delay_matrix`.
+        cache_dir    (str)                       : The folder caching the delays, see `delay_matrix`.
+
+    Returns:
+        Union[System, RelationTable]: the system, or its table.
+    """
+    if placement is None:
+        placement = get_placement(graph)
+    if delays is None:
+        delays = delay_matrix(graph, device_delay, workers=workers, cache_dir=cache_dir)
+    # The position of the device hosting each entity, by entity identity.
+    location: Dict[int, int] = {}
+    for entity, device in placement.items():
+        location[id(entity)] = delays.index[device]
+    # Intern the entities, in order of appearance.
+    entities: List[Entity] = []
+    index: Dict[int, int] = {}
+    client = np.empty(len(requirements), dtype=np.int64)
+    service = np.empty(len(requirements), dtype=np.int64)
+    for position, pair in enumerate(requirements):
+        for column, entity in zip((client, service), pair):
+            key = id(entity)
+            if key not in index:
+                if key not in location:
+                    raise ValueError(f"The entity '{entity.name}' is not hosted by any device")
+                index[key] = len(entities)
+                entities.append(entity)
+            column[position] = index[key]
+    hosts = np.fromiter((location[id(entity)] for entity in entities), dtype=np.int64, count=len(entities))
+    t_c = delays.lookup(hosts[client], hosts[service]) * time_scale
+    unreachable = np.flatnonzero(np.isinf(t_c))
+    if len(unreachable):
+        c, s = requirements[unreachable[0]]
+        raise ValueError(f"The service '{s.name}' cannot be reached from the client '{c.name}'")
+    if as_table:
+        return RelationTable(EntityTable.from_entities(entities), client, service, t_c)
+    return System([Relation(c, s, delay) for (c, s), delay in zip(requirements, t_c.tolist())])
+
+
+def get_hosts(system: System, index: Mapping[Node, int], placement: Dict[Entity, Device]) -> Tuple[np.ndarray, np.ndarray]:
+    """Finds the position of the devices hosting the client and the service
+    of each relation, inside a DelayMatrix (or DynamicDelays).
+
+    Args:
+        system    (System)               : The system.
+        index     (Mapping[Node, int])   : The position of each device (e.g., `DelayMatrix.index`).
+        placement (Dict[Entity, Device]) : The device hosting each entity (e.g., from `get_placement`).
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: the position of the client's device, and of the service's device.
+    """
+    location = {id(entity): index[device] for entity, device in placement.items()}
+    client = np.fromiter((location[id(relation.client)] for relation in system.relations), dtype=np.int64, count=len(system.relations))
+    service = np.fromiter((location[id(relation.service)] for relation in system.relations), dtype=np.int64, count=len(system.relations))
+    return client, service
+
+
+def refresh_relations(target: Union[System, RelationTable], hosts: Tuple[np.ndarray, np.ndarray], delays: DelayMatrix,
+                      changed: np.ndarray, time_scale: float = 1e03) -> np.ndarray:
+    """Updates the communication delay of the relations whose devices are
+    marked by `changed` (e.g., the result of an update of DynamicDelays),
+    which are the only ones whose discovery time must be computed again.
+    Relations whose devices cannot reach each other get an infinite delay.
+
+    Args:
+        target     (Union[System, RelationTable])  : The system, or its table, updated in place.
+        hosts      (Tuple[np.ndarray, np.ndarray]) : The devices of each relation, see `get_hosts`.
+        delays     (DelayMatrix)                   : The current delays between the devices.
+        changed    (np.ndarray)                    : changed[i, j] is True if the delay from the i-th
+                                                     device to the j-th one changed.
+        time_scale (float)                         : Converts the delays to the unit of the analysis.
+
+    Returns:
+        np.ndarray: the indices of the updated relations.
+    """
+    client, service = hosts
+    affected = np.flatnonzero(changed[client, service])
+    t_c = delays.lookup(client[affected], service[affected]) * time_scale
+    if isinstance(target, RelationTable):
+        target.t_c[affected] = t_c
+    else:
+        for index, delay in zip(affected.tolist(), t_c.tolist()):
+            target.relations[index].t_c = delay
+    return affected
+
+
+def delay_intervals(graph: Graph, system: System, placement: Dict[Entity, Device] = None, time_scale: float = 1e03,
+                    workers: int = None, cache_dir: str = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Computes the interval of the communication delay of each relation,
+    when the delay of each link lies within the bounds of `Graph.get_bounds`.
+
+    The lower bound is the shortest path with the lower bounds of the links,
+    the upper bound is the shortest path with the upper bounds, i.e., the
+    delay along the route with the smallest worst-case delay.
+
+    Args:
+        graph      (Graph)                : The network of devices, whose weights are in SECONDS.
+        system     (System)               : The system.
+        placement  (Dict[Entity, Device]) : The device hosting each entity; by default, entities
+                                            are hosted by the devices listing them.
+        time_scale (float)                : Converts the delays to the unit of the analysis.
+        workers    (int)                  : The number of worker processes, see `delay_matrix`.
+        cache_dir  (str)                  : The folder caching the delays, see `delay_matrix`.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: the lower and upper bound of the delay of each relation.
+    """
+    if placement is None:
+        placement = get_placement(graph)
+    result = []
+    for weights in ("min", "max"):
+        delays = delay_matrix(graph, device_delay, workers=workers, cache_dir=cache_dir, weights=weights)
+        client, service = get_hosts(system, delays.index, placement)
+        result.append(delays.lookup(client, service) * time_scale)
+    return result[0], result[1]
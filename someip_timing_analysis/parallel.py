@@ -0,0 +1,237 @@
+"""
+Timing analysis of whole systems over a pool of worker processes.
+"""
+
+import os
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple, Union
+from .entities import Relation, System
+from .tables import EntityTable, RelationTable, deduplicate
+from .storage import open_snapshot
+from . import analysis
+
+# The entities of the system being analysed, set once in each worker.
+_entities: EntityTable = None
+
+# The snapshot being analysed, opened once in each worker.
+_snapshot: RelationTable = None
+
+
+class AnalysisError(object):
+    """
+    Records a relation that could not be analysed, in place of its result.
+
+    Parameters:
+        index    (int)      : The position of the relation inside the system.
+        relation (Relation) : The relation.
+        message  (str)      : The reason why it could not be analysed.
+    """
+
+    index: int
+    relation: Relation
+    message: str
+
+    def __init__(self, index: int, relation: Relation, message: str) -> None:
+        self.index = index
+        self.relation = relation
+        self.message = message
+
+    def __repr__(self) -> str:
+        """
+        Transforms the error into a string.
+
+        Returns:
+            str: the error to string.
+        """
+        return f"<AnalysisError {self.index},{self.relation}: {self.message}>"
+
+
+def _initialize(entities: EntityTable):
+    """
+    Stores the entity table inside the worker, so that it is sent only once.
+
+    Args:
+        entities (EntityTable) : The entities of the system.
+    """
+    global _entities
+    _entities = entities
+
+
+def _analyse(entities: EntityTable, chunk: Tuple[np.ndarray, np.ndarray, np.ndarray, bool]) -> dict:
+    """
+    Analyses a chunk of relations.
+
+    Args:
+        entities (EntityTable) : The entities of the system.
+        chunk    (Tuple[np.ndarray, np.ndarray, np.ndarray, bool]) : The client
+            indices, the service indices, the communication delays, and if
+            the details are required.
+    Returns:
+        dict: the terms computed by the batch analysis.
+    """
+    client, service, t_c, details = chunk
+    terms = analysis._timing_analysis_arrays(**RelationTable(entities, client, service, t_c).columns())
+    if details:
+        return terms
+    return {"case": terms["case"], "discovery_time": terms["discovery_time"]}
+
+
+def _analyse_chunk(chunk: Tuple[np.ndarray, np.ndarray, np.ndarray, bool]) -> dict:
+    """
+    Analyses a chunk of relations inside a worker, see `_analyse`.
+
+    Args:
+        chunk (Tuple[np.ndarray, np.ndarray, np.ndarray, bool]) : The chunk.
+    Returns:
+        dict: the terms computed by the batch analysis.
+    """
+    return _analyse(_entities, chunk)
+
+
+def _open_snapshot(directory: str):
+    """
+    Maps the snapshot inside the worker, so that only its path is sent.
+
+    Args:
+        directory (str) : The folder of the snapshot.
+    """
+    global _snapshot
+    _snapshot = open_snapshot(directory)
+
+
+def _analyse_slice(snapshot: RelationTable, bounds: Tuple[int, int]) -> np.ndarray:
+    """
+    Analyses a range of relations of a snapshot.
+
+    Args:
+        snapshot (RelationTable)   : The mapped snapshot.
+        bounds   (Tuple[int, int]) : The first relation, and the one after the last.
+    Returns:
+        np.ndarray: the discovery time of each relation, NaN if it cannot be analysed.
+    """
+    start, end = bounds
+    table = RelationTable(snapshot.entities, snapshot.client[start:end], snapshot.service[start:end], snapshot.t_c[start:end])
+    return analysis._timing_analysis_arrays(**table.columns())["discovery_time"]
+
+
+def _analyse_range(bounds: Tuple[int, int]) -> np.ndarray:
+    """
+    Analyses a range of relations of the snapshot inside a worker, see `_analyse_slice`.
+
+    Args:
+        bounds (Tuple[int, int]) : The first relation, and the one after the last.
+    Returns:
+        np.ndarray: the discovery time of each relation, NaN if it cannot be analysed.
+    """
+    return _analyse_slice(_snapshot, bounds)
+
+
+def _run(system: System, details: bool, workers: int, chunk_size: int) -> dict:
+    """
+    Splits the system in chunks of relations, and analyses them in parallel.
+
+    Args:
+        system     (System) : The system.
+        details    (bool)   : If the details of the discovery times are required.
+        workers    (int)    : The number of worker processes.
+        chunk_size (int)    : The number of relations sent to a worker at once.
+    Returns:
+        dict: the terms computed by the batch analysis, for the whole system.
+    """
+    # Analyse each distinct key once, and copy the results back to the relations.
+    dedup = deduplicate(system)
+    table = dedup.table
+    chunks = [
+        (table.client[start:start + chunk_size], table.service[start:start + chunk_size],
+         table.t_c[start:start + chunk_size], details)
+        for start in range(0, len(table), chunk_size)
+    ]
+    if not chunks:
+        return analysis._timing_analysis_arrays(**table.columns())
+    workers = workers or os.cpu_count() or 1
+    if (workers == 1) or (len(chunks) == 1):
+        # The globals are only set inside the workers, they would keep the table alive.
+        parts = [_analyse(table.entities, chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=_initialize, initargs=(table.entities,)) as executor:
+            # Map keeps the results in the same order of the chunks.
+            parts = list(executor.map(_analyse_chunk, chunks))
+    return {key: dedup.scatter(np.concatenate([part[key] for part in parts])) for key in parts[0]}
+
+
+def compute_discovery_times(system: System, workers: int = None, chunk_size: int = 65536) -> List[Union[Tuple[float, Relation], AnalysisError]]:
+    """Computes the discovery time for all the relations in the system, using a pool of processes.
+
+    Args:
+        system     (System) : The list of client/service pairs composing the system.
+        workers    (int)    : The number of worker processes. Defaults to the number of CPUs.
+        chunk_size (int)    : The number of relations sent to a worker at once.
+
+    Returns:
+        List[Union[Tuple[float, Relation], AnalysisError]]: the list of all the
+            (discovery time, relation) pairs for the entire system, in the same
+            order; a relation that cannot be analysed gets an AnalysisError.
+    """
+    terms = _run(system, False, workers, chunk_size)
+    invalid = (terms["case"] == analysis.CASE_INVALID).tolist()
+    return [
+        AnalysisError(index, relation, "Either service or client must be active (sending find/offer messages)")
+        if error else (discovery_time, relation)
+        for index, (relation, discovery_time, error) in enumerate(zip(system.relations, terms["discovery_time"].tolist(), invalid))
+    ]
+
+
+def compute_discovery_times_full_details(system: System, workers: int = None, chunk_size: int = 65536) -> List[Union[analysis.Result, AnalysisError]]:
+    """Computes the discovery time, and its details, for all the relations in the system, using a pool of processes.
+
+    Args:
+        system     (System) : The list of client/service pairs composing the system.
+        workers    (int)    : The number of worker processes. Defaults to the number of CPUs.
+        chunk_size (int)    : The number of relations sent to a worker at once.
+
+    Returns:
+        List[Union[Result, AnalysisError]]: the list of results, one for each
+            relation in the same order; a relation that cannot be analysed gets
+            an AnalysisError.
+    """
+    terms = _run(system, True, workers, chunk_size)
+    results = analysis._results_from_arrays(
+        terms,
+        [relation.client for relation in system.relations],
+        [relation.service for relation in system.relations],
+    )
+    for index in np.flatnonzero(terms["case"] == analysis.CASE_INVALID).tolist():
+        results[index] = AnalysisError(index, system.relations[index], "Either service or client must be active (sending find/offer messages)")
+    return results
+
+
+def compute_snapshot_discovery_times(directory: str, workers: int = None, chunk_size: int = 65536) -> np.ndarray:
+    """Computes the discovery time for all the relations of a snapshot (see
+    `storage.write_snapshot`), using a pool of processes. Each worker maps the
+    snapshot on its own, and receives only the ranges of relations to analyse.
+
+    Args:
+        directory  (str) : The folder of the snapshot.
+        workers    (int) : The number of worker processes. Defaults to the number of CPUs.
+        chunk_size (int) : The number of relations analysed by a worker at once.
+
+    Returns:
+        np.ndarray: the discovery time of each relation, in the same order; a
+            relation that cannot be analysed gets NaN.
+    """
+    snapshot = open_snapshot(directory)
+    size = len(snapshot)
+    chunks = [(start, min(start + chunk_size, size)) for start in range(0, size, chunk_size)]
+    if not chunks:
+        return np.empty(0)
+    workers = workers or os.cpu_count() or 1
+    if (workers == 1) or (len(chunks) == 1):
+        # The globals are only set inside the workers, they would keep the mapping alive.
+        parts = [_analyse_slice(snapshot, chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=_open_snapshot, initargs=(directory,)) as executor:
+            # Map keeps the results in the same order of the chunks.
+            parts = list(executor.map(_analyse_range, chunks))
+    return np.concatenate(parts)
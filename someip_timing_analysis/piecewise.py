@@ -0,0 +1,284 @@
+"""
+Exact piecewise-linear form of the discovery time, as a function of one
+parameter of a client/service pair.
+
+Every quantity of the analysis is either linear in the parameter, or it
+changes value only when a linear function of the parameter changes sign
+(e.g., the `math.ceil(math.log2(...))` of `compute_x_c` changes only when
+`z_c - t_c` crosses `(2^k - 1) * s.rep_del`). Hence, the discovery time is
+linear between the roots of those functions, and the whole axis can be
+compiled by walking from one root to the next.
+"""
+
+import math
+import numpy as np
+
+from typing import Dict, List
+from .entities import Client, Service
+from . import analysis
+
+# The parameters along which the discovery time can be compiled.
+PARAMETERS = [
+    "s.boot_del", "s.init_del", "s.rep_del", "s.cyc_del", "s.ans_del",
+    "c.boot_del", "c.init_del", "c.rep_del", "t_c",
+]
+
+
+class _Linear(object):
+    """
+    A linear function `a + b * p` of the parameter `p`.
+    """
+
+    __slots__ = ("a", "b")
+
+    def __init__(self, a: float, b: float = 0.0) -> None:
+        self.a = a
+        self.b = b
+
+    def __add__(self, other: '_Linear') -> '_Linear':
+        return _Linear(self.a + other.a, self.b + other.b)
+
+    def __sub__(self, other: '_Linear') -> '_Linear':
+        return _Linear(self.a - other.a, self.b - other.b)
+
+    def scale(self, k: float) -> '_Linear':
+        return _Linear(self.a * k, self.b * k)
+
+    def at(self, p: float) -> float:
+        return self.a + self.b * p
+
+
+class _Region(object):
+    """
+    Evaluates the sign of linear functions right after the point `p`, and
+    tracks where the first of them changes sign.
+
+    Parameters:
+        p   (float) : The start of the region.
+        end (float) : The end of the region, i.e., the first root after `p`.
+    """
+
+    def __init__(self, p: float, end: float) -> None:
+        self.p = p
+        self.end = end
+
+    def positive(self, f: _Linear, register: bool = True) -> bool:
+        """
+        Checks if `f > 0` right after `p`.
+
+        Args:
+            f        (_Linear) : The linear function.
+            register (bool)    : If the root of `f` bounds the region.
+        Returns:
+            bool: if `f` is positive right after `p`.
+        """
+        value = f.at(self.p)
+        tolerance = 1e-12 * (abs(f.a) + abs(f.b * self.p) + 1)
+        if abs(value) <= tolerance:
+            # The function is (almost) zero at p, its slope decides.
+            result = f.b > 0
+        else:
+            result = value > 0
+        if register and (f.b != 0):
+            root = -f.a / f.b
+            if root > self.p + 1e-12 * (abs(self.p) + 1):
+                self.end = min(self.end, root)
+        return result
+
+
+def _hat_x(region: _Region, d: _Linear, rep_del: _Linear, rep_max: int) -> int:
+    """
+    Computes `min(rep_max, ceil(log2((d / rep_del) + 1)))` for a positive `d`,
+    i.e., the smallest k such that `d <= (2^k - 1) * rep_del`.
+    """
+    for k in range(1, rep_max + 1):
+        if not region.positive(d - rep_del.scale(math.pow(2, k) - 1)):
+            return k
+    return rep_max
+
+
+def _discovery_time(region: _Region, v: Dict[str, _Linear], s_rep_max: int, c_rep_max: int, offer_mode: bool, find_mode: bool) -> _Linear:
+    """
+    Follows `timing_analysis`, computing the discovery time as a linear
+    function valid right after the start of the region.
+    """
+    zero = _Linear(0.0)
+    s_t_init = v["s.boot_del"] + v["s.init_del"]
+    c_t_init = v["c.boot_del"] + v["c.init_del"]
+    t_c = v["t_c"]
+    timing_a = timing_b = None
+    if offer_mode:
+        # Compute z_c, and hat(x_c).
+        z_c = (v["c.boot_del"] - s_t_init) if region.positive(v["c.boot_del"] - s_t_init) else zero
+        x_c_hat = _hat_x(region, z_c - t_c, v["s.rep_del"], s_rep_max) if region.positive(z_c - t_c) else 0
+        t_rep = v["s.rep_del"].scale(math.pow(2, x_c_hat) - 1)
+        # Compute y, i.e., the integer k with `k - 1 < num / cyc_del <= k`.
+        num = z_c - t_c - v["s.rep_del"].scale(math.pow(2, s_rep_max) - 1)
+        cyc_del = v["s.cyc_del"]
+        y = math.ceil(num.at(region.p) / cyc_del.at(region.p))
+        while not region.positive(num - cyc_del.scale(y - 1), False):
+            y -= 1
+        while region.positive(num - cyc_del.scale(y), False):
+            y += 1
+        region.positive(num - cyc_del.scale(y - 1))
+        region.positive(num - cyc_del.scale(y))
+        y_hat = y if ((y >= 0) and (x_c_hat >= s_rep_max)) else 0
+        t_cyc = cyc_del.scale(y_hat)
+        timing_a = s_t_init + t_rep + t_cyc + t_c
+    if find_mode:
+        # Compute z_s, and hat(x_s).
+        z_s = (s_t_init - c_t_init) if region.positive(s_t_init - c_t_init) else zero
+        x_s_hat = _hat_x(region, z_s - t_c, v["c.rep_del"], c_rep_max) if region.positive(z_s - t_c) else 0
+        t_rep = v["c.rep_del"].scale(math.pow(2, x_s_hat) - 1)
+        timing_b = c_t_init + t_rep + t_c + v["s.ans_del"] + t_c
+    if timing_a is None:
+        return timing_b
+    if timing_b is None:
+        return timing_a
+    return timing_b if region.positive(timing_a - timing_b) else timing_a
+
+
+class PiecewiseLinear(object):
+    """
+    The discovery time of a client/service pair along one parameter, over an
+    interval. The interval is split by the breakpoints in open segments where
+    the discovery time is linear; the value at each breakpoint (and at the
+    ends of the interval) is stored separately, since it might belong to
+    either of the adjacent segments.
+
+    Parameters:
+        parameter  (str)        : The parameter (e.g., "c.boot_del").
+        points     (np.ndarray) : The start of the interval, the breakpoints, and the end of the interval.
+        values     (np.ndarray) : The discovery time at each point.
+        slopes     (np.ndarray) : The slope of each segment.
+        intercepts (np.ndarray) : The intercept of each segment.
+    """
+
+    parameter: str
+    points: np.ndarray
+    values: np.ndarray
+    slopes: np.ndarray
+    intercepts: np.ndarray
+
+    def __init__(self, parameter: str, points, values, slopes, intercepts) -> None:
+        self.parameter = parameter
+        self.points = np.asarray(points, dtype=np.float64)
+        self.values = np.asarray(values, dtype=np.float64)
+        self.slopes = np.asarray(slopes, dtype=np.float64)
+        self.intercepts = np.asarray(intercepts, dtype=np.float64)
+
+    def __len__(self) -> int:
+        """
+        Returns:
+            int: the number of segments.
+        """
+        return len(self.slopes)
+
+    def __repr__(self) -> str:
+        """
+        Transforms the function into a string.
+
+        Returns:
+            str: the function to string.
+        """
+        return f"<{self.parameter} in [{self.points[0]}, {self.points[-1]}], {len(self)} segments>"
+
+    @property
+    def breakpoints(self) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: the points where the discovery time changes formula.
+        """
+        return self.points[1:-1]
+
+    def __call__(self, x):
+        """
+        Evaluates the discovery time, using a binary search on the breakpoints.
+
+        Args:
+            x (array) : The values of the parameter, inside the interval.
+        Returns:
+            array: the discovery times.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        if np.any((x < self.points[0]) | (x > self.points[-1])):
+            raise ValueError(f"The values must be inside [{self.points[0]}, {self.points[-1]}]")
+        position = np.searchsorted(self.points, x, side="right") - 1
+        segment = np.minimum(position, len(self) - 1)
+        result = np.where(
+            self.points[position] == x,
+            self.values[position],
+            self.intercepts[segment] + self.slopes[segment] * x,
+        )
+        return result if result.ndim else float(result)
+
+
+def _replace(s: Service, c: Client, t_c: float, parameter: str, value: float):
+    """
+    Returns the pair, with the parameter set to the given value.
+    """
+    if parameter == "t_c":
+        return s, c, value
+    target, name = parameter.split(".")
+    if target == "s":
+        return s.replace(**{name: value}), c, t_c
+    return s, c.replace(**{name: value}), t_c
+
+
+def compile_discovery_time(s: Service, c: Client, t_c: float, parameter: str, lo: float, hi: float) -> PiecewiseLinear:
+    """
+    Compiles the discovery time of `timing_analysis` as an exact
+    piecewise-linear function of one parameter, over the interval [lo, hi].
+    The other parameters keep the values of the given pair.
+
+    Args:
+        s         (Service) : the service.
+        c         (Client)  : the client.
+        t_c       (float)   : the communication delay.
+        parameter (str)     : the parameter (e.g., "c.boot_del", "s.init_del", or "t_c").
+        lo        (float)   : the start of the interval.
+        hi        (float)   : the end of the interval.
+    Returns:
+        PiecewiseLinear: the discovery time along the parameter.
+    """
+    if parameter not in PARAMETERS:
+        raise ValueError(f"Cannot compile along '{parameter}', valid parameters are: {', '.join(PARAMETERS)}")
+    if not (s.offer_mode or c.find_mode):
+        raise ValueError("Either service or client must be active (sending find/offer messages)")
+    if not lo < hi:
+        raise ValueError("The interval must not be empty")
+    # Every parameter is a constant, except the one we compile along.
+    v = {
+        "s.boot_del": _Linear(s.boot_del), "s.init_del": _Linear(s.init_del),
+        "s.rep_del": _Linear(s.rep_del), "s.cyc_del": _Linear(s.cyc_del),
+        "s.ans_del": _Linear(s.ans_del), "c.boot_del": _Linear(c.boot_del),
+        "c.init_del": _Linear(c.init_del), "c.rep_del": _Linear(c.rep_del),
+        "t_c": _Linear(t_c),
+    }
+    v[parameter] = _Linear(0.0, 1.0)
+    # Walk along the interval, from one breakpoint to the next.
+    points: List[float] = [lo]
+    slopes: List[float] = []
+    intercepts: List[float] = []
+    while points[-1] < hi:
+        region = _Region(points[-1], hi)
+        f = _discovery_time(region, v, s.rep_max, c.rep_max, s.offer_mode, c.find_mode)
+        points.append(region.end)
+        slopes.append(f.b)
+        intercepts.append(f.a)
+    # Compute the exact value at each point.
+    values = [analysis.timing_analysis(*_replace(s, c, t_c, parameter, point)) for point in points]
+    # Merge the segments that are separated by a breakpoint only on paper.
+    keep = [0]
+    for i in range(1, len(points) - 1):
+        if (slopes[i] == slopes[keep[-1]]) and (intercepts[i] == intercepts[keep[-1]]) and \
+                (values[i] == intercepts[i] + slopes[i] * points[i]):
+            continue
+        keep.append(i)
+    return PiecewiseLinear(
+        parameter,
+        [points[i] for i in keep] + [points[-1]],
+        [values[i] for i in keep] + [values[-1]],
+        [slopes[i] for i in keep],
+        [intercepts[i] for i in keep],
+    )
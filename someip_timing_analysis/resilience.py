@@ -0,0 +1,294 @@
+"""
+Resilience of a network to the failure of a single link (N-1 analysis): for
+each link, the worst discovery time of the system when that link is down and
+the messages take the replacement paths.
+
+The shortest path trees of the intact network are computed once. When a
+link fails, only the paths from a client's device to the devices below the
+link, in the tree of that device, can change: they are found again by a
+Dijkstra limited to that subtree, and only the relations whose communication
+delay changed are analysed again.
+"""
+
+import heapq
+import math
+import os
+import sys
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+from .entities import Entity, System
+from .graph import Node, Graph
+from .tables import RelationTable
+from .delays import shortest_path_trees
+from .network import Device, device_delay, get_placement, get_hosts
+from . import analysis
+
+# The state of the analysis, set once in each worker.
+_state: dict = None
+
+
+class LinkFailure(object):
+    """
+    The effect of the failure of a link on the discovery times of a system.
+
+    Parameters:
+        source         (Node)  : The device at one end of the link.
+        target         (Node)  : The device at the other end of the link.
+        discovery_time (float) : The worst discovery time of the system, infinite if some
+                                 service cannot be reached anymore.
+        relation       (int)   : The index of the relation with the worst discovery time.
+        affected       (int)   : The number of relations whose communication delay changed.
+        disconnected   (int)   : The number of relations whose service cannot be reached anymore.
+    """
+
+    source: Node
+    target: Node
+    discovery_time: float
+    relation: int
+    affected: int
+    disconnected: int
+
+    def __init__(self, source: Node, target: Node, discovery_time: float, relation: int, affected: int, disconnected: int) -> None:
+        self.source = source
+        self.target = target
+        self.discovery_time = discovery_time
+        self.relation = relation
+        self.affected = affected
+        self.disconnected = disconnected
+
+    def __repr__(self) -> str:
+        """
+        Transforms the failure into a string.
+
+        Returns:
+            str: the failure to string.
+        """
+        return f"<LinkFailure {self.source}-{self.target}: {self.discovery_time:.2f}, {self.affected} affected, {self.disconnected} disconnected>"
+
+
+def _initialize(state: dict):
+    """
+    Stores the state of the analysis inside the worker, so that it is sent only once.
+
+    Args:
+        state (dict) : The state of the analysis.
+    """
+    global _state
+    _state = state
+
+
+def _euler_tour(source: int, predecessors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Numbers the nodes of the shortest path tree of source in depth-first
+    order, so that t is below v in the tree if tin[v] <= tin[t] < tout[v].
+
+    Args:
+        source       (int)        : The root of the tree.
+        predecessors (np.ndarray) : The node preceding each node in the tree.
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: tin and tout of each node, -1 for the nodes not reached.
+    """
+    children = [[] for _ in range(len(predecessors))]
+    for node, parent in enumerate(predecessors.tolist()):
+        if parent >= 0:
+            children[parent].append(node)
+    tin = [-1] * len(predecessors)
+    tout = [-1] * len(predecessors)
+    counter = 0
+    stack = [(source, False)]
+    while stack:
+        node, done = stack.pop()
+        if done:
+            tout[node] = counter
+            continue
+        tin[node] = counter
+        counter += 1
+        stack.append((node, True))
+        stack.extend((child, False) for child in children[node])
+    return np.array(tin, dtype=np.int64), np.array(tout, dtype=np.int64)
+
+
+def _replacement_paths(row: List[float], below: List[int], failed: Tuple[int, int]) -> Dict[int, float]:
+    """
+    Finds the shortest paths from a source to the nodes below the failed
+    edge in its tree, which are the only ones changing: the others keep
+    their distance, and the search starts from the edges entering the subtree.
+
+    Args:
+        row    (List[float])     : The distance of each node from the source, in the intact graph.
+        below  (List[int])       : The nodes below the failed edge.
+        failed (Tuple[int, int]) : The failed edge.
+    Returns:
+        Dict[int, float]: the new distance of the nodes below the failed edge, which can be reached.
+    """
+    forward, backward = _state["forward"], _state["backward"]
+    inside = set(below)
+    queue = []
+    for node in below:
+        best = math.inf
+        for neighbour, weight in backward[node]:
+            if (neighbour not in inside) and (row[neighbour] + weight < best) and ((neighbour, node) != failed):
+                best = row[neighbour] + weight
+        if best < math.inf:
+            queue.append((best, node))
+    heapq.heapify(queue)
+    distances = {}
+    while queue:
+        cost, node = heapq.heappop(queue)
+        # Skip the nodes already reached through a shorter path.
+        if node in distances:
+            continue
+        distances[node] = cost
+        # Visit the neighbours inside the subtree.
+        for neighbour, weight in forward[node]:
+            if (neighbour in inside) and (neighbour not in distances):
+                heapq.heappush(queue, (cost + weight, neighbour))
+    return distances
+
+
+def _fail_chunk(links: List[Tuple[int, int]]) -> List[Tuple[float, int, int, int]]:
+    """
+    Analyses the failure of each of the links inside a worker.
+
+    Args:
+        links (List[Tuple[int, int]]) : The links, as pairs of node ids.
+    Returns:
+        List[Tuple[float, int, int, int]]: for each link, the worst discovery time, its relation,
+            and the number of affected and disconnected relations.
+    """
+    distances: np.ndarray = _state["distances"]
+    predecessors: np.ndarray = _state["predecessors"]
+    tin, tout = _state["tin"], _state["tout"]
+    node_delays = _state["node_delays"]
+    table: RelationTable = _state["table"]
+    client_hosts, service_hosts = _state["hosts"]
+    discovery_time: np.ndarray = _state["discovery_time"]
+    results = []
+    for source, target in links:
+        edges = [(source, target)] if _state["directed"] else [(source, target), (target, source)]
+        affected, t_c = [], []
+        for u, v in edges:
+            # The devices hosting a client, whose shortest path tree uses the edge.
+            users = (predecessors[:, v] == u) & _state["is_client_host"]
+            if not np.any(users):
+                continue
+            # The relations whose service is below the edge, in the tree of the client's device.
+            candidates = np.flatnonzero(users[client_hosts])
+            c, s = client_hosts[candidates], service_hosts[candidates]
+            inside = (tin[c, v] <= tin[c, s]) & (tin[c, s] < tout[c, v])
+            candidates, c, s = candidates[inside], c[inside], s[inside]
+            for host in np.unique(c).tolist():
+                below = np.flatnonzero((tin[host] >= tin[host, v]) & (tin[host] < tout[host, v]))
+                replaced = _replacement_paths(distances[host].tolist(), below.tolist(), (u, v))
+                selected = c == host
+                affected.append(candidates[selected])
+                t_c.append(np.array([replaced.get(node, np.inf) for node in s[selected].tolist()]) + node_delays[host] + node_delays[s[selected]])
+        affected = np.concatenate(affected) if affected else np.empty(0, dtype=np.int64)
+        t_c = np.concatenate(t_c) * _state["time_scale"] if t_c else np.empty(0)
+        # Analyse the affected relations again, and merge them with the others.
+        changed = ~np.isclose(t_c, table.t_c[affected], rtol=1e-12, atol=0.0)
+        affected, t_c = affected[changed], t_c[changed]
+        reachable = np.isfinite(t_c)
+        updated = np.full(len(affected), np.inf)
+        if np.any(reachable):
+            subset = RelationTable(table.entities, table.client[affected[reachable]], table.service[affected[reachable]], t_c[reachable])
+            updated[reachable] = analysis._timing_analysis_arrays(**subset.columns())["discovery_time"]
+        worst, relation = -np.inf, -1
+        if len(affected):
+            relation = int(affected[np.argmax(updated)])
+            worst = float(updated.max())
+        # The worst among the relations not affected, in decreasing order of discovery time.
+        excluded = set(affected.tolist())
+        for index in _state["order"]:
+            if index not in excluded:
+                if discovery_time[index] > worst:
+                    worst, relation = float(discovery_time[index]), index
+                break
+        if relation < 0:
+            worst = 0.0
+        results.append((worst, relation, len(affected), int(np.count_nonzero(~reachable))))
+    return results
+
+
+def link_failures(graph: Graph, system: System, placement: Dict[Entity, Device] = None, time_scale: float = 1e03,
+                  workers: int = None, chunk_size: int = 16) -> List[LinkFailure]:
+    """
+    Computes the worst discovery time of the system when each link of the
+    network fails, one at a time. The communication delay of each relation
+    is computed from the network, as `network.compile_system` does.
+
+    Args:
+        graph      (Graph)                : The network of devices, whose weights are in SECONDS.
+        system     (System)               : The system.
+        placement  (Dict[Entity, Device]) : The device hosting each entity; by default, entities
+                                            are hosted by the devices listing them.
+        time_scale (float)                : Converts the delays to the unit of the analysis.
+        workers    (int)                  : The number of worker processes. Defaults to the number of CPUs.
+        chunk_size (int)                  : The number of links sent to a worker at once.
+    Returns:
+        List[LinkFailure]: the failure of each link (each pair of opposite edges, if the
+            graph is undirected), in the same order of `CompiledGraph.edges`.
+    """
+    if placement is None:
+        placement = get_placement(graph)
+    compiled = graph.freeze()
+    distances, predecessors = shortest_path_trees(compiled, None, workers)
+    node_delays = np.array([device_delay(node) for node in compiled.nodes], dtype=np.float64).reshape(len(compiled))
+    client_hosts, service_hosts = get_hosts(system, compiled.index, placement)
+    table = RelationTable.from_system(system)
+    # The delays of the intact network.
+    table.t_c = (distances[client_hosts, service_hosts] + node_delays[client_hosts] + node_delays[service_hosts]) * time_scale
+    table.t_c[client_hosts == service_hosts] = 0.0
+    terms = analysis._timing_analysis_arrays(**table.columns())
+    # Check that at least one of them is active.
+    if np.any(terms["case"] == analysis.CASE_INVALID):
+        sys.exit("Either service or client must be active (sending find/offer messages)")
+    discovery_time = np.where(np.isfinite(table.t_c), terms["discovery_time"], np.inf)
+    is_client_host = np.zeros(len(compiled), dtype=bool)
+    is_client_host[client_hosts] = True
+    # The trees of the devices hosting a client, numbered in depth-first order.
+    tin = np.full((len(compiled), len(compiled)), -1, dtype=np.int64)
+    tout = np.full((len(compiled), len(compiled)), -1, dtype=np.int64)
+    for host in np.flatnonzero(is_client_host).tolist():
+        tin[host], tout[host] = _euler_tour(host, predecessors[host])
+    # The edges entering each node, to start the search of the replacement paths.
+    backward = [[] for _ in range(len(compiled))]
+    for source, target, weight in zip(*[array.tolist() for array in compiled.edges()]):
+        backward[target].append((source, weight))
+    state = {
+        "directed": graph.directed,
+        "distances": distances,
+        "predecessors": predecessors,
+        "tin": tin,
+        "tout": tout,
+        "forward": compiled.adjacency,
+        "backward": backward,
+        "node_delays": node_delays,
+        "time_scale": time_scale,
+        "table": table,
+        "hosts": (client_hosts, service_hosts),
+        "is_client_host": is_client_host,
+        "discovery_time": discovery_time,
+        "order": np.argsort(-discovery_time, kind="stable").tolist(),
+    }
+    # Each link of an undirected graph is kept once.
+    sources, targets, _ = compiled.edges()
+    if not graph.directed:
+        keep = sources < targets
+        sources, targets = sources[keep], targets[keep]
+    links = list(zip(sources.tolist(), targets.tolist()))
+    chunks = [links[start:start + chunk_size] for start in range(0, len(links), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+    if (workers == 1) or (len(chunks) <= 1):
+        _initialize(state)
+        parts = [_fail_chunk(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=_initialize, initargs=(state,)) as executor:
+            # Map keeps the results in the same order of the chunks.
+            parts = list(executor.map(_fail_chunk, chunks))
+    return [
+        LinkFailure(compiled.nodes[source], compiled.nodes[target], *result)
+        for (source, target), result in zip(links, (result for part in parts for result in part))
+    ]
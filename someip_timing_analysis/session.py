@@ -0,0 +1,147 @@
+"""
+Incremental timing analysis of a system, which is re-analysed only where it
+changes.
+"""
+
+import heapq
+import collections
+
+from typing import Dict, Iterable, List, Tuple
+from .entities import Entity, Relation, System
+from . import analysis
+
+
+class AnalysisSession(object):
+    """
+    Keeps the results of the analysis of a system, and when an entity or the
+    communication delay of a relation changes, it re-analyses only the
+    relations involving it.
+
+    Parameters:
+        system  (System)       : The analysed system.
+        results (List[Result]) : The result of each relation, in the same order.
+    """
+
+    system: System
+    results: List[analysis.Result]
+
+    def __init__(self, system: System) -> None:
+        """
+        Analyses the whole system once.
+
+        Args:
+            system (System) : The system.
+        """
+        self.system = system
+        self.results = analysis.compute_discovery_times_full_details(system)
+        # Reverse indices, from entities and relations to positions.
+        self._relations_of: Dict[int, List[int]] = collections.defaultdict(list)
+        self._positions_of: Dict[int, List[int]] = collections.defaultdict(list)
+        for index, relation in enumerate(system.relations):
+            self._relations_of[id(relation.client)].append(index)
+            self._relations_of[id(relation.service)].append(index)
+            self._positions_of[id(relation)].append(index)
+        # Max-heap of (-discovery time, index, version); entries whose version
+        # is older than the one of their relation are discarded lazily.
+        self._versions = [0] * len(self.results)
+        self._heap = [(-result.discovery_time, index, 0) for index, result in enumerate(self.results)]
+        heapq.heapify(self._heap)
+
+    def _reanalyse(self, indices: Iterable[int]) -> List[int]:
+        """
+        Re-analyses the given relations, and updates the heap.
+
+        Args:
+            indices (Iterable[int]) : The positions of the relations.
+        Returns:
+            List[int]: the sorted positions of the re-analysed relations.
+        """
+        indices = sorted(set(indices))
+        for index in indices:
+            relation = self.system.relations[index]
+            result = analysis.timing_analysis_full_details(relation.service, relation.client, relation.t_c)
+            self.results[index] = result
+            self._versions[index] += 1
+            heapq.heappush(self._heap, (-result.discovery_time, index, self._versions[index]))
+        # Rebuild the heap when it is mostly made of stale entries.
+        if len(self._heap) > 2 * len(self.results) + 64:
+            self._heap = [(-result.discovery_time, index, self._versions[index]) for index, result in enumerate(self.results)]
+            heapq.heapify(self._heap)
+        return indices
+
+    def update_entity(self, entity: Entity, **parameters) -> List[int]:
+        """
+        Changes some parameters of an entity, and re-analyses the relations
+        involving it.
+
+        Args:
+            entity     (Entity) : The client or service.
+            parameters          : The new values, by parameter name (e.g., boot_del=2).
+        Returns:
+            List[int]: the positions of the re-analysed relations.
+        """
+        entity.update(**parameters)
+        return self._reanalyse(self._relations_of.get(id(entity), []))
+
+    def update_relation(self, relation: Relation, t_c: float) -> List[int]:
+        """
+        Changes the communication delay of a relation, and re-analyses it.
+
+        Args:
+            relation (Relation) : The relation.
+            t_c      (float)    : The new communication delay.
+        Returns:
+            List[int]: the positions of the re-analysed relations.
+        """
+        relation.t_c = t_c
+        return self._reanalyse(self._positions_of.get(id(relation), []))
+
+    def apply(self, entity_patches: Iterable[Tuple[Entity, dict]] = (), relation_patches: Iterable[Tuple[Relation, float]] = ()) -> List[int]:
+        """
+        Applies several changes at once, and re-analyses every affected
+        relation only once.
+
+        Args:
+            entity_patches   (Iterable[Tuple[Entity, dict]])     : The (entity, new parameters) pairs.
+            relation_patches (Iterable[Tuple[Relation, float]])  : The (relation, new communication delay) pairs.
+        Returns:
+            List[int]: the positions of the re-analysed relations.
+        """
+        affected = set()
+        for entity, parameters in entity_patches:
+            entity.update(**parameters)
+            affected.update(self._relations_of.get(id(entity), []))
+        for relation, t_c in relation_patches:
+            relation.t_c = t_c
+            affected.update(self._positions_of.get(id(relation), []))
+        return self._reanalyse(affected)
+
+    def compute_discovery_times(self) -> List[Tuple[float, Relation]]:
+        """Returns the current discovery time of all the relations in the system.
+
+        Returns:
+            List[Tuple[float, Relation]]: the list of all the (discovery time, relation) pairs for the entire system
+        """
+        return [(result.discovery_time, relation) for result, relation in zip(self.results, self.system.relations)]
+
+    def get_highest_impact_relation(self) -> Tuple[float, Relation]:
+        """Returns the relation that has the highest impact on the discovery time for the whole system.
+
+        Returns:
+            Tuple[float, Relation]: the (discovery time, relation) with the highest impact on the system.
+        """
+        if not self.results:
+            raise ValueError("The system has no relations")
+        # Discard the stale entries on top of the heap.
+        while self._heap[0][2] != self._versions[self._heap[0][1]]:
+            heapq.heappop(self._heap)
+        discovery_time, index, _ = self._heap[0]
+        return (-discovery_time, self.system.relations[index])
+
+    def get_highest_discovery_time(self) -> float:
+        """Returns the current discovery time for the entire system.
+
+        Returns:
+            float: the discovery time for the entire system.
+        """
+        return self.get_highest_impact_relation()[0]
@@ -0,0 +1,132 @@
+"""
+Discrete-event simulation of the SOME/IP Service Discovery, which provides
+the actual instant when each client discovers each of its services.
+
+Every entity follows its phases: after the Boot and Initial Wait phases, it
+sends the messages of the Repetition Phase at its `rep_times`, then services
+keep sending offers every `cyc_del` in the Main Phase. A client discovers a
+service when it receives an offer after booting, or the answer to a find
+message that reached the service after its Initial Wait Phase.
+"""
+
+import heapq
+import math
+import numpy as np
+
+from typing import List, Union
+from .entities import System
+from .tables import RelationTable
+
+
+def simulate(target: Union[System, RelationTable], horizon: float = math.inf) -> np.ndarray:
+    """
+    Simulates the Service Discovery of all the entities at once, and returns
+    the instant when each relation is first discovered.
+
+    The events are the messages sent by the entities, kept in a heap with one
+    entry per entity, i.e., its next message. An entity stops sending once
+    its messages cannot discover any relation earlier; moreover, services in
+    the Main Phase skip the offers that would reach no client, and each
+    message only visits the relations that accept it.
+
+    Args:
+        target  (Union[System, RelationTable]) : the system, or its table.
+        horizon (float)                        : no message is sent after this instant.
+    Returns:
+        np.ndarray: the discovery instant of each relation, infinite if it is never discovered.
+    """
+    table = target if isinstance(target, RelationTable) else RelationTable.from_system(target)
+    entities = table.entities
+    # Plain lists are faster than arrays, when accessed one item at a time.
+    boot_del = entities.boot_del.tolist()
+    t_init = entities.t_init.tolist()
+    rep_del = entities.rep_del.tolist()
+    rep_max = entities.rep_max.tolist()
+    cyc_del = entities.cyc_del.tolist()
+    ans_del = entities.ans_del.tolist()
+    is_service = entities.is_service.tolist()
+    client = table.client.tolist()
+    service = table.service.tolist()
+    t_c = table.t_c.tolist()
+    discovered = [math.inf] * len(table)
+    # The instant an offer (or find) must be sent at, to be accepted.
+    accept_offer = [boot_del[c] - delay for c, delay in zip(client, t_c)]
+    accept_find = [t_init[s] - delay for s, delay in zip(service, t_c)]
+    pending: List[List[int]] = [[] for _ in range(len(entities))]
+    for index, (c, s) in enumerate(zip(client, service)):
+        if entities.mode[s]:
+            pending[s].append(index)
+        if entities.mode[c]:
+            pending[c].append(index)
+    # The relations that can still be discovered by the messages of each
+    # entity, sorted by when they accept its messages.
+    for entity, indices in enumerate(pending):
+        indices.sort(key=(accept_offer if is_service[entity] else accept_find).__getitem__)
+    # The instant when the Main Phase starts.
+    main = [start + (math.pow(2, count) - 1) * delay for start, count, delay in zip(t_init, rep_max, rep_del)]
+    # The number of messages already sent by each entity.
+    sent = [0] * len(entities)
+    heap = [(t_init[entity], entity) for entity in range(len(entities)) if pending[entity] and t_init[entity] <= horizon]
+    heapq.heapify(heap)
+    heappop, heapreplace = heapq.heappop, heapq.heapreplace
+    while heap:
+        time, entity = heap[0]
+        indices = pending[entity]
+        # Only the relations accepting the message around this instant are
+        # checked exactly, the others are kept waiting.
+        margin = time + 1e-9 * (abs(time) + 1)
+        waiting = []
+        position = 0
+        if is_service[entity]:
+            # Offer message: discovered when it reaches a client after its boot.
+            for index in indices:
+                if accept_offer[index] > margin:
+                    break
+                position += 1
+                arrival = time + t_c[index]
+                if arrival >= boot_del[client[index]]:
+                    if arrival < discovered[index]:
+                        discovered[index] = arrival
+                elif discovered[index] > arrival:
+                    waiting.append(index)
+        else:
+            # Find message: answered when it reaches a service after its initial wait.
+            for index in indices:
+                if accept_find[index] > margin:
+                    break
+                position += 1
+                arrival = time + t_c[index]
+                if arrival >= t_init[service[index]]:
+                    answer = arrival + ans_del[service[index]] + t_c[index]
+                    if answer < discovered[index]:
+                        discovered[index] = answer
+                elif discovered[index] > arrival:
+                    waiting.append(index)
+        if position:
+            indices = pending[entity] = waiting + indices[position:]
+        # Schedule the next message, if any.
+        count = sent[entity] = sent[entity] + 1
+        if not indices:
+            heappop(heap)
+            continue
+        if count <= rep_max[entity]:
+            # Repetition Phase.
+            time = t_init[entity] + (math.pow(2, count) - 1) * rep_del[entity]
+        elif is_service[entity]:
+            # Main Phase, skipping the offers that would reach no client. The
+            # previous cycle is checked too, in case the division rounded up.
+            start = main[entity]
+            first = indices[0]
+            cycle = math.ceil((accept_offer[first] - start) / cyc_del[entity]) - 1
+            if start + cycle * cyc_del[entity] + t_c[first] < boot_del[client[first]]:
+                cycle += 1
+            cycle = max(count - rep_max[entity], cycle)
+            sent[entity] = rep_max[entity] + cycle
+            time = start + cycle * cyc_del[entity]
+        else:
+            time = math.inf
+        if time > horizon:
+            heappop(heap)
+        else:
+            heapreplace(heap, (time, entity))
+    return np.array(discovered)
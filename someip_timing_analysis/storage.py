@@ -0,0 +1,305 @@
+"""
+Normalized, streaming storage of systems as JSON Lines. After a header with
+the format and its version, each entity is written once, right before the
+first relation using it, and each relation is an array `[c, s, t_c]`, where
+`c` and `s` are the positions of its client and its service among the
+entities written so far. Both writing and reading go one line at a time,
+hence, the memory used only grows with the number of entities.
+
+Example of file:
+    {"format": "someip-system", "version": 1}
+    {"type": "client", "name": "C0", "boot_del": 0, "init_del": 2, "rep_del": 1, "rep_max": 3, "find_mode": true}
+    {"type": "service", "name": "S0", "boot_del": 1, "init_del": 1, "rep_del": 1, "rep_max": 3, "cyc_del": 2, "ans_del": 1, "offer_mode": true}
+    [0, 1, 0.5]
+
+Systems can also be kept as binary snapshots: a folder with a small header,
+one fixed-width `.npy` file per column of the entity and relation tables,
+and the names of the entities in a string table. Opening a snapshot maps the
+columns in memory, without copying or parsing them, hence, several processes
+analysing the same snapshot share it through the page cache.
+"""
+
+import contextlib
+import gzip
+import json
+import os
+import numpy as np
+
+from typing import IO, Iterable, Iterator, List, Sequence, Union
+from .entities import Entity, Client, Service, Relation, System
+from .tables import EntityTable, RelationTable
+
+# The name and the version of the format.
+FORMAT = "someip-system"
+VERSION = 1
+
+# The parameters of each kind of entity, in the order of their constructor.
+CLIENT_PARAMETERS = ["name", "boot_del", "init_del", "rep_del", "rep_max", "find_mode"]
+SERVICE_PARAMETERS = ["name", "boot_del", "init_del", "rep_del", "rep_max", "cyc_del", "ans_del", "offer_mode"]
+
+# The name and the version of the snapshot format.
+SNAPSHOT_FORMAT = "someip-snapshot"
+SNAPSHOT_VERSION = 1
+
+# The columns of a snapshot, with their (little-endian) types.
+ENTITY_COLUMNS = {
+    "is_service": "|b1", "boot_del": "<f8", "init_del": "<f8", "rep_del": "<f8", "rep_max": "<i8",
+    "cyc_del": "<f8", "ans_del": "<f8", "mode": "|b1",
+}
+RELATION_COLUMNS = {"client": "<i8", "service": "<i8", "t_c": "<f8"}
+
+
+@contextlib.contextmanager
+def _open(file: Union[str, os.PathLike, IO[str]], mode: str) -> Iterator[IO[str]]:
+    """
+    Opens a file by name (compressed with gzip if it ends with `.gz`), or
+    uses an already open text stream, which is not closed.
+
+    Args:
+        file (Union[str, os.PathLike, IO[str]]) : The name of the file, or a text stream.
+        mode (str)                              : Either "r" or "w".
+    Returns:
+        Iterator[IO[str]]: the text stream.
+    """
+    if not isinstance(file, (str, os.PathLike)):
+        yield file
+    elif os.fspath(file).endswith(".gz"):
+        with gzip.open(file, mode + "t", encoding="utf-8") as stream:
+            yield stream
+    else:
+        with open(file, mode, encoding="utf-8") as stream:
+            yield stream
+
+
+def _encode_entity(entity: Entity) -> str:
+    """
+    Encodes an entity as a line of the file.
+
+    Args:
+        entity (Entity) : The entity.
+    Returns:
+        str: the line, without the newline.
+    """
+    if isinstance(entity, Service):
+        record = {"type": "service", **{name: getattr(entity, name) for name in SERVICE_PARAMETERS}}
+    elif isinstance(entity, Client):
+        record = {"type": "client", **{name: getattr(entity, name) for name in CLIENT_PARAMETERS}}
+    else:
+        raise ValueError(f"Cannot store the entity '{entity}', it is neither a client nor a service")
+    return json.dumps(record)
+
+
+def _decode_entity(record: dict) -> Entity:
+    """
+    Decodes an entity from a line of the file.
+
+    Args:
+        record (dict) : The decoded line.
+    Returns:
+        Entity: the entity.
+    """
+    if record.get("type") == "service":
+        return Service(*(record[name] for name in SERVICE_PARAMETERS))
+    if record.get("type") == "client":
+        return Client(*(record[name] for name in CLIENT_PARAMETERS))
+    raise ValueError(f"Unknown type of entity '{record.get('type')}'")
+
+
+def write_system(target: Union[System, Iterable[Relation]], file: Union[str, os.PathLike, IO[str]]) -> int:
+    """
+    Writes a system, one line at a time. The relations can also be given by
+    an iterable (e.g., a generator), so that they are never all in memory.
+    Entities are identified by identity, as in `RelationTable.from_system`.
+
+    Args:
+        target (Union[System, Iterable[Relation]]) : The system, or its relations.
+        file   (Union[str, os.PathLike, IO[str]])  : The name of the file, or a text stream.
+    Returns:
+        int: the number of relations written.
+    """
+    relations = target.relations if isinstance(target, System) else target
+    # The entities are kept alive, otherwise the id of an entity freed after
+    # being written could be reused by a new one.
+    index = {}
+    count = 0
+    with _open(file, "w") as stream:
+        stream.write(json.dumps({"format": FORMAT, "version": VERSION}) + "\n")
+        for relation in relations:
+            # Write the entities the first time they are used.
+            positions = []
+            for entity in (relation.client, relation.service):
+                key = id(entity)
+                if key not in index:
+                    index[key] = (entity, len(index))
+                    stream.write(_encode_entity(entity) + "\n")
+                positions.append(index[key][1])
+            stream.write(json.dumps([positions[0], positions[1], relation.t_c]) + "\n")
+            count += 1
+    return count
+
+
+def iter_relations(file: Union[str, os.PathLike, IO[str]]) -> Iterator[Relation]:
+    """
+    Reads the relations of a system, one at a time. Relations sharing an
+    entity in the file share the same object.
+
+    Args:
+        file (Union[str, os.PathLike, IO[str]]) : The name of the file, or a text stream.
+    Returns:
+        Iterator[Relation]: the relations, in the order they were written.
+    """
+    entities: List[Entity] = []
+    with _open(file, "r") as stream:
+        header = json.loads(stream.readline() or "null")
+        if not isinstance(header, dict) or header.get("format") != FORMAT:
+            raise ValueError(f"The file does not contain a system, it must start with the '{FORMAT}' header")
+        if header.get("version") != VERSION:
+            raise ValueError(f"Unsupported version {header.get('version')} of the format, expected {VERSION}")
+        for line in stream:
+            record = json.loads(line)
+            if isinstance(record, list):
+                c, s, t_c = record
+                yield Relation(entities[c], entities[s], t_c)
+            else:
+                entities.append(_decode_entity(record))
+
+
+def read_system(file: Union[str, os.PathLike, IO[str]]) -> System:
+    """
+    Reads a system written by `write_system`.
+
+    Args:
+        file (Union[str, os.PathLike, IO[str]]) : The name of the file, or a text stream.
+    Returns:
+        System: the system.
+    """
+    return System(list(iter_relations(file)))
+
+
+class StringTable(Sequence):
+    """
+    A read-only list of strings, stored as the concatenation of their UTF-8
+    encodings and the offset where each one starts. Strings are only decoded
+    when they are accessed.
+
+    Parameters:
+        blob    (np.ndarray) : The concatenated strings, as bytes.
+        offsets (np.ndarray) : The i-th string is blob[offsets[i]:offsets[i + 1]].
+    """
+
+    blob: np.ndarray
+    offsets: np.ndarray
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray) -> None:
+        self.blob = blob
+        self.offsets = offsets
+
+    @staticmethod
+    def from_strings(strings: Iterable[str]) -> 'StringTable':
+        """
+        Builds the table from a list of strings.
+
+        Args:
+            strings (Iterable[str]) : The strings.
+        Returns:
+            StringTable: the new table.
+        """
+        encoded = [string.encode("utf-8") for string in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(string) for string in encoded], out=offsets[1:])
+        return StringTable(np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        index = int(index)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("string index out of range")
+        return self.blob[self.offsets[index]:self.offsets[index + 1]].tobytes().decode("utf-8")
+
+    def __repr__(self) -> str:
+        """
+        Transforms the table into a string.
+
+        Returns:
+            str: the table to string.
+        """
+        return f"<StringTable: {len(self)} strings>"
+
+
+def write_snapshot(target: Union[System, RelationTable], directory: str):
+    """
+    Writes a system as a binary snapshot, inside a new or existing folder.
+
+    Args:
+        target    (Union[System, RelationTable]) : The system, or its table.
+        directory (str)                          : The folder of the snapshot.
+    """
+    table = target if isinstance(target, RelationTable) else RelationTable.from_system(target)
+    names = table.entities.name if isinstance(table.entities.name, StringTable) else StringTable.from_strings(table.entities.name)
+    os.makedirs(directory, exist_ok=True)
+    files = {name: np.ascontiguousarray(getattr(owner, name), dtype=dtype)
+             for columns, owner in ((ENTITY_COLUMNS, table.entities), (RELATION_COLUMNS, table))
+             for name, dtype in columns.items()}
+    files["names"] = np.asarray(names.blob, dtype=np.uint8)
+    files["name_offsets"] = np.asarray(names.offsets, dtype="<i8")
+    # Write the columns to temporary files, then move them in place: the
+    # snapshot might be mapped by other processes, whose mappings keep the
+    # previous files instead of seeing them truncated.
+    temporaries = {}
+    for name, column in files.items():
+        temporaries[name] = os.path.join(directory, f"{name}.npy.{os.getpid()}.tmp")
+        with open(temporaries[name], "wb") as stream:
+            np.save(stream, column)
+    for name, temporary in temporaries.items():
+        os.replace(temporary, os.path.join(directory, f"{name}.npy"))
+    # The header is written last, so that a snapshot is never opened half-written.
+    header = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "entities": len(table.entities),
+        "relations": len(table),
+        "columns": {**ENTITY_COLUMNS, **RELATION_COLUMNS},
+    }
+    temporary = os.path.join(directory, f"header.json.{os.getpid()}.tmp")
+    with open(temporary, "w") as stream:
+        json.dump(header, stream)
+    os.replace(temporary, os.path.join(directory, "header.json"))
+
+
+def open_snapshot(directory: str, mmap_mode: str = "r") -> RelationTable:
+    """
+    Opens a snapshot written by `write_snapshot`. The columns of the returned
+    table are mapped in memory, and can be passed directly to the batch
+    analysis functions (e.g., `analysis.compute_discovery_times`).
+
+    Args:
+        directory (str) : The folder of the snapshot.
+        mmap_mode (str) : How the columns are mapped (see `numpy.load`), or None to read them in memory.
+    Returns:
+        RelationTable: the table of the system.
+    """
+    with open(os.path.join(directory, "header.json")) as stream:
+        header = json.load(stream)
+    if header.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"The folder '{directory}' does not contain a snapshot")
+    if header.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported version {header.get('version')} of the snapshot, expected {SNAPSHOT_VERSION}")
+
+    def load(name: str) -> np.ndarray:
+        column = np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+        if (name in header["columns"]) and (column.dtype != np.dtype(header["columns"][name])):
+            raise ValueError(f"The column '{name}' of the snapshot has type {column.dtype}, expected {header['columns'][name]}")
+        return column
+
+    names = StringTable(load("names"), load("name_offsets"))
+    entities = EntityTable(names, *(load(name) for name in ENTITY_COLUMNS))
+    table = RelationTable(entities, *(load(name) for name in RELATION_COLUMNS))
+    if (len(entities) != header["entities"]) or (len(table) != header["relations"]) or (len(names) != len(entities)):
+        raise ValueError(f"The snapshot '{directory}' is incomplete")
+    return table
@@ -0,0 +1,136 @@
+"""
+Parameter sweeps of the timing analysis over multi-dimensional grids.
+"""
+
+import numpy as np
+
+from typing import Dict, List, Sequence
+from .entities import Client, Service
+from . import analysis
+
+# The parameters that can be swept, and the matching batch analysis argument.
+PARAMETERS = {
+    "s.boot_del": "s_boot_del",
+    "s.init_del": "s_init_del",
+    "s.rep_del": "s_rep_del",
+    "s.rep_max": "s_rep_max",
+    "s.cyc_del": "s_cyc_del",
+    "s.ans_del": "s_ans_del",
+    "s.offer_mode": "s_offer_mode",
+    "c.boot_del": "c_boot_del",
+    "c.init_del": "c_init_del",
+    "c.rep_del": "c_rep_del",
+    "c.rep_max": "c_rep_max",
+    "c.find_mode": "c_find_mode",
+    "t_c": "t_c",
+}
+
+
+class Axis(object):
+    """
+    An axis of a sweep, i.e., a parameter and the values it takes.
+
+    Parameters:
+        parameter (str)        : The parameter (e.g., "c.boot_del", "s.init_del", or "t_c").
+        values    (np.ndarray) : The values taken by the parameter.
+    """
+
+    parameter: str
+    values: np.ndarray
+
+    def __init__(self, parameter: str, values: Sequence) -> None:
+        """
+        The constructor for sweep axes.
+
+        Args:
+            parameter (str)      : The parameter (e.g., "c.boot_del", "s.init_del", or "t_c").
+            values    (Sequence) : The values taken by the parameter.
+        """
+        if parameter not in PARAMETERS:
+            raise ValueError(f"Cannot sweep over '{parameter}', valid parameters are: {', '.join(PARAMETERS)}")
+        self.parameter = parameter
+        self.values = np.asarray(values)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __repr__(self) -> str:
+        """
+        Transforms the axis into a string.
+
+        Returns:
+            str: the axis to string.
+        """
+        return f"<{self.parameter},{len(self)} values>"
+
+
+def pair_columns(s: Service, c: Client, t_c: float) -> Dict[str, object]:
+    """
+    Returns the arguments of the batch analysis for a single client/service pair.
+
+    Args:
+        s   (Service) : the service.
+        c   (Client)  : the client.
+        t_c (float)   : the communication delay.
+    Returns:
+        Dict[str, object]: the arguments of `timing_analysis_batch`.
+    """
+    return {
+        "s_boot_del": s.boot_del,
+        "s_init_del": s.init_del,
+        "s_rep_del": s.rep_del,
+        "s_rep_max": s.rep_max,
+        "s_cyc_del": s.cyc_del,
+        "s_ans_del": s.ans_del,
+        "s_offer_mode": s.offer_mode,
+        "c_boot_del": c.boot_del,
+        "c_init_del": c.init_del,
+        "c_rep_del": c.rep_del,
+        "c_rep_max": c.rep_max,
+        "c_find_mode": c.find_mode,
+        "t_c": t_c,
+    }
+
+
+def sweep(s: Service, c: Client, t_c: float, axes: List[Axis], model=analysis, chunk_size: int = 1 << 20, out: str = None) -> np.ndarray:
+    """
+    Computes the discovery time over the cartesian product of the axes, where
+    the parameters that are not swept keep the values of the given pair.
+
+    The grid is evaluated in chunks of `chunk_size` points, hence, the memory
+    used for the computation does not depend on the size of the grid. When
+    `out` is given, the results are streamed into a `.npy` file mapped in
+    memory, instead of an array kept in memory. Points where both the
+    service and the client are passive (e.g., when sweeping "s.offer_mode"
+    and "c.find_mode") get NaN.
+
+    Args:
+        s          (Service)    : the service.
+        c          (Client)     : the client.
+        t_c        (float)      : the communication delay.
+        axes       (List[Axis]) : the axes of the grid.
+        model      (module)     : the analysis, either `analysis` or `analysis_ssg15`.
+        chunk_size (int)        : the number of points evaluated at once.
+        out        (str)        : the `.npy` file where the results are stored.
+    Returns:
+        np.ndarray: the discovery times, with one dimension for each axis.
+    """
+    shape = tuple(len(axis) for axis in axes)
+    if out is None:
+        result = np.empty(shape, dtype=np.float64)
+    else:
+        result = np.lib.format.open_memmap(out, mode="w+", dtype=np.float64, shape=shape)
+    flat = result.reshape(-1)
+    columns = pair_columns(s, c, t_c)
+    for start in range(0, flat.size, chunk_size):
+        stop = min(start + chunk_size, flat.size)
+        # Find the position of each point along the axes.
+        positions = np.unravel_index(np.arange(start, stop), shape) if axes else ()
+        for axis, position in zip(axes, positions):
+            columns[PARAMETERS[axis.parameter]] = axis.values[position]
+        terms = model._timing_analysis_arrays(**columns)
+        # Points where both entities are passive have no discovery time.
+        flat[start:stop] = np.where(terms["case"] == model.CASE_INVALID, np.nan, terms["discovery_time"])
+    if out is not None:
+        result.flush()
+    return result
@@ -0,0 +1,421 @@
+"""
+Columnar representation of SOME/IP entities and systems.
+"""
+
+import numpy as np
+
+from typing import List, Dict, Union
+from .entities import Entity, Client, Service, Relation, System
+
+
+class EntityTable(object):
+    """
+    Keeps a list of clients and services as a struct of arrays, with one entry
+    per entity in each column.
+
+    Parameters:
+        name       (List[str])  : The names of the entities.
+        is_service (np.ndarray) : If the entity is a service, otherwise it is a client.
+        boot_del   (np.ndarray) : The boot delays.
+        init_del   (np.ndarray) : The initial wait phase delays.
+        rep_del    (np.ndarray) : The repetition phase delays.
+        rep_max    (np.ndarray) : The maximum number of messages sent in the repetition phase.
+        cyc_del    (np.ndarray) : The delay between offer messages in the Main Phase (NaN for clients).
+        ans_del    (np.ndarray) : The answer delays (NaN for clients).
+        mode       (np.ndarray) : The offer mode of services, or the find mode of clients.
+    """
+
+    name: List[str]
+    is_service: np.ndarray
+    boot_del: np.ndarray
+    init_del: np.ndarray
+    rep_del: np.ndarray
+    rep_max: np.ndarray
+    cyc_del: np.ndarray
+    ans_del: np.ndarray
+    mode: np.ndarray
+
+    def __init__(self, name, is_service, boot_del, init_del, rep_del, rep_max, cyc_del, ans_del, mode) -> None:
+        """
+        The constructor for entity tables.
+
+        Args:
+            name       (List[str]) : The names of the entities.
+            is_service (array)     : If the entity is a service, otherwise it is a client.
+            boot_del   (array)     : The boot delays.
+            init_del   (array)     : The initial wait phase delays.
+            rep_del    (array)     : The repetition phase delays.
+            rep_max    (array)     : The maximum number of messages sent in the repetition phase.
+            cyc_del    (array)     : The delay between offer messages in the Main Phase.
+            ans_del    (array)     : The answer delays.
+            mode       (array)     : The offer mode of services, or the find mode of clients.
+        """
+        self.name = name
+        self.is_service = np.asarray(is_service, dtype=bool)
+        self.boot_del = np.asarray(boot_del, dtype=np.float64)
+        self.init_del = np.asarray(init_del, dtype=np.float64)
+        self.rep_del = np.asarray(rep_del, dtype=np.float64)
+        self.rep_max = np.asarray(rep_max, dtype=np.int64)
+        self.cyc_del = np.asarray(cyc_del, dtype=np.float64)
+        self.ans_del = np.asarray(ans_del, dtype=np.float64)
+        self.mode = np.asarray(mode, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.boot_del)
+
+    def __repr__(self) -> str:
+        """
+        Transforms the table into a string.
+
+        Returns:
+            str: the table to string.
+        """
+        return f"<EntityTable: {np.count_nonzero(~self.is_service)} clients, {np.count_nonzero(self.is_service)} services>"
+
+    @property
+    def t_init(self) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: the sum of boot and initial delays.
+        """
+        return self.boot_del + self.init_del
+
+    @staticmethod
+    def from_entities(entities: List[Entity]) -> 'EntityTable':
+        """
+        Builds the table from a list of clients and services.
+
+        Args:
+            entities (List[Entity]) : The list of entities.
+
+        Returns:
+            EntityTable: the new table, with the entities in the same order.
+        """
+        is_service = [isinstance(entity, Service) for entity in entities]
+        return EntityTable(
+            [entity.name for entity in entities],
+            is_service,
+            [entity.boot_del for entity in entities],
+            [entity.init_del for entity in entities],
+            [entity.rep_del for entity in entities],
+            [entity.rep_max for entity in entities],
+            [entity.cyc_del if service else np.nan for entity, service in zip(entities, is_service)],
+            [entity.ans_del if service else np.nan for entity, service in zip(entities, is_service)],
+            [entity.offer_mode if service else entity.find_mode for entity, service in zip(entities, is_service)],
+        )
+
+    def entity(self, index: int) -> Entity:
+        """
+        Builds the client or service stored at the given index.
+
+        Args:
+            index (int) : The index of the entity.
+
+        Returns:
+            Entity: the new client or service.
+        """
+        if self.is_service[index]:
+            return Service(
+                self.name[index],
+                float(self.boot_del[index]),
+                float(self.init_del[index]),
+                float(self.rep_del[index]),
+                int(self.rep_max[index]),
+                float(self.cyc_del[index]),
+                float(self.ans_del[index]),
+                bool(self.mode[index]),
+            )
+        return Client(
+            self.name[index],
+            float(self.boot_del[index]),
+            float(self.init_del[index]),
+            float(self.rep_del[index]),
+            int(self.rep_max[index]),
+            bool(self.mode[index]),
+        )
+
+    def to_entities(self) -> List[Entity]:
+        """
+        Builds the list of clients and services.
+
+        Returns:
+            List[Entity]: the entities, in the same order of the table.
+        """
+        return [self.entity(index) for index in range(len(self))]
+
+
+class RelationTable(object):
+    """
+    Keeps the relations of a system as a struct of arrays, which refer to the
+    entities by their index inside an EntityTable.
+
+    Parameters:
+        entities (EntityTable) : The clients and services of the system.
+        client   (np.ndarray)  : The index of the client of each relation.
+        service  (np.ndarray)  : The index of the service of each relation.
+        t_c      (np.ndarray)  : The communication delay of each relation.
+    """
+
+    entities: EntityTable
+    client: np.ndarray
+    service: np.ndarray
+    t_c: np.ndarray
+
+    def __init__(self, entities: EntityTable, client, service, t_c) -> None:
+        """
+        The constructor for relation tables.
+
+        Args:
+            entities (EntityTable) : The clients and services of the system.
+            client   (array)       : The index of the client of each relation.
+            service  (array)       : The index of the service of each relation.
+            t_c      (array)       : The communication delay of each relation.
+        """
+        self.entities = entities
+        self.client = np.asarray(client, dtype=np.int64)
+        self.service = np.asarray(service, dtype=np.int64)
+        self.t_c = np.asarray(t_c, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.t_c)
+
+    def __repr__(self) -> str:
+        """
+        Transforms the table into a string.
+
+        Returns:
+            str: the table to string.
+        """
+        return f"<RelationTable: {len(self)} relations, {self.entities}>"
+
+    @staticmethod
+    def from_system(system: System) -> 'RelationTable':
+        """
+        Builds the table from a system. Entities shared by several relations
+        are stored only once.
+
+        Args:
+            system (System) : The system.
+
+        Returns:
+            RelationTable: the new table, with the relations in the same order.
+        """
+        entities: List[Entity] = []
+        index: Dict[int, int] = {}
+        client = np.empty(len(system.relations), dtype=np.int64)
+        service = np.empty(len(system.relations), dtype=np.int64)
+        t_c = np.empty(len(system.relations), dtype=np.float64)
+        for position, relation in enumerate(system.relations):
+            for entity, column in ((relation.client, client), (relation.service, service)):
+                key = id(entity)
+                if key not in index:
+                    index[key] = len(entities)
+                    entities.append(entity)
+                column[position] = index[key]
+            t_c[position] = relation.t_c
+        return RelationTable(EntityTable.from_entities(entities), client, service, t_c)
+
+    def to_system(self) -> System:
+        """
+        Builds the system, where relations sharing an entity refer to the same
+        Client or Service object.
+
+        Returns:
+            System: the new system.
+        """
+        entities = self.entities.to_entities()
+        return System([
+            Relation(entities[client], entities[service], t_c)
+            for client, service, t_c in zip(self.client.tolist(), self.service.tolist(), self.t_c.tolist())
+        ])
+
+    def relation(self, index: int) -> Relation:
+        """
+        Builds the relation stored at the given index.
+
+        Args:
+            index (int) : The index of the relation.
+
+        Returns:
+            Relation: the new relation, with its own client and service.
+        """
+        return Relation(
+            self.entities.entity(self.client[index]),
+            self.entities.entity(self.service[index]),
+            float(self.t_c[index]),
+        )
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """
+        Gathers the parameters of the client and service of each relation, as
+        expected by the batch analysis functions.
+
+        Returns:
+            Dict[str, np.ndarray]: the columns, one entry per relation.
+        """
+        e, s, c = self.entities, self.service, self.client
+        return {
+            "s_boot_del": e.boot_del[s],
+            "s_init_del": e.init_del[s],
+            "s_rep_del": e.rep_del[s],
+            "s_rep_max": e.rep_max[s],
+            "s_cyc_del": e.cyc_del[s],
+            "s_ans_del": e.ans_del[s],
+            "s_offer_mode": e.mode[s],
+            "c_boot_del": e.boot_del[c],
+            "c_init_del": e.init_del[c],
+            "c_rep_del": e.rep_del[c],
+            "c_rep_max": e.rep_max[c],
+            "c_find_mode": e.mode[c],
+            "t_c": self.t_c,
+        }
+
+
+class Deduplication(object):
+    """
+    The relations of a system grouped by their analysis key, i.e., the
+    parameters of their service, the parameters of their client, and their
+    communication delay. Names are not part of the key, hence, entities with
+    the same parameters are interned into one.
+
+    Parameters:
+        table    (RelationTable) : One relation for each key.
+        index    (np.ndarray)    : The position of the first relation with each key, in the original system.
+        inverse  (np.ndarray)    : The key of each relation of the original system, i.e., its row in `table`.
+        entities (int)           : The number of distinct entities of the original system.
+    """
+
+    table: RelationTable
+    index: np.ndarray
+    inverse: np.ndarray
+    entities: int
+
+    def __init__(self, table: RelationTable, index: np.ndarray, inverse: np.ndarray, entities: int) -> None:
+        self.table = table
+        self.index = index
+        self.inverse = inverse
+        self.entities = entities
+
+    @property
+    def relations(self) -> int:
+        """
+        Returns:
+            int: the number of relations of the original system.
+        """
+        return len(self.inverse)
+
+    @property
+    def unique_relations(self) -> int:
+        """
+        Returns:
+            int: the number of distinct analysis keys.
+        """
+        return len(self.table)
+
+    @property
+    def unique_entities(self) -> int:
+        """
+        Returns:
+            int: the number of distinct parameter sets of the entities.
+        """
+        return len(self.table.entities)
+
+    @property
+    def ratio(self) -> float:
+        """
+        Returns:
+            float: the compression ratio, i.e., the number of relations for each key.
+        """
+        return self.relations / self.unique_relations if self.unique_relations else 1.0
+
+    def scatter(self, values: np.ndarray) -> np.ndarray:
+        """
+        Copies the values computed for each key to all the relations sharing it.
+
+        Args:
+            values (np.ndarray) : One value for each row of `table`.
+
+        Returns:
+            np.ndarray: one value for each relation of the original system.
+        """
+        return np.asarray(values)[self.inverse]
+
+    def __repr__(self) -> str:
+        """
+        Transforms the deduplication into a string.
+
+        Returns:
+            str: the deduplication to string.
+        """
+        return (f"<Deduplication: {self.relations} relations into {self.unique_relations} keys ({self.ratio:.2f}x), "
+                f"{self.entities} entities into {self.unique_entities}>")
+
+
+def _parameters(entity: Entity) -> tuple:
+    """
+    Returns the parameters of an entity which are used by the analysis.
+
+    Args:
+        entity (Entity) : The entity.
+
+    Returns:
+        tuple: the parameters, telling clients and services apart.
+    """
+    if isinstance(entity, Service):
+        return (True, entity.boot_del, entity.init_del, entity.rep_del, entity.rep_max, entity.cyc_del, entity.ans_del, entity.offer_mode)
+    return (False, entity.boot_del, entity.init_del, entity.rep_del, entity.rep_max, entity.find_mode)
+
+
+def deduplicate(target: Union[System, RelationTable]) -> Deduplication:
+    """
+    Groups the relations of a system by their analysis key, so that each key
+    is analysed once and its result is copied to every relation sharing it
+    (see `Deduplication.scatter`).
+
+    Args:
+        target (Union[System, RelationTable]) : The system, or its table.
+
+    Returns:
+        Deduplication: the distinct keys, and the key of each relation.
+    """
+    if isinstance(target, RelationTable):
+        e = target.entities
+        # Intern the rows of the entity table, ignoring the columns unused by clients.
+        rows = np.stack((
+            e.is_service, e.boot_del, e.init_del, e.rep_del, e.rep_max,
+            np.where(e.is_service, e.cyc_del, 0.0), np.where(e.is_service, e.ans_del, 0.0), e.mode,
+        ), axis=1).astype(np.float64) if len(e) else np.empty((0, 8))
+        _, first, interned = np.unique(rows, axis=0, return_index=True, return_inverse=True)
+        interned = interned.reshape(-1)
+        entities = EntityTable(
+            [e.name[i] for i in first.tolist()], e.is_service[first], e.boot_del[first], e.init_del[first],
+            e.rep_del[first], e.rep_max[first], e.cyc_del[first], e.ans_del[first], e.mode[first],
+        )
+        count = len(e)
+        client, service, t_c = interned[target.client], interned[target.service], np.asarray(target.t_c)
+    else:
+        # Intern the entities by their parameters, visiting each object once.
+        keys: Dict[tuple, int] = {}
+        known: Dict[int, int] = {}
+        unique: List[Entity] = []
+        client = np.empty(len(target.relations), dtype=np.int64)
+        service = np.empty(len(target.relations), dtype=np.int64)
+        t_c = np.empty(len(target.relations), dtype=np.float64)
+        for position, relation in enumerate(target.relations):
+            for entity, column in ((relation.client, client), (relation.service, service)):
+                if id(entity) not in known:
+                    known[id(entity)] = keys.setdefault(_parameters(entity), len(unique))
+                    if known[id(entity)] == len(unique):
+                        unique.append(entity)
+                column[position] = known[id(entity)]
+            t_c[position] = relation.t_c
+        entities = EntityTable.from_entities(unique)
+        count = len(known)
+    # Sort the relations by key, the sort is stable, so each group starts with its first relation.
+    order = np.lexsort((t_c, service, client))
+    new = np.ones(len(order), dtype=bool)
+    new[1:] = (np.diff(client[order]) != 0) | (np.diff(service[order]) != 0) | (t_c[order][1:] != t_c[order][:-1])
+    inverse = np.empty(len(order), dtype=np.int64)
+    inverse[order] = np.cumsum(new) - 1
+    index = order[new]
+    return Deduplication(RelationTable(entities, client[index], service[index], t_c[index]), index, inverse, count)
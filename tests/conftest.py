@@ -0,0 +1,84 @@
+import math
+import random
+
+from someip_timing_analysis import analysis, analysis_ssg15
+from someip_timing_analysis.entities import Client, Relation, Service, System
+from someip_timing_analysis.graph import Graph
+from someip_timing_analysis.network import Device, LinkDelay, device_to_device_delay, get_placement
+
+analysis.set_tracing_mode(analysis.TRACE_OFF)
+analysis_ssg15.set_tracing_mode(analysis_ssg15.TRACE_OFF)
+
+# Small grids of values, so that different paths often give the same time.
+BOOT_DEL = [0, 1, 2, 3, 5, 8]
+INIT_DEL = [0, 0.5, 1, 2]
+REP_DEL = [0.5, 1, 2]
+REP_MAX = [0, 1, 2, 3]
+CYC_DEL = [1, 2, 4]
+ANS_DEL = [0, 0.5, 1]
+T_C = [0, 0.25, 0.5, 1, 2, 3]
+
+
+def make_service(rng: random.Random, name: str, offer_mode: bool = None) -> Service:
+    return Service(
+        name, rng.choice(BOOT_DEL), rng.choice(INIT_DEL), rng.choice(REP_DEL), rng.choice(REP_MAX),
+        rng.choice(CYC_DEL), rng.choice(ANS_DEL), rng.random() < 0.7 if offer_mode is None else offer_mode,
+    )
+
+
+def make_client(rng: random.Random, name: str, find_mode: bool = None) -> Client:
+    return Client(
+        name, rng.choice(BOOT_DEL), rng.choice(INIT_DEL), rng.choice(REP_DEL), rng.choice(REP_MAX),
+        rng.random() < 0.7 if find_mode is None else find_mode,
+    )
+
+
+def make_system(seed: int, relations: int = 200, services: int = 10, clients: int = 20, invalid: bool = False) -> System:
+    """Builds a random system, where entities are shared by several relations.
+    Unless invalid is set, no relation pairs a passive service with a passive client.
+    """
+    rng = random.Random(seed)
+    service_pool = [make_service(rng, f"S{i}") for i in range(services)]
+    client_pool = [make_client(rng, f"C{i}") for i in range(clients)]
+    result = []
+    for _ in range(relations):
+        s, c = rng.choice(service_pool), rng.choice(client_pool)
+        if not (invalid or s.offer_mode or c.find_mode):
+            c = rng.choice([client for client in client_pool if client.find_mode] or [make_client(rng, "C", True)])
+        result.append(Relation(c, s, rng.choice(T_C)))
+    return System(result)
+
+
+def make_network(seed: int, devices: int = 12, links: int = 20, directed: bool = False, entities: int = 0):
+    """Builds a random network of devices, which might not be connected. The
+    entities are spread over the devices, as services and clients.
+    """
+    rng = random.Random(seed)
+    nodes = [Device(i, base_delay=rng.choice([0, 1e-4])) for i in range(devices)]
+    graph = Graph([], directed)
+    for _ in range(links):
+        source, target = rng.sample(nodes, 2)
+        graph.add_connection(source, target, LinkDelay(rng.choice([64, 128, 256]), 1e6, rng.choice([0, 1e-4])))
+    for i in range(entities):
+        entity = make_service(rng, f"S{i}", True) if i % 2 else make_client(rng, f"C{i}")
+        rng.choice(nodes).entities.append(entity)
+    # Register the devices without links too.
+    for node in nodes:
+        graph.graph.setdefault(node, set())
+    return graph, nodes
+
+
+def make_requirements(graph: Graph, seed: int, count: int, reachable: bool = True):
+    """Pairs random clients and services of a network, whose devices can
+    reach each other (or cannot, if reachable is not set).
+    """
+    rng = random.Random(seed)
+    placement = get_placement(graph)
+    clients = [entity for entity in placement if isinstance(entity, Client)]
+    services = [entity for entity in placement if isinstance(entity, Service)]
+    result = []
+    while len(result) < count:
+        c, s = rng.choice(clients), rng.choice(services)
+        if (device_to_device_delay(graph, placement[c], placement[s]) < math.inf) == reachable:
+            result.append((c, s))
+    return result
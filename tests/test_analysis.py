@@ -0,0 +1,176 @@
+import random
+
+import numpy as np
+import pytest
+
+from someip_timing_analysis import analysis, analysis_ssg15
+from someip_timing_analysis.entities import Relation, System
+from someip_timing_analysis.tables import RelationTable
+
+from conftest import make_client, make_service, make_system
+
+MODELS = [analysis, analysis_ssg15]
+
+
+def random_pairs(seed: int, count: int):
+    rng = random.Random(seed)
+    return [(make_service(rng, f"S{i}"), make_client(rng, f"C{i}"), rng.choice([0, 0.25, 0.5, 1, 2, 3])) for i in range(count)]
+
+
+def pair_columns(pairs):
+    return {
+        "s_boot_del": [s.boot_del for s, _, _ in pairs],
+        "s_init_del": [s.init_del for s, _, _ in pairs],
+        "s_rep_del": [s.rep_del for s, _, _ in pairs],
+        "s_rep_max": [s.rep_max for s, _, _ in pairs],
+        "s_cyc_del": [s.cyc_del for s, _, _ in pairs],
+        "s_ans_del": [s.ans_del for s, _, _ in pairs],
+        "s_offer_mode": [s.offer_mode for s, _, _ in pairs],
+        "c_boot_del": [c.boot_del for _, c, _ in pairs],
+        "c_init_del": [c.init_del for _, c, _ in pairs],
+        "c_rep_del": [c.rep_del for _, c, _ in pairs],
+        "c_rep_max": [c.rep_max for _, c, _ in pairs],
+        "c_find_mode": [c.find_mode for _, c, _ in pairs],
+        "t_c": [t_c for _, _, t_c in pairs],
+    }
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_batch_matches_scalar(model):
+    pairs = random_pairs(1, 2000)
+    terms = model._timing_analysis_arrays(**pair_columns(pairs))
+    for (s, c, t_c), case, discovery_time in zip(pairs, terms["case"].tolist(), terms["discovery_time"].tolist()):
+        if s.offer_mode or c.find_mode:
+            assert discovery_time == model.timing_analysis(s, c, t_c)
+            assert case != model.CASE_INVALID
+        else:
+            # Both passive: no discovery time.
+            assert np.isnan(discovery_time)
+            assert case == model.CASE_INVALID
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_batch_rejects_invalid_modes(model):
+    pairs = random_pairs(2, 50)
+    columns = pair_columns(pairs)
+    columns["s_offer_mode"] = [False] * len(pairs)
+    columns["c_find_mode"] = [False] * len(pairs)
+    with pytest.raises(SystemExit):
+        model.timing_analysis_batch(**columns)
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_batch_broadcasts_scalars(model):
+    s, c, _ = random_pairs(3, 1)[0]
+    s, c = s.replace(rep_max=0, offer_mode=True), c.replace(rep_max=0, find_mode=True)
+    t_c = np.linspace(0, 5, 41)
+    columns = {name: column[0] for name, column in pair_columns([(s, c, 0)]).items()}
+    columns["t_c"] = t_c
+    result = model.timing_analysis_batch(**columns)
+    assert result.tolist() == [model.timing_analysis(s, c, value) for value in t_c.tolist()]
+
+
+def test_full_details_matches_composed():
+    for s, c, t_c in random_pairs(4, 2000):
+        if not (s.offer_mode or c.find_mode):
+            with pytest.raises(SystemExit):
+                analysis.timing_analysis_full_details(s, c, t_c)
+            continue
+        if s.offer_mode and c.find_mode:
+            expected = analysis.timing_analysis_c_full_details(s, c, t_c)
+        elif s.offer_mode:
+            expected = analysis.timing_analysis_a_full_details(s, c, t_c)
+        else:
+            expected = analysis.timing_analysis_b_full_details(s, c, t_c)
+        result = analysis.timing_analysis_full_details(s, c, t_c)
+        assert result.discovery_time == expected.discovery_time == analysis.timing_analysis(s, c, t_c)
+        assert result.details == expected.details
+
+
+def test_relation_table_matches_system():
+    system = make_system(5, relations=500)
+    table = RelationTable.from_system(system)
+    expected = [discovery_time for discovery_time, _ in analysis.compute_discovery_times(system)]
+    assert analysis.compute_discovery_times(table).tolist() == expected
+    results = analysis.compute_discovery_times_full_details(table)
+    for result, relation, discovery_time in zip(results, system.relations, expected):
+        reference = analysis.timing_analysis_full_details(relation.service, relation.client, relation.t_c)
+        assert result.discovery_time == discovery_time
+        assert result.details == reference.details
+        assert (result.client.name, result.service.name) == (relation.client.name, relation.service.name)
+    assert analysis.get_highest_discovery_time(table) == max(expected)
+    discovery_time, relation = analysis.get_highest_impact_relation(table)
+    index = expected.index(max(expected))
+    assert discovery_time == max(expected)
+    assert (relation.client.name, relation.service.name, relation.t_c) == \
+        (system.relations[index].client.name, system.relations[index].service.name, system.relations[index].t_c)
+
+
+def test_relation_table_round_trip():
+    system = make_system(6, relations=300)
+    copy = RelationTable.from_system(system).to_system()
+    assert [(r.client.name, r.service.name, r.t_c) for r in copy.relations] == \
+        [(r.client.name, r.service.name, r.t_c) for r in system.relations]
+    # Shared entities stay shared.
+    assert len({id(r.service) for r in copy.relations}) == len({id(r.service) for r in system.relations})
+    assert analysis.compute_discovery_times(copy) == [(d, r) for (d, _), r in zip(analysis.compute_discovery_times(system), copy.relations)]
+
+
+def test_relation_table_rejects_invalid_modes():
+    system = make_system(7, relations=200, invalid=True)
+    assert any(not (r.service.offer_mode or r.client.find_mode) for r in system.relations)
+    with pytest.raises(SystemExit):
+        analysis.compute_discovery_times(RelationTable.from_system(system))
+
+
+@pytest.mark.parametrize("k", [0, 1, 5, 40, 1000])
+def test_top_k_relations(k):
+    # Few distinct entities and delays: many relations share their discovery time.
+    system = make_system(8, relations=300, services=3, clients=4)
+    discovery_times = [discovery_time for discovery_time, _ in analysis.compute_discovery_times(system)]
+    assert len(set(discovery_times)) < len(discovery_times)
+    order = sorted(range(len(system.relations)), key=lambda i: (-discovery_times[i], i))[:k]
+    results = analysis.top_k_relations(system, k)
+    assert [(r.client, r.service, r.communication_delay) for r in results] == \
+        [(system.relations[i].client, system.relations[i].service, system.relations[i].t_c) for i in order]
+    assert [r.discovery_time for r in results] == [discovery_times[i] for i in order]
+    table_results = analysis.top_k_relations(RelationTable.from_system(system), k)
+    assert [r.discovery_time for r in table_results] == [discovery_times[i] for i in order]
+    if k == 1:
+        assert analysis.get_highest_impact_relation(system) == (discovery_times[order[0]], system.relations[order[0]])
+        assert analysis.get_highest_discovery_time(system) == discovery_times[order[0]]
+
+
+def test_empty_system():
+    system = System([])
+    assert analysis.compute_discovery_times(system) == []
+    assert analysis.compute_discovery_times_full_details(system) == []
+    assert analysis.top_k_relations(system, 3) == []
+    with pytest.raises(ValueError):
+        analysis.get_highest_discovery_time(system)
+    with pytest.raises(ValueError):
+        analysis.get_highest_impact_relation(system)
+    table = RelationTable.from_system(system)
+    assert len(analysis.compute_discovery_times(table)) == 0
+    assert analysis.top_k_relations(table, 3) == []
+    with pytest.raises(ValueError):
+        analysis.get_highest_discovery_time(table)
+    with pytest.raises(ValueError):
+        analysis.get_highest_impact_relation(table)
+
+
+def test_repeated_relation():
+    system = make_system(9, relations=20)
+    system.relations.append(system.relations[0])
+    result = analysis.compute_discovery_times(system)
+    assert result[-1] == result[0]
+    assert result[-1][1] is system.relations[0]
+
+
+def test_relation_keeps_scalar_types():
+    system = make_system(10, relations=100)
+    system.relations.append(Relation(system.relations[0].client, system.relations[0].service, 1))
+    expected = [analysis.timing_analysis(r.service, r.client, r.t_c) for r in system.relations]
+    result = [discovery_time for discovery_time, _ in analysis.compute_discovery_times(system)]
+    assert result == expected
+    assert [type(value) for value in result] == [type(value) for value in expected]
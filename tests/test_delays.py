@@ -0,0 +1,92 @@
+import os
+import random
+
+import numpy as np
+import pytest
+
+from someip_timing_analysis.delays import DynamicDelays, delay_matrix
+from someip_timing_analysis.graph import ConstantWeight, Graph
+from someip_timing_analysis.network import LinkDelay, device_delay, device_to_device_delay
+
+from conftest import make_network
+
+
+@pytest.mark.parametrize("directed", [False, True])
+def test_methods_match_pairwise_search(directed):
+    graph, nodes = make_network(1, directed=directed, entities=10)
+    dijkstra = delay_matrix(graph, device_delay, method="dijkstra")
+    floyd_warshall = delay_matrix(graph, device_delay, method="floyd_warshall")
+    parallel = delay_matrix(graph, device_delay, method="dijkstra", workers=2, chunk_size=3)
+    assert np.allclose(dijkstra.delays, floyd_warshall.delays, rtol=1e-12, atol=0)
+    assert np.array_equal(dijkstra.delays, parallel.delays)
+    for source in nodes:
+        for target in nodes:
+            # Unreachable devices get an infinite delay.
+            assert dijkstra.delay(source, target) == pytest.approx(device_to_device_delay(graph, source, target), rel=1e-12)
+
+
+def test_weight_bounds():
+    graph, nodes = make_network(2, entities=10)
+    for weights, select in (("min", 0), ("max", 1)):
+        bounded = Graph([], graph.directed)
+        for node in nodes:
+            bounded.graph.setdefault(node, set())
+        for u, v in graph.get_edge_list():
+            bounded.add_connection(u, v, ConstantWeight(graph.get_bounds(u, v)[select]))
+        expected = delay_matrix(bounded, device_delay)
+        result = delay_matrix(graph, device_delay, weights=weights)
+        order = expected.positions(result.nodes)
+        assert np.array_equal(result.delays, expected.delays[np.ix_(order, order)])
+    with pytest.raises(ValueError):
+        delay_matrix(graph, weights="typical")
+    with pytest.raises(ValueError):
+        delay_matrix(graph, method="bfs")
+
+
+def test_cache(tmp_path):
+    graph, nodes = make_network(3)
+    first = delay_matrix(graph, device_delay, cache_dir=str(tmp_path))
+    assert len(os.listdir(tmp_path)) == 1
+    second = delay_matrix(graph, device_delay, cache_dir=str(tmp_path))
+    assert np.array_equal(first.delays, second.delays)
+    # A different topology is kept apart.
+    graph.add_connection(nodes[0], nodes[1], LinkDelay(1, 1e6))
+    third = delay_matrix(graph, device_delay, cache_dir=str(tmp_path))
+    assert len(os.listdir(tmp_path)) == 2
+    assert np.array_equal(third.delays, delay_matrix(graph, device_delay).delays)
+
+
+def compare(dynamic: DynamicDelays, graph: Graph, before: np.ndarray, changed: np.ndarray):
+    current = dynamic.matrix()
+    expected = delay_matrix(graph, device_delay)
+    for i, source in enumerate(current.nodes):
+        for j, target in enumerate(current.nodes):
+            if (source in expected.index) and (target in expected.index):
+                value = expected.delay(source, target)
+            else:
+                # Removed nodes keep their position, but cannot be reached.
+                value = 0.0 if i == j else np.inf
+            assert current.delays[i, j] == pytest.approx(value, rel=1e-12)
+    moved = ~np.isclose(before, current.delays, rtol=1e-12, atol=0) & ~(np.isinf(before) & np.isinf(current.delays))
+    assert np.array_equal(changed[:len(before), :len(before)], moved)
+
+
+@pytest.mark.parametrize("directed", [False, True])
+def test_dynamic_updates_match_recomputation(directed):
+    rng = random.Random(4)
+    graph, nodes = make_network(4, directed=directed, entities=10)
+    dynamic = DynamicDelays(graph, device_delay)
+    for step in range(60):
+        before = dynamic.matrix().delays.copy()
+        action = rng.random()
+        if action < 0.5:
+            # Add a link, or change the weight of an existing one.
+            source, target = rng.sample(nodes, 2)
+            changed = dynamic.add_connection(source, target, LinkDelay(rng.choice([16, 64, 128, 512]), 1e6))
+        elif action < 0.9:
+            edges = graph.get_edge_list()
+            source, target = rng.choice(edges) if edges else rng.sample(nodes, 2)
+            changed = dynamic.remove_connection(source, target)
+        else:
+            changed = dynamic.remove(rng.choice(nodes))
+        compare(dynamic, graph, before, changed)
@@ -0,0 +1,144 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from someip_timing_analysis.graph import CompiledGraph, ConstantWeight, Graph, Node, build_path
+
+
+class CountingWeight(object):
+    def __init__(self, weight):
+        self.weight = weight
+        self.calls = 0
+
+    def __call__(self, graph, source, target):
+        self.calls += 1
+        return self.weight
+
+
+class CountingBoundedWeight(CountingWeight):
+    def __init__(self, weight, jitter):
+        super().__init__(weight)
+        self.jitter = jitter
+
+    def bounds(self, graph, source, target):
+        return (self.weight, self.weight + self.jitter)
+
+
+def test_compile_calls_each_weight_once():
+    a, b, c = Node("a"), Node("b"), Node("c")
+    plain, bounded = CountingWeight(2.0), CountingBoundedWeight(1.0, 0.5)
+    graph = Graph([(a, b, plain), (b, c, bounded)], directed=True)
+    compiled = CompiledGraph.from_graph(graph)
+    assert plain.calls == 1
+    assert bounded.calls == 1
+    assert np.array_equal(compiled.weights, [2.0, 1.0])
+    assert np.array_equal(compiled.weights_min, [2.0, 1.0])
+    assert np.array_equal(compiled.weights_max, [2.0, 1.5])
+
+
+def test_searches_see_edited_weights():
+    a, b, c = Node("a"), Node("b"), Node("c")
+    direct, first, second = CountingWeight(5.0), CountingWeight(1.0), CountingWeight(1.0)
+    graph = Graph([(a, c, direct), (a, b, first), (b, c, second)])
+    assert graph.find_shortest_path(a, c) == (2.0, [a, b, c])
+    frozen = graph.freeze()
+    first.weight = 10.0
+    assert graph.find_shortest_path(a, c) == (5.0, [a, c])
+    assert graph.shortest_paths(a)[0][c] == 5.0
+    # The snapshot keeps the weights it was compiled with, until the next freeze.
+    assert frozen.find_shortest_path(frozen.index[a], frozen.index[c])[0] == 2.0
+    assert graph.freeze().find_shortest_path(frozen.index[a], frozen.index[c])[0] == 5.0
+
+
+def test_from_edges_snapshot_dropped_on_change():
+    nodes = [Node(i) for i in range(3)]
+    graph = Graph.from_edges(nodes, [0, 1], [1, 2], [1.0, 1.0])
+    assert graph.freeze() is graph.freeze()
+    graph.add_connection(nodes[0], nodes[2], CountingWeight(0.5))
+    compiled = graph.freeze()
+    assert compiled.find_shortest_path(compiled.index[nodes[0]], compiled.index[nodes[2]]) == (0.5, [0, 2])
+    assert graph.find_shortest_path(nodes[0], nodes[2]) == (0.5, [nodes[0], nodes[2]])
+
+
+def random_graph(seed: int, directed: bool) -> Graph:
+    rng = random.Random(seed)
+    nodes = [Node(i) for i in range(15)]
+    graph = Graph([], directed)
+    for node in nodes:
+        graph.graph.setdefault(node, set())
+    # Small integer weights, so that several paths often have the same cost.
+    for _ in range(25):
+        graph.add_connection(*rng.sample(nodes, 2), ConstantWeight(rng.choice([0, 1, 2, 3])))
+    return graph
+
+
+def bellman_ford(graph: Graph, source: Node) -> dict:
+    distances = {node: math.inf for node in graph.get_node_list()}
+    distances[source] = 0
+    for _ in range(len(distances)):
+        for u, v in graph.get_edge_list():
+            distances[v] = min(distances[v], distances[u] + graph.get_weight(u, v))
+    return distances
+
+
+def path_cost(graph: Graph, path) -> float:
+    assert all(graph.is_connected(u, v) for u, v in zip(path, path[1:]))
+    return sum(graph.get_weight(u, v) for u, v in zip(path, path[1:]))
+
+
+@pytest.mark.parametrize("directed", [False, True])
+def test_shortest_paths_match_bellman_ford(directed):
+    for seed in range(10):
+        graph = random_graph(seed, directed)
+        compiled = graph.freeze()
+        for source in graph.get_node_list():
+            expected = bellman_ford(graph, source)
+            distances, predecessors = graph.shortest_paths(source)
+            assert distances == {node: cost for node, cost in expected.items() if cost < math.inf}
+            row, _ = compiled.shortest_paths(compiled.index[source])
+            assert row.tolist() == [expected[node] for node in compiled.nodes]
+            for target, cost in expected.items():
+                found, path = graph.find_shortest_path(source, target)
+                assert found == cost
+                if cost < math.inf:
+                    assert (path[0], path[-1]) == (source, target)
+                    assert path_cost(graph, path) == cost
+                    assert build_path(predecessors, target)[-1] == target
+                else:
+                    assert path == []
+
+
+def test_missing_nodes():
+    graph = random_graph(1, False)
+    outside = Node("outside")
+    assert graph.find_shortest_path(outside, outside) == (0, [outside])
+    assert graph.find_shortest_path(outside, Node(0)) == (math.inf, [])
+    assert graph.shortest_paths(outside) == ({outside: 0}, {outside: None})
+
+
+@pytest.mark.parametrize("directed", [False, True])
+def test_edge_list_round_trip(tmp_path, directed):
+    graph = random_graph(2, directed)
+    graph.graph.setdefault(Node(99), set())
+    Graph.write_edges(graph, str(tmp_path))
+    copy = Graph.read_edges(str(tmp_path))
+    assert copy.directed == directed
+    assert copy.get_node_list() == graph.freeze().nodes
+    assert sorted((u.id, v.id, copy.get_weight(u, v)) for u, v in copy.get_edge_list()) == \
+        sorted((u.id, v.id, graph.get_weight(u, v)) for u, v in graph.get_edge_list())
+    # The array-built graph is searched like any other.
+    for source in graph.get_node_list():
+        assert copy.shortest_paths(source)[0] == graph.shortest_paths(source)[0]
+
+
+@pytest.mark.parametrize("directed", [False, True])
+def test_csv_round_trip(tmp_path, directed):
+    graph = random_graph(3, directed)
+    Graph.write_to_csv(graph, str(tmp_path / "graph.csv"))
+    copy = Graph.read_from_csv(str(tmp_path / "graph.csv"))
+    assert copy.directed == directed
+    # Nodes without edges are not written to CSV, and ids are read back as strings.
+    assert sorted((u.id, v.id, copy.get_weight(u, v)) for u, v in copy.get_edge_list()) == \
+        sorted((str(u.id), str(v.id), float(graph.get_weight(u, v))) for u, v in graph.get_edge_list())
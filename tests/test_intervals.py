@@ -0,0 +1,84 @@
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from someip_timing_analysis import analysis
+from someip_timing_analysis.entities import System
+from someip_timing_analysis.intervals import PARAMETERS, best_case, communication_delay_bounds, worst_case
+
+from conftest import make_client, make_service, make_system
+
+
+def evaluate(s, c, t_c, assignment):
+    services = {name[2:]: value for name, value in assignment.items() if name.startswith("s.")}
+    clients = {name[2:]: value for name, value in assignment.items() if name.startswith("c.")}
+    return analysis.timing_analysis(s.replace(**services), c.replace(**clients), assignment.get("t_c", t_c))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_worst_and_best_case_match_grid(seed):
+    rng = random.Random(seed)
+    s, c = make_service(rng, "S"), make_client(rng, "C")
+    if not (s.offer_mode or c.find_mode):
+        s = s.replace(offer_mode=True)
+    t_c = rng.choice([0, 0.5, 1, 2])
+    names = rng.sample(PARAMETERS, 2)
+    ranges = {}
+    for name in names:
+        # Periods must stay positive.
+        lo = rng.choice([0.5, 1]) if name.endswith(("rep_del", "cyc_del")) else rng.choice([0, 1, 2])
+        ranges[name] = (lo, lo + rng.choice([0, 1, 4]))
+    grid = [
+        evaluate(s, c, t_c, dict(zip(names, point)))
+        for point in itertools.product(*(np.linspace(lo, hi, 41).tolist() for lo, hi in ranges.values()))
+    ]
+    worst = worst_case(s, c, t_c, ranges, tolerance=1e-6)
+    best = best_case(s, c, t_c, ranges, tolerance=1e-6)
+    # The values are reached by their assignment, within the intervals.
+    for result in (worst, best):
+        assert result.value == pytest.approx(evaluate(s, c, t_c, result.assignment), abs=1e-9)
+        for name, value in result.assignment.items():
+            assert ranges[name][0] <= value <= ranges[name][1]
+    # No point of the grid is beyond the certified bounds.
+    assert max(grid) <= worst.bound + 1e-9
+    assert min(grid) >= best.bound - 1e-9
+    assert worst.value >= max(grid) - 1e-5
+    assert best.value <= min(grid) + 1e-5
+
+
+def test_rejects_invalid_ranges():
+    rng = random.Random(1)
+    s, c = make_service(rng, "S", True), make_client(rng, "C")
+    with pytest.raises(ValueError):
+        worst_case(s, c, 1, {"s.rep_max": (0, 3)})
+    with pytest.raises(ValueError):
+        best_case(s, c, 1, {"c.boot_del": (3, 1)})
+
+
+def test_communication_delay_bounds_match_sampling():
+    system = make_system(1, relations=200)
+    rng = np.random.default_rng(1)
+    t_c_min = np.array([relation.t_c for relation in system.relations], dtype=np.float64)
+    t_c_max = t_c_min + rng.choice([0, 0.5, 1, 4], len(t_c_min))
+    best, worst = communication_delay_bounds(system, t_c_min, t_c_max, chunk_size=1000)
+    for i, relation in enumerate(system.relations):
+        samples = [analysis.timing_analysis(relation.service, relation.client, t_c) for t_c in np.linspace(t_c_min[i], t_c_max[i], 101).tolist()]
+        assert best[i] <= min(samples)
+        assert worst[i] >= max(samples)
+    # With no uncertainty, both bounds are the discovery time.
+    best, worst = communication_delay_bounds(system, t_c_min, t_c_min)
+    expected = [discovery_time for discovery_time, _ in analysis.compute_discovery_times(system)]
+    assert best.tolist() == expected
+    assert worst.tolist() == expected
+
+
+def test_communication_delay_bounds_edge_cases():
+    system = make_system(2, relations=10)
+    with pytest.raises(ValueError):
+        communication_delay_bounds(system, 2.0, 1.0)
+    with pytest.raises(SystemExit):
+        communication_delay_bounds(make_system(3, relations=200, invalid=True), 0.0, 1.0)
+    best, worst = communication_delay_bounds(System([]), [], [])
+    assert len(best) == len(worst) == 0
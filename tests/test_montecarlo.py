@@ -0,0 +1,79 @@
+import random
+
+import numpy as np
+import pytest
+
+from someip_timing_analysis import analysis
+from someip_timing_analysis.entities import Relation, System
+from someip_timing_analysis.montecarlo import monte_carlo
+from someip_timing_analysis.tables import RelationTable
+
+from conftest import make_client, make_service, make_system
+
+
+def test_fixed_parameters_give_the_analysis():
+    system = make_system(1, relations=50)
+    expected = np.array([discovery_time for discovery_time, _ in analysis.compute_discovery_times(system)], dtype=np.float64)
+    distribution = monte_carlo(system, {}, samples=100, seed=1)
+    assert distribution.samples == 100
+    for q in (0.0, 0.5, 1.0):
+        assert distribution.quantile(q).tolist() == expected.tolist()
+    assert distribution.system_quantile(0.5) == expected.max()
+
+
+def test_matches_scalar_sampling():
+    rng = random.Random(2)
+    s, c = make_service(rng, "S", True), make_client(rng, "C", True)
+    ranges = {s: {"init_del": (0.0, 5.0)}, c: {"boot_del": (0.0, 10.0), "init_del": (0.0, 2.0)}}
+    system = System([Relation(c, s, 0.5)])
+    distribution = monte_carlo(system, ranges, samples=20000, block_size=1000, seed=3)
+    # Draw the same parameters independently, and analyse them one at a time.
+    draws = np.random.default_rng(4)
+    samples = [
+        analysis.timing_analysis(s.replace(init_del=draws.uniform(0, 5)), c.replace(boot_del=draws.uniform(0, 10), init_del=draws.uniform(0, 2)), 0.5)
+        for _ in range(20000)
+    ]
+    scale = max(samples) - min(samples)
+    for q in (0.1, 0.5, 0.9):
+        assert distribution.quantile(q)[0] == pytest.approx(np.quantile(samples, q), abs=0.05 * scale)
+    assert distribution.relations.minimum[0] >= distribution.relations.lo[0]
+    assert distribution.relations.maximum[0] <= distribution.relations.hi[0]
+
+
+def test_shared_entities_draw_once():
+    rng = random.Random(5)
+    s, c = make_service(rng, "S", True), make_client(rng, "C", False)
+    # Two relations with the same parameters, sharing the entities drawn at random.
+    system = System([Relation(c, s, 1.0), Relation(c, s, 1.0)])
+    distribution = monte_carlo(system, {s: {"boot_del": (0.0, 10.0)}, c: {"boot_del": (0.0, 10.0)}}, samples=2000, seed=6)
+    assert np.array_equal(distribution.relations.counts[0], distribution.relations.counts[1])
+    # The system is the largest relation of each sample.
+    assert distribution.system.maximum[0] == distribution.relations.maximum.max()
+
+
+def test_seed_reproducible_and_table():
+    system = make_system(7, relations=30)
+    entity = system.relations[0].client
+    first = monte_carlo(system, {entity: {"boot_del": (0.0, 4.0)}}, samples=500, seed=8)
+    second = monte_carlo(system, {entity: {"boot_del": (0.0, 4.0)}}, samples=500, seed=8)
+    assert np.array_equal(first.relations.counts, second.relations.counts)
+    # The first entity of the table is the client of the first relation.
+    table = monte_carlo(RelationTable.from_system(system), {0: {"boot_del": (0.0, 4.0)}}, samples=500, seed=8)
+    assert np.array_equal(first.relations.counts, table.relations.counts)
+
+
+def test_rejects_invalid_arguments():
+    system = make_system(9, relations=30)
+    entity = system.relations[0].service
+    with pytest.raises(ValueError):
+        monte_carlo(system, {entity: {"rep_max": (0, 3)}}, samples=10)
+    with pytest.raises(ValueError):
+        monte_carlo(system, {entity: {"boot_del": (3, 1)}}, samples=10)
+    with pytest.raises(ValueError):
+        monte_carlo(make_system(10, relations=200, invalid=True), {}, samples=10)
+
+
+def test_empty_system():
+    distribution = monte_carlo(System([]), {}, samples=10)
+    assert len(distribution.quantile(0.5)) == 0
+    assert distribution.system_quantile(0.5) == 0.0
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from someip_timing_analysis import analysis
+from someip_timing_analysis.entities import Client, Service
+from someip_timing_analysis.network import compile_system, delay_intervals, device_to_device_delay, get_placement
+from someip_timing_analysis.tables import RelationTable
+
+from conftest import make_network, make_requirements
+
+
+def test_compile_system_matches_pairwise_search():
+    graph, _ = make_network(1, devices=10, links=25, entities=30)
+    placement = get_placement(graph)
+    requirements = make_requirements(graph, 1, 100)
+    system = compile_system(graph, requirements)
+    for relation, (c, s) in zip(system.relations, requirements):
+        assert (relation.client, relation.service) == (c, s)
+        assert relation.t_c == pytest.approx(device_to_device_delay(graph, placement[c], placement[s]) * 1e03, rel=1e-12)
+    table = compile_system(graph, requirements, as_table=True)
+    assert table.t_c.tolist() == [relation.t_c for relation in system.relations]
+    assert analysis.compute_discovery_times(table).tolist() == \
+        analysis.compute_discovery_times(RelationTable.from_system(system)).tolist()
+
+
+def test_compile_system_rejects_unreachable_devices():
+    graph, _ = make_network(2, devices=12, links=6, entities=30)
+    requirements = make_requirements(graph, 2, 10) + make_requirements(graph, 3, 1, reachable=False)
+    with pytest.raises(ValueError):
+        compile_system(graph, requirements)
+    # Entities which are not hosted by any device.
+    with pytest.raises(ValueError):
+        compile_system(graph, [(Client("C", 0, 0, 1, 1, True), Service("S", 0, 0, 1, 1, 1, 0, True))])
+
+
+def test_delay_intervals():
+    graph, _ = make_network(3, devices=10, links=25, entities=30)
+    system = compile_system(graph, make_requirements(graph, 4, 100))
+    lo, hi = delay_intervals(graph, system)
+    nominal = np.array([relation.t_c for relation in system.relations])
+    assert np.all(lo <= nominal + 1e-12)
+    assert np.all(nominal <= hi + 1e-12)
+    # Without jitter, the interval is a single point.
+    for u, v in graph.get_edge_list():
+        graph.weight_functions[u, v].jitter = 0
+    lo, hi = delay_intervals(graph, system)
+    assert np.allclose(lo, nominal, rtol=1e-12, atol=0)
+    assert np.allclose(hi, nominal, rtol=1e-12, atol=0)
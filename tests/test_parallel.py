@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from someip_timing_analysis import analysis, parallel
+from someip_timing_analysis.entities import System
+from someip_timing_analysis.storage import write_snapshot
+from someip_timing_analysis.tables import RelationTable
+
+from conftest import make_system
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_compute_discovery_times(workers):
+    system = make_system(1, relations=300)
+    expected = analysis.compute_discovery_times(system)
+    assert parallel.compute_discovery_times(system, workers=workers, chunk_size=16) == expected
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_compute_discovery_times_full_details(workers):
+    system = make_system(2, relations=300)
+    results = parallel.compute_discovery_times_full_details(system, workers=workers, chunk_size=16)
+    for result, relation in zip(results, system.relations):
+        expected = analysis.timing_analysis_full_details(relation.service, relation.client, relation.t_c)
+        assert result.discovery_time == expected.discovery_time
+        assert result.details == expected.details
+        assert (result.client, result.service) == (relation.client, relation.service)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_invalid_relations(workers):
+    system = make_system(3, relations=300, invalid=True)
+    results = parallel.compute_discovery_times(system, workers=workers, chunk_size=16)
+    details = parallel.compute_discovery_times_full_details(system, workers=workers, chunk_size=16)
+    assert any(isinstance(result, parallel.AnalysisError) for result in results)
+    for index, (result, detail, relation) in enumerate(zip(results, details, system.relations)):
+        if relation.service.offer_mode or relation.client.find_mode:
+            assert result == (analysis.timing_analysis(relation.service, relation.client, relation.t_c), relation)
+            assert detail.discovery_time == result[0]
+        else:
+            for error in (result, detail):
+                assert isinstance(error, parallel.AnalysisError)
+                assert (error.index, error.relation) == (index, relation)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_snapshot_discovery_times(tmp_path, workers):
+    system = make_system(4, relations=300, invalid=True)
+    write_snapshot(system, str(tmp_path))
+    result = parallel.compute_snapshot_discovery_times(str(tmp_path), workers=workers, chunk_size=16)
+    expected = analysis._timing_analysis_arrays(**RelationTable.from_system(system).columns())["discovery_time"]
+    assert np.array_equal(result, expected, equal_nan=True)
+
+
+def test_empty_system(tmp_path):
+    assert parallel.compute_discovery_times(System([]), workers=2) == []
+    assert parallel.compute_discovery_times_full_details(System([]), workers=2) == []
+    write_snapshot(System([]), str(tmp_path))
+    assert len(parallel.compute_snapshot_discovery_times(str(tmp_path), workers=2)) == 0
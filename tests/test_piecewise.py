@@ -0,0 +1,47 @@
+import random
+
+import numpy as np
+import pytest
+
+from someip_timing_analysis import analysis
+from someip_timing_analysis.piecewise import PARAMETERS, compile_discovery_time, _replace
+
+from conftest import make_client, make_service
+
+
+def random_pair(rng: random.Random):
+    s, c = make_service(rng, "S"), make_client(rng, "C")
+    if not (s.offer_mode or c.find_mode):
+        c = c.replace(find_mode=True)
+    return s, c, rng.choice([0, 0.25, 0.5, 1, 2, 3])
+
+
+@pytest.mark.parametrize("parameter", PARAMETERS)
+def test_matches_pointwise(parameter):
+    rng = random.Random(parameter)
+    for _ in range(30):
+        s, c, t_c = random_pair(rng)
+        # Periods must stay positive.
+        lo = rng.choice([0.25, 0.5]) if parameter.endswith(("rep_del", "cyc_del")) else rng.choice([0.0, 1.0])
+        hi = lo + rng.choice([1, 5, 20])
+        function = compile_discovery_time(s, c, t_c, parameter, lo, hi)
+        points = np.concatenate((function.points, np.linspace(lo, hi, 201), [rng.uniform(lo, hi) for _ in range(50)]))
+        expected = [analysis.timing_analysis(*_replace(s, c, t_c, parameter, x)) for x in points.tolist()]
+        assert np.allclose(function(points), expected, rtol=1e-9, atol=1e-9)
+        # The value at each breakpoint is exact.
+        assert function(function.points).tolist() == expected[:len(function.points)]
+
+
+def test_rejects_invalid_arguments():
+    rng = random.Random(1)
+    s, c = make_service(rng, "S", False), make_client(rng, "C", False)
+    with pytest.raises(ValueError):
+        compile_discovery_time(s, c, 1, "c.boot_del", 0, 10)
+    s = s.replace(offer_mode=True)
+    with pytest.raises(ValueError):
+        compile_discovery_time(s, c, 1, "s.rep_max", 0, 10)
+    with pytest.raises(ValueError):
+        compile_discovery_time(s, c, 1, "c.boot_del", 10, 10)
+    function = compile_discovery_time(s, c, 1, "c.boot_del", 0, 10)
+    with pytest.raises(ValueError):
+        function(11)
@@ -0,0 +1,56 @@
+import math
+
+import numpy as np
+import pytest
+
+from someip_timing_analysis import analysis
+from someip_timing_analysis.delays import delay_matrix
+from someip_timing_analysis.entities import System
+from someip_timing_analysis.graph import Graph
+from someip_timing_analysis.network import compile_system, device_delay, get_hosts, get_placement
+from someip_timing_analysis.resilience import link_failures
+
+from conftest import make_network, make_requirements
+
+
+def without_link(graph: Graph, source, target) -> Graph:
+    result = Graph([], graph.directed)
+    for node in graph.get_node_list():
+        result.graph.setdefault(node, set())
+    for u, v in graph.get_edge_list():
+        if (u, v) != (source, target) and (graph.directed or (v, u) != (source, target)):
+            result.add_connection(u, v, graph.weight_functions[u, v])
+    return result
+
+
+@pytest.mark.parametrize("directed", [False, True])
+@pytest.mark.parametrize("workers", [1, 2])
+def test_link_failures_match_recomputation(directed, workers):
+    graph, _ = make_network(1, devices=10, links=18, directed=directed, entities=30)
+    system = compile_system(graph, make_requirements(graph, 1, 80))
+    placement = get_placement(graph)
+    failures = link_failures(graph, system, workers=workers, chunk_size=4)
+    # Each link fails once, in both directions if the graph is undirected.
+    key = tuple if directed else frozenset
+    assert sorted(map(str, {key(edge) for edge in graph.get_edge_list()})) == \
+        sorted(str(key((failure.source, failure.target))) for failure in failures)
+    for failure in failures:
+        delays = delay_matrix(without_link(graph, failure.source, failure.target), device_delay)
+        client, service = get_hosts(system, delays.index, placement)
+        t_c = delays.lookup(client, service) * 1e03
+        before = np.array([relation.t_c for relation in system.relations])
+        changed = ~np.isclose(t_c, before, rtol=1e-12, atol=0.0)
+        discovery_times = [
+            analysis.timing_analysis(relation.service, relation.client, delay) if delay < math.inf else math.inf
+            for relation, delay in zip(system.relations, t_c.tolist())
+        ]
+        assert failure.discovery_time == pytest.approx(max(discovery_times), rel=1e-12)
+        assert failure.affected == int(np.count_nonzero(changed))
+        assert failure.disconnected == int(np.count_nonzero(np.isinf(t_c)))
+        assert discovery_times[failure.relation] == pytest.approx(failure.discovery_time, rel=1e-12)
+
+
+def test_empty_system():
+    graph, _ = make_network(2, devices=5, links=6)
+    failures = link_failures(graph, System([]), workers=1)
+    assert [(failure.discovery_time, failure.relation, failure.affected) for failure in failures] == [(0.0, -1, 0)] * len(failures)
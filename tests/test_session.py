@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+from someip_timing_analysis import analysis
+from someip_timing_analysis.entities import System
+from someip_timing_analysis.session import AnalysisSession
+
+from conftest import BOOT_DEL, INIT_DEL, REP_DEL, REP_MAX, T_C, make_system
+
+
+def check(session: AnalysisSession, system: System):
+    expected = analysis.compute_discovery_times(system)
+    assert session.compute_discovery_times() == expected
+    assert session.get_highest_impact_relation() == analysis.get_highest_impact_relation(system)
+    assert session.get_highest_discovery_time() == max(discovery_time for discovery_time, _ in expected)
+
+
+def random_patch(rng: random.Random):
+    name, values = rng.choice([("boot_del", BOOT_DEL), ("init_del", INIT_DEL), ("rep_del", REP_DEL), ("rep_max", REP_MAX)])
+    return {name: rng.choice(values)}
+
+
+def test_updates_match_recomputation():
+    rng = random.Random(1)
+    system = make_system(1, relations=200, services=5, clients=8)
+    # The same relation might appear more than once.
+    system.relations.extend(rng.sample(system.relations, 10))
+    entities = list({id(entity): entity for r in system.relations for entity in (r.client, r.service)}.values())
+    session = AnalysisSession(system)
+    check(session, system)
+    for step in range(200):
+        choice = step % 3
+        if choice == 0:
+            entity = rng.choice(entities)
+            changed = session.update_entity(entity, **random_patch(rng))
+            assert changed == sorted(i for i, r in enumerate(system.relations) if entity in (r.client, r.service))
+        elif choice == 1:
+            relation = rng.choice(system.relations)
+            changed = session.update_relation(relation, rng.choice(T_C))
+            assert changed == [i for i, r in enumerate(system.relations) if r is relation]
+        else:
+            session.apply(
+                [(rng.choice(entities), random_patch(rng)) for _ in range(3)],
+                [(rng.choice(system.relations), rng.choice(T_C)) for _ in range(3)],
+            )
+        check(session, system)
+
+
+def test_unknown_entity():
+    system = make_system(2, relations=20)
+    session = AnalysisSession(system)
+    other = make_system(3, relations=1).relations[0]
+    assert session.update_entity(other.client, boot_del=1) == []
+    assert session.update_relation(other, 1) == []
+    check(session, system)
+
+
+def test_empty_system():
+    session = AnalysisSession(System([]))
+    assert session.compute_discovery_times() == []
+    assert session.apply() == []
+    with pytest.raises(ValueError):
+        session.get_highest_impact_relation()
+    with pytest.raises(ValueError):
+        session.get_highest_discovery_time()
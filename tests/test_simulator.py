@@ -0,0 +1,49 @@
+import math
+
+import numpy as np
+import pytest
+
+from someip_timing_analysis.entities import System
+from someip_timing_analysis.simulator import simulate
+from someip_timing_analysis.tables import RelationTable
+
+from conftest import make_system
+
+
+def send_times(entity, is_service, horizon):
+    """Lists every message sent by an entity, up to the horizon."""
+    times = [entity.t_init + (math.pow(2, k) - 1) * entity.rep_del for k in range(entity.rep_max + 1)]
+    if is_service:
+        main = entity.t_init + (math.pow(2, entity.rep_max) - 1) * entity.rep_del
+        times += [main + j * entity.cyc_del for j in range(1, int((horizon - main) / entity.cyc_del) + 2)]
+    return [time for time in times if time <= horizon]
+
+
+def discover(relation, horizon):
+    """Finds the first discovery of a relation, trying every message."""
+    s, c, t_c = relation.service, relation.client, relation.t_c
+    result = math.inf
+    if s.offer_mode:
+        for time in send_times(s, True, horizon):
+            if time + t_c >= c.boot_del:
+                result = min(result, time + t_c)
+                break
+    if c.find_mode:
+        for time in send_times(c, False, horizon):
+            if time + t_c >= s.t_init:
+                result = min(result, time + t_c + s.ans_del + t_c)
+                break
+    return result
+
+
+@pytest.mark.parametrize("horizon", [math.inf, 10.0, 30.0])
+def test_matches_enumeration(horizon):
+    system = make_system(1, relations=400, invalid=True)
+    result = simulate(system, horizon)
+    limit = horizon if horizon < math.inf else 200.0
+    assert result.tolist() == [discover(relation, limit) for relation in system.relations]
+    assert np.array_equal(simulate(RelationTable.from_system(system), horizon), result)
+
+
+def test_empty_system():
+    assert len(simulate(System([]))) == 0
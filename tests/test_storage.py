@@ -0,0 +1,38 @@
+import io
+
+import numpy as np
+
+from someip_timing_analysis.entities import Client, Service, Relation, System
+from someip_timing_analysis.storage import iter_relations, open_snapshot, write_snapshot, write_system
+
+
+def test_write_system_from_generator():
+    service = Service("S", 1, 1, 1, 3, 2, 1, True)
+
+    def relations():
+        # Each client is freed right after its relation is written.
+        for i in range(1000):
+            yield Relation(Client(f"C{i}", i, 2, 1, 3, True), service, i * 0.5)
+
+    stream = io.StringIO()
+    assert write_system(relations(), stream) == 1000
+    stream.seek(0)
+    result = list(iter_relations(stream))
+    assert len(result) == 1000
+    assert [relation.client.name for relation in result] == [f"C{i}" for i in range(1000)]
+    assert [relation.client.boot_del for relation in result] == list(range(1000))
+    assert [relation.t_c for relation in result] == [i * 0.5 for i in range(1000)]
+    assert len({id(relation.service) for relation in result}) == 1
+
+
+def test_overwrite_mapped_snapshot(tmp_path):
+    service = Service("S", 1, 1, 1, 3, 2, 1, True)
+    write_snapshot(System([Relation(Client(f"C{i}", 0, 2, 1, 3, True), service, i * 0.1) for i in range(300)]), tmp_path)
+    table = open_snapshot(tmp_path)
+    t_c = np.array(table.t_c)
+    # The open mappings keep the previous columns.
+    write_snapshot(System([Relation(Client("C", 0, 2, 1, 3, True), service, 0.5)]), tmp_path)
+    assert np.array_equal(table.t_c, t_c)
+    assert table.entities.name[300] == "C299"
+    assert len(open_snapshot(tmp_path)) == 1
+    assert not [name for name in tmp_path.iterdir() if name.suffix == ".tmp"]
@@ -0,0 +1,43 @@
+import numpy as np
+
+from someip_timing_analysis import analysis, analysis_ssg15
+from someip_timing_analysis.entities import Client, Service
+from someip_timing_analysis.sweep import Axis, sweep
+
+analysis.set_tracing_mode(analysis.TRACE_OFF)
+
+
+def test_sweep_mode_axes(tmp_path):
+    s = Service("S", 1, 1, 1, 3, 2, 1, True)
+    c = Client("C", 0, 2, 1, 3, True)
+    axes = [Axis("s.offer_mode", [True, False]), Axis("c.find_mode", [True, False]), Axis("t_c", [0.1, 0.5, 2.0])]
+    for model in (analysis, analysis_ssg15):
+        result = sweep(s, c, 0.1, axes, model=model, chunk_size=5, out=str(tmp_path / f"{model.__name__}.npy"))
+        assert result.shape == (2, 2, 3)
+        # Both passive: no discovery time.
+        assert np.all(np.isnan(result[1, 1]))
+        for i, offer_mode in enumerate([True, False]):
+            for j, find_mode in enumerate([True, False]):
+                if offer_mode or find_mode:
+                    for k, t_c in enumerate([0.1, 0.5, 2.0]):
+                        expected = model.timing_analysis(s.replace(offer_mode=offer_mode), c.replace(find_mode=find_mode), t_c)
+                        assert result[i, j, k] == expected
+        assert np.array_equal(np.load(tmp_path / f"{model.__name__}.npy"), result, equal_nan=True)
+
+
+def test_sweep_mode_only_axes():
+    s = Service("S", 1, 1, 1, 3, 2, 1, True)
+    c = Client("C", 0, 2, 1, 3, True)
+    for model in (analysis, analysis_ssg15):
+        for axes in ([Axis("s.offer_mode", [True, False])], [Axis("c.find_mode", [True, False])],
+                     [Axis("s.offer_mode", [True, False]), Axis("c.find_mode", [True, False])]):
+            result = sweep(s, c, 0.1, axes, model=model)
+            for position in np.ndindex(result.shape):
+                modes = {"s.offer_mode": s.offer_mode, "c.find_mode": c.find_mode}
+                for axis, i in zip(axes, position):
+                    modes[axis.parameter] = bool(axis.values[i])
+                if modes["s.offer_mode"] or modes["c.find_mode"]:
+                    expected = model.timing_analysis(s.replace(offer_mode=modes["s.offer_mode"]), c.replace(find_mode=modes["c.find_mode"]), 0.1)
+                    assert result[position] == expected
+                else:
+                    assert np.isnan(result[position])
@@ -0,0 +1,47 @@
+import numpy as np
+
+from someip_timing_analysis import analysis
+from someip_timing_analysis.entities import System
+from someip_timing_analysis.tables import RelationTable, deduplicate
+
+from conftest import make_system
+
+
+def test_deduplicate_system():
+    system = make_system(1, relations=400, services=4, clients=5)
+    dedup = deduplicate(system)
+    assert dedup.relations == len(system.relations)
+    assert dedup.unique_relations < dedup.relations
+    # The first relation of each key is its representative.
+    assert dedup.inverse[dedup.index].tolist() == list(range(dedup.unique_relations))
+    values = analysis.compute_discovery_times(dedup.table)
+    expected = [analysis.timing_analysis(r.service, r.client, r.t_c) for r in system.relations]
+    assert dedup.scatter(values).tolist() == expected
+    # Relations sharing a key share every parameter used by the analysis.
+    keys = {}
+    for relation, key in zip(system.relations, dedup.inverse.tolist()):
+        parameters = (
+            relation.service.boot_del, relation.service.init_del, relation.service.rep_del, relation.service.rep_max,
+            relation.service.cyc_del, relation.service.ans_del, relation.service.offer_mode, relation.client.boot_del,
+            relation.client.init_del, relation.client.rep_del, relation.client.rep_max, relation.client.find_mode, relation.t_c,
+        )
+        assert keys.setdefault(key, parameters) == parameters
+    assert len(set(keys.values())) == dedup.unique_relations
+
+
+def test_deduplicate_table_matches_system():
+    system = make_system(2, relations=400, services=4, clients=5)
+    table = RelationTable.from_system(system)
+    from_system, from_table = deduplicate(system), deduplicate(table)
+    assert from_table.unique_relations == from_system.unique_relations
+    assert from_table.unique_entities == from_system.unique_entities
+    assert from_table.scatter(analysis.compute_discovery_times(from_table.table)).tolist() == \
+        analysis.compute_discovery_times(table).tolist()
+
+
+def test_deduplicate_empty_system():
+    for target in (System([]), RelationTable.from_system(System([]))):
+        dedup = deduplicate(target)
+        assert (dedup.relations, dedup.unique_relations, dedup.unique_entities) == (0, 0, 0)
+        assert dedup.ratio == 1.0
+        assert len(dedup.scatter(np.empty(0))) == 0